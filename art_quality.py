@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - AI原图质量检查
+下载的AI图片在合成前先经过一组向量化检查（每张几毫秒）：
+尺寸、长宽比、亮度方差（空白/纯色图）、主色占比，以及与最近原图的感知哈希距离（重复图片）。
+不合格的图片直接退回重新生成，不再浪费一次合成和保存。
+
+用法：
+    python art_quality.py AI_Art/*.png     # 检查已有图片
+"""
+
+import argparse
+import contextlib
+import glob
+import os
+import sys
+from collections import deque, namedtuple
+
+import numpy as np
+from PIL import Image
+
+from art_fit import open_image
+
+QualityResult = namedtuple("QualityResult", ["ok", "reasons", "metrics", "phash"])
+
+# 统计用的缩略图边长与感知哈希参数
+SAMPLE_SIZE = 128
+HASH_SIZE = 32
+HASH_BITS = 8
+
+
+def _dct_matrix(n):
+    """n点DCT-II矩阵（正交归一化）"""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(HASH_SIZE)
+
+
+def perceptual_hash(gray):
+    """DCT感知哈希：32x32灰度图取左上8x8低频（去掉直流分量）与中位数比较，返回64位布尔数组"""
+    if gray.shape != (HASH_SIZE, HASH_SIZE):
+        gray = np.asarray(Image.fromarray(gray).resize((HASH_SIZE, HASH_SIZE), Image.BILINEAR), dtype=np.float32)
+    coeffs = _DCT @ gray.astype(np.float32) @ _DCT.T
+    low = coeffs[:HASH_BITS, :HASH_BITS].ravel()[1:]
+    return low > np.median(low)
+
+
+def hash_distance(a, b):
+    return int(np.count_nonzero(a != b))
+
+
+class ArtQualityGate:
+    """AI原图质量检查，记住最近接受的图片用于查重"""
+
+    def __init__(self, min_size=512, max_aspect=1.3, min_std=10.0, max_dominant=0.55,
+                 min_hash_distance=6, history=30):
+        self.min_size = min_size
+        self.max_aspect = max_aspect
+        self.min_std = min_std
+        self.max_dominant = max_dominant
+        self.min_hash_distance = min_hash_distance
+        self.recent = deque(maxlen=history)
+
+    def seed_from_dir(self, directory, limit=None):
+        """用目录中最近的图片初始化查重历史（如AI原图存档）"""
+        paths = sorted(glob.glob(os.path.join(directory, "*.png")), key=os.path.getmtime)
+        for path in paths[-(limit or self.recent.maxlen):]:
+            try:
+                with Image.open(path) as image:
+                    self.recent.append((os.path.basename(path), self._sample(image, draft=True)[1]))
+            except OSError:
+                continue
+
+    def _sample(self, image, draft=False):
+        """缩放到统计用尺寸，返回 (RGB数组, 感知哈希)
+        draft=True 仅用于本类自己打开、尚未解码的图片：JPEG解码时直接缩小（会修改 image 本身）"""
+        if draft:
+            image.draft("RGB", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+        # reducing_gap 先做整数倍缩小再双线性插值，比直接缩放大图快数倍
+        small = image.convert("RGB").resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR, reducing_gap=2.0)
+        rgb = np.asarray(small, dtype=np.uint8)
+        gray = np.asarray(small.convert("L").resize((HASH_SIZE, HASH_SIZE), Image.BILINEAR), dtype=np.float32)
+        return rgb, perceptual_hash(gray)
+
+    def check(self, source):
+        """检查一张图片（路径、bytes 或PIL图片），返回 QualityResult(ok, 不合格原因列表, 指标, 感知哈希)"""
+        reasons = []
+        try:
+            image = open_image(source)
+        except OSError as e:
+            return QualityResult(False, [f"无法读取图片: {e}"], {}, None)
+
+        # 调用方传入的PIL图片由调用方负责关闭
+        with contextlib.nullcontext(image) if image is source else image:
+            width, height = image.size
+            aspect = max(width, height) / max(1, min(width, height))
+            metrics = {"width": width, "height": height, "aspect": round(aspect, 3)}
+            if min(width, height) < self.min_size:
+                reasons.append(f"尺寸过小 {width}x{height}（最小边至少 {self.min_size}px）")
+            if aspect > self.max_aspect:
+                reasons.append(f"长宽比异常 {aspect:.2f}（上限 {self.max_aspect}）")
+
+            rgb, phash = self._sample(image, draft=image is not source)
+
+        # 亮度标准差：接近0说明是空白或纯色图
+        luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        std = float(luma.std())
+        # 主色占比：每通道量化到8级后统计最多的颜色
+        codes = ((rgb[..., 0] >> 5).astype(np.int32) << 6) | ((rgb[..., 1] >> 5).astype(np.int32) << 3) | (rgb[..., 2] >> 5)
+        dominant = float(np.bincount(codes.ravel(), minlength=512).max()) / codes.size
+        metrics.update(std=round(std, 2), dominant=round(dominant, 3))
+
+        if std < self.min_std:
+            reasons.append(f"画面近乎空白（亮度标准差 {std:.1f}）")
+        if dominant > self.max_dominant:
+            reasons.append(f"单一颜色占比过高（{dominant:.0%}）")
+
+        for name, previous in self.recent:
+            distance = hash_distance(phash, previous)
+            if distance < self.min_hash_distance:
+                reasons.append(f"与最近的图片 {name} 几乎相同（感知哈希距离 {distance}）")
+                metrics["duplicate_of"] = name
+                break
+
+        return QualityResult(not reasons, reasons, metrics, phash)
+
+    def accept(self, result, label):
+        """记录已接受的图片，供后续查重"""
+        if result.phash is not None:
+            self.recent.append((label, result.phash))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="检查AI原图质量")
+    parser.add_argument("paths", nargs="+", help="图片路径")
+    args = parser.parse_args(argv)
+
+    gate = ArtQualityGate()
+    rejected = 0
+    for path in args.paths:
+        result = gate.check(path)
+        name = os.path.basename(path)
+        if result.ok:
+            print(f"✅ {name}  {result.metrics}")
+            gate.accept(result, name)
+        else:
+            rejected += 1
+            print(f"❌ {name}  {'；'.join(result.reasons)}")
+    print(f"📋 共 {len(args.paths)} 张，不合格 {rejected} 张")
+    return 1 if rejected else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
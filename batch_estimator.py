@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 批量生成耗时与成本预估
+根据 run_logs 中历史运行的每张卡牌耗时、结果与生图次数，用蒙特卡洛模拟预测一批卡牌的：
+    • 总耗时（p10–p90 置信区间）
+    • 预计失败数与AI生图请求数（质量检查不合格的重试也计入）
+    • 不同并发数（多个工作进程/账号，见 card_queue.py）下的耗时，并给出建议并发数
+
+并发带来的变慢程度从历史中时间重叠的卡牌估计；没有并发历史时按无竞争假设并在结果中注明。
+
+用法：
+    python batch_estimator.py                    # 预估 generate 将要生成的卡牌（从生成器的起始卡牌号开始）
+    python batch_estimator.py --missing          # 只预估还没有生成图片的卡牌
+    python batch_estimator.py --count 200 --concurrency 1 2 4 8
+    python cli.py generate --dry-run             # 同上（默认参数）
+"""
+
+import argparse
+import os
+import sys
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+from card_loader import load_cards, format_error
+from run_log import CARD_STAGE, RUN_LOG_DIR, load_spans
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# 历史中一张卡牌的结果：耗时（秒）、是否成功、生图请求次数、当时的并发数
+CardSample = namedtuple("CardSample", ["duration", "ok", "attempts", "concurrency"])
+
+# 每一次生图请求对应的阶段（浏览器生成或离线后端都会经过质量检查）
+ATTEMPT_STAGES = ("browser_launch", "quality_gate")
+# 没有历史时的保守上限：card_generator 中每张卡牌最多等待的秒数
+MAX_WAIT_SECONDS = 1000
+# 某个并发数的样本少于这个数时不单独估计变慢程度
+MIN_LEVEL_SAMPLES = 5
+# 建议并发：耗时中位数与最优值相差不超过这个比例时选更小的并发
+PLATEAU = 0.05
+
+
+def card_history(spans):
+    """从运行日志中整理每张卡牌的历史结果"""
+    attempts = defaultdict(lambda: defaultdict(int))
+    cards = []
+    for span in spans:
+        key = (span.get("run"), span.get("card"))
+        if span.get("stage") == CARD_STAGE:
+            cards.append((key, span))
+        elif span.get("stage") in ATTEMPT_STAGES:
+            attempts[key][span["stage"]] += 1
+
+    # 并发数：与这张卡牌的时间中点重叠的卡牌数（包括同机其他工作进程的日志）
+    intervals = np.array([(span["start"], span["start"] + span.get("duration", 0.0)) for _, span in cards])
+    samples = []
+    for i, (key, span) in enumerate(cards):
+        middle = (intervals[i, 0] + intervals[i, 1]) / 2
+        concurrency = int(np.count_nonzero((intervals[:, 0] <= middle) & (intervals[:, 1] >= middle)))
+        samples.append(CardSample(
+            duration=float(span.get("duration", 0.0)),
+            ok=span.get("status") == "ok",
+            attempts=max(1, *attempts[key].values()) if attempts[key] else 1,
+            concurrency=max(1, concurrency),
+        ))
+    return samples
+
+
+def contention_model(samples):
+    """并发数 → 单张卡牌变慢倍数；用 1 + k·(并发数-1) 拟合，返回 (k, 有无并发历史)"""
+    by_level = defaultdict(list)
+    for sample in samples:
+        by_level[sample.concurrency].append(sample.duration)
+    base = by_level.get(1)
+    if not base or len(base) < MIN_LEVEL_SAMPLES:
+        base = [sample.duration for sample in samples]
+    base_median = float(np.median(base)) if base else 0.0
+
+    points = [
+        (level, float(np.median(durations)) / base_median)
+        for level, durations in by_level.items()
+        if level > 1 and len(durations) >= MIN_LEVEL_SAMPLES and base_median > 0
+    ]
+    if not points:
+        return 0.0, False
+    x = np.array([level - 1 for level, _ in points], dtype=float)
+    y = np.array([slowdown - 1 for _, slowdown in points])
+    return max(0.0, float((x @ y) / (x @ x))), True
+
+
+class BatchEstimator:
+    """用历史样本做蒙特卡洛模拟"""
+
+    def __init__(self, samples, simulations=2000, seed=0):
+        self.samples = samples
+        self.simulations = simulations
+        self.rng = np.random.default_rng(seed)
+        self.contention, self.has_concurrency_history = contention_model(samples)
+        # 历史耗时先换算成单并发时的耗时，模拟时再按目标并发放大
+        self.durations = np.array([s.duration / self.slowdown(s.concurrency) for s in samples])
+        self.ok = np.array([s.ok for s in samples])
+        self.attempts = np.array([s.attempts for s in samples])
+
+    def slowdown(self, concurrency):
+        return 1.0 + self.contention * (concurrency - 1)
+
+    def simulate(self, count, concurrency):
+        """模拟 count 张卡牌在 concurrency 个工作进程上按队列顺序处理，返回各指标的 (p10, p50, p90)"""
+        picks = self.rng.integers(0, len(self.samples), size=(self.simulations, count))
+        durations = self.durations[picks] * self.slowdown(concurrency)
+
+        if concurrency <= 1:
+            wall = durations.sum(axis=1)
+        else:
+            # 先到先得：每张卡牌交给最早空闲的工作进程
+            workers = np.zeros((self.simulations, concurrency))
+            rows = np.arange(self.simulations)
+            for j in range(count):
+                idle = workers.argmin(axis=1)
+                workers[rows, idle] += durations[:, j]
+            wall = workers.max(axis=1)
+
+        failures = count - self.ok[picks].sum(axis=1)
+        requests = self.attempts[picks].sum(axis=1)
+        busy_hours = durations.sum(axis=1) / 3600
+
+        def spread(values):
+            return tuple(float(v) for v in np.percentile(values, [10, 50, 90]))
+
+        return {
+            "concurrency": concurrency,
+            "wall": spread(wall),
+            "failures": spread(failures),
+            "requests": spread(requests),
+            "busy_hours": spread(busy_hours),
+        }
+
+    def best_concurrency(self, results):
+        """耗时中位数接近最优（差距不超过 PLATEAU）的最小并发数"""
+        fastest = min(result["wall"][1] for result in results)
+        for result in sorted(results, key=lambda r: r["concurrency"]):
+            if result["wall"][1] <= fastest * (1 + PLATEAU):
+                return result["concurrency"]
+        return results[0]["concurrency"]
+
+
+def history_paths(paths=None):
+    if paths:
+        return paths
+    if not os.path.isdir(RUN_LOG_DIR):
+        return []
+    return sorted(os.path.join(RUN_LOG_DIR, name) for name in os.listdir(RUN_LOG_DIR) if name.endswith(".jsonl"))
+
+
+def planned_cards(cards_file=None, missing=False, start=None):
+    """计划生成的卡牌，规则与 CardGenerator.generate_all_cards 相同：
+    从第 start 张（默认为生成器的起始卡牌号）开始全部覆盖生成；missing 时额外跳过已有卡牌图片的。
+    cards_file 为空时与生成器读取同一份配置（启用 CARD_STORE 时为卡牌库）"""
+    from card_generator import CardGenerator, select_cards
+
+    generator = CardGenerator()
+    if cards_file is None:
+        cards = generator.load_cards_config()
+    else:
+        cards, errors = load_cards(cards_file)
+        for error in errors:
+            print(f"⚠️  跳过无效卡牌 {format_error(error)}")
+    cards = select_cards(cards, generator.start_from_card if start is None else start)
+    if missing:
+        cards = [card for card in cards if not os.path.exists(os.path.join(generator.output_path, f"{card['card_name']}.png"))]
+    return cards
+
+
+def format_seconds(seconds):
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}时{minutes:02d}分"
+    if minutes:
+        return f"{minutes}分{seconds:02d}秒"
+    return f"{seconds}秒"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="根据历史运行日志预估批量生成的耗时与成本")
+    parser.add_argument("--cards-file", help="卡牌配置文件（默认与生成器相同：cards.json 或 CARD_STORE 卡牌库）")
+    parser.add_argument("--missing", action="store_true", help="只计入还没有生成图片的卡牌")
+    parser.add_argument("--start", type=int, help="从第几张卡牌开始（默认与生成器的起始卡牌号 START_FROM_CARD 一致）")
+    parser.add_argument("--count", type=int, help="直接指定卡牌数量（忽略卡牌配置）")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 3, 4, 6, 8], help="要比较的并发数")
+    parser.add_argument("--logs", nargs="*", help="历史运行日志（默认 run_logs/ 下全部）")
+    parser.add_argument("--simulations", type=int, default=2000, help="蒙特卡洛模拟次数")
+    args = parser.parse_args(argv)
+
+    count = args.count if args.count is not None else len(planned_cards(args.cards_file, args.missing, args.start))
+    print(f"🗂️  计划生成 {count} 张卡牌")
+    if count == 0:
+        print("✅ 没有需要生成的卡牌")
+        return 0
+
+    paths = history_paths(args.logs)
+    samples = card_history(load_spans(paths)) if paths else []
+    if not samples:
+        print("⚠️  没有历史运行记录，无法预估。先生成几张卡牌积累数据（run_logs/）")
+        print(f"   保守上限：每张最多等待 {MAX_WAIT_SECONDS} 秒 → {format_seconds(count * MAX_WAIT_SECONDS)}")
+        return 0
+
+    estimator = BatchEstimator(samples, simulations=args.simulations)
+    success = estimator.ok.mean()
+    print(f"📂 历史记录：{len(paths)} 个日志，{len(samples)} 张卡牌，成功率 {success:.0%}，"
+          f"单张耗时中位数 {format_seconds(float(np.median(estimator.durations)))}，"
+          f"平均生图 {estimator.attempts.mean():.2f} 次/张")
+    if len(samples) < 20:
+        print("   ⚠️  历史样本较少，区间仅供参考")
+    if estimator.has_concurrency_history:
+        print(f"   并发竞争：每多一个并发，单张耗时增加 {estimator.contention:.0%}（根据历史中重叠的卡牌估计）")
+    else:
+        print("   并发竞争：历史中没有并发运行记录，按无竞争假设估计（实际可能受账号/服务限流影响）")
+
+    results = [estimator.simulate(count, level) for level in sorted(set(args.concurrency))]
+    print(f"\n{'并发':>4}  {'总耗时 p50':>12}  {'p10 – p90':>22}  {'预计失败':>10}  {'生图请求':>10}")
+    for result in results:
+        low, mid, high = result["wall"]
+        failures, requests = result["failures"], result["requests"]
+        print(f"{result['concurrency']:>4}  {format_seconds(mid):>12}  "
+              f"{format_seconds(low) + ' – ' + format_seconds(high):>22}  "
+              f"{failures[1]:>5.0f} ({failures[0]:.0f}–{failures[2]:.0f})  "
+              f"{requests[1]:>5.0f} ({requests[0]:.0f}–{requests[2]:.0f})")
+
+    best = estimator.best_concurrency(results)
+    chosen = next(result for result in results if result["concurrency"] == best)
+    low, mid, high = chosen["busy_hours"]
+    print(f"\n⭐ 建议并发 {best}：预计 {format_seconds(chosen['wall'][1])}"
+          f"（80%把握在 {format_seconds(chosen['wall'][0])} – {format_seconds(chosen['wall'][2])} 之间），"
+          f"占用机器时间约 {mid:.1f} 小时（{low:.1f}–{high:.1f}）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
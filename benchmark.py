@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 性能基准测试
+使用合成的卡牌目录（随机描述 + 程序生成的占位图）测量合成、导出各阶段耗时，
+并把结果保存为机器可读的基线文件，方便在不同提交之间发现性能回退
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from PIL import Image, ImageDraw, ImageFilter
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BASE_PATH, "bench_baselines")
+
+# 合成数据使用的素材
+CARD_GROUPS = ["国家卡", "思想卡", "变法卡", "连锁卡", "军事卡", "经济卡", "道具卡", "锦囊牌", "祭祀卡"]
+COLOR_THEMES = ["黑金", "深红金", "蓝金", "银灰", "紫金", "青绿", "橙黄", "古铜", "墨色", "素白"]
+DESC_CHARS = "军事经济政治攻击防御力回合春秋币国家玩家获得失去抽取弃置一张手牌本轮加成效果触发连锁变法祭祀结盟"
+DESC_TOKENS = ["+1", "+2", "+3", "-1", "，", "，", "。", "（", "）", "：", "2回合", "3张"]
+
+# 游戏记录表的规模曲线：(玩家数, 轮数)
+SHEET_SIZES = [(8, 10), (16, 50), (32, 100), (50, 200)]
+
+# AI原图缩放：(边长, 格式)，目标为卡牌图片区域
+ART_SOURCES = [(1024, "PNG"), (2048, "PNG"), (2048, "JPEG")]
+ART_SLOT = (595, 595)
+# 多进程合成测试的工作进程数
+WORKER_COUNTS = [1, 4, 16]
+
+
+def make_synthetic_cards(count, seed=0):
+    """生成指定数量的合成卡牌数据，字段与cards.json一致"""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        desc_len = rng.randint(12, 90)
+        description = "".join(
+            rng.choice(DESC_TOKENS) if rng.random() < 0.15 else rng.choice(DESC_CHARS)
+            for _ in range(desc_len)
+        )
+        prompt = "纯视觉画面：" + "".join(rng.choice(DESC_CHARS) for _ in range(rng.randint(20, 60)))
+        cards.append({
+            "card_group": rng.choice(CARD_GROUPS),
+            "card_name": f"合成卡牌{i + 1:05d}",
+            "color_theme": rng.choice(COLOR_THEMES),
+            "ai_prompt": prompt,
+            "description": description,
+            "price": f"{rng.randint(3, 30)}春秋币",
+        })
+    return cards
+
+
+def make_placeholder_art(size=1024, seed=0):
+    """程序生成占位AI图片：渐变底色 + 随机色块，模拟Copilot返回的插画"""
+    rng = random.Random(seed)
+    base = Image.new("RGB", (size, size))
+    top = tuple(rng.randint(120, 230) for _ in range(3))
+    bottom = tuple(rng.randint(20, 120) for _ in range(3))
+    gradient = Image.linear_gradient("L").resize((size, size))
+    base = Image.composite(Image.new("RGB", (size, size), bottom), Image.new("RGB", (size, size), top), gradient)
+
+    draw = ImageDraw.Draw(base)
+    for _ in range(40):
+        x0, y0 = rng.randint(0, size), rng.randint(0, size)
+        r = rng.randint(size // 40, size // 6)
+        color = tuple(rng.randint(0, 255) for _ in range(3))
+        if rng.random() < 0.5:
+            draw.ellipse((x0 - r, y0 - r, x0 + r, y0 + r), fill=color)
+        else:
+            draw.rectangle((x0 - r, y0 - r // 2, x0 + r, y0 + r // 2), fill=color)
+    return base.filter(ImageFilter.GaussianBlur(radius=2))
+
+
+def git_revision():
+    """当前提交号（非git环境返回unknown）"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_PATH, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+class BenchmarkSuite:
+    """各阶段基准测试"""
+
+    def __init__(self, sizes, repeat=3, compose_limit=20, art_variants=4, quiet=True):
+        self.sizes = sizes
+        self.repeat = repeat
+        self.compose_limit = compose_limit
+        self.art_variants = art_variants
+        self.quiet = quiet
+        self.results = {}
+        self.work_dir = tempfile.mkdtemp(prefix="card_bench_")
+
+    @contextlib.contextmanager
+    def _silenced(self):
+        """屏蔽被测代码的日志输出，避免终端刷新干扰计时（格式化开销仍计入）"""
+        if not self.quiet:
+            yield
+            return
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+
+    def _measure(self, label, func, repeat=None, items=1):
+        """多次运行取中位数；单次超过10秒的阶段不再重复"""
+        repeat = repeat or self.repeat
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with self._silenced():
+                func()
+            samples.append(time.perf_counter() - start)
+            if samples[-1] > 10:
+                break
+        result = {
+            "median_s": statistics.median(samples),
+            "min_s": min(samples),
+            "runs": len(samples),
+            "items": items,
+            "per_item_ms": statistics.median(samples) / items * 1000,
+        }
+        print(f"   ⏱️ {label:<28} {result['median_s']*1000:10.1f} ms  ({items} 项, {result['per_item_ms']:.2f} ms/项)")
+        return result
+
+    def _write_catalogue(self, cards, size):
+        path = os.path.join(self.work_dir, f"cards_{size}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cards, f, ensure_ascii=False, indent=2)
+        return path
+
+    def _prepare_art(self):
+        paths = []
+        for i in range(self.art_variants):
+            path = os.path.join(self.work_dir, f"art_{i}.png")
+            make_placeholder_art(seed=i).save(path, "PNG")
+            paths.append(path)
+        return paths
+
+    def bench_compose(self, cards, art_paths):
+        """合成 / 换行 / PNG保存"""
+        from card_generator import CardGenerator, smart_wrap_text
+        from PIL import ImageFont
+
+        generator = CardGenerator()
+        sample = cards[:self.compose_limit]
+        stage = {}
+
+        try:
+            font = ImageFont.truetype("simhei.ttf", 24)
+        except OSError:
+            font = ImageFont.load_default()
+
+        def wrap_all():
+            for card in cards:
+                smart_wrap_text(card["description"], font, 532)
+
+        stage["smart_wrap_text"] = self._measure("smart_wrap_text", wrap_all, items=len(cards))
+
+        composed = []
+
+        def compose_all():
+            composed.clear()
+            for i, card in enumerate(sample):
+                composed.append(generator.compose_card(card, art_paths[i % len(art_paths)]))
+
+        stage["compose_card"] = self._measure("compose_card", compose_all, items=len(sample))
+
+        save_dir = os.path.join(self.work_dir, "cards_out")
+        os.makedirs(save_dir, exist_ok=True)
+
+        def save_all():
+            for i, card_image in enumerate(composed):
+                card_image.save(os.path.join(save_dir, f"{i}.png"), "PNG")
+
+        stage["png_save"] = self._measure("png_save", save_all, items=len(composed))
+        return stage
+
+    def bench_export_word(self, cards_file, count):
+        from cards_to_word import CardsToWordExporter
+
+        def run():
+            exporter = CardsToWordExporter()
+            exporter.cards_file = cards_file
+            exporter.output_file = os.path.join(self.work_dir, f"export_{count}.docx")
+            exporter.export_to_word()
+
+        return self._measure("export_to_word", run, items=count)
+
+    def bench_report(self, cards_file, count):
+        from comprehensive_report import ComprehensiveReport
+
+        def run():
+            report = ComprehensiveReport(cards_file=cards_file)
+            report.generate_report(os.path.join(self.work_dir, f"report_{count}.docx"))
+
+        return self._measure("generate_report", run, items=count)
+
+    def bench_sheet(self, players=8, rounds=10):
+        """生成一张记录表；项数为写出的行数，另外记录Python堆内存峰值"""
+        import tracemalloc
+        from country_data_sheet import GameRecordSheet
+
+        def run():
+            sheet = GameRecordSheet(players=players, rounds=rounds, tax_rounds=rounds)
+            sheet.generate_sheet(os.path.join(self.work_dir, "sheet.xlsx"))
+            return sheet.current_row
+
+        tracemalloc.start()
+        rows = run()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        result = self._measure(f"generate_sheet {players}x{rounds}", run, items=rows)
+        result["peak_kb"] = peak // 1024
+        print(f"      内存峰值 {result['peak_kb']} KB")
+        return result
+
+    def bench_art(self, size, fmt):
+        """AI原图缩放 + 0.8px柔化（含解码）：原来的 LANCZOS + GaussianBlur 与快速路径对比，另记录像素差异"""
+        import numpy as np
+        from art_fit import resample_art
+
+        path = os.path.join(self.work_dir, f"art_{size}.{fmt.lower()}")
+        art = make_placeholder_art(size=size, seed=size)
+        art.save(path, fmt, **({"quality": 92} if fmt == "JPEG" else {}))
+
+        def legacy():
+            with Image.open(path) as image:
+                return image.convert("RGB").resize(ART_SLOT, Image.Resampling.LANCZOS).filter(
+                    ImageFilter.GaussianBlur(radius=0.8))
+
+        def fast():
+            with Image.open(path) as image:
+                image.draft("RGB", (ART_SLOT[0] * 2, ART_SLOT[1] * 2))
+                return resample_art(image.convert("RGB"), ART_SLOT, blur=0.8)
+
+        stage = {
+            "legacy": self._measure(f"resize legacy {size} {fmt}", legacy),
+            "fast": self._measure(f"resize fast {size} {fmt}", fast),
+        }
+        diff = np.asarray(legacy(), dtype=np.float32) - np.asarray(fast(), dtype=np.float32)
+        mse = float((diff ** 2).mean())
+        stage["fast"]["psnr_db"] = round(10 * np.log10(255 ** 2 / max(mse, 1e-9)), 1)
+        stage["fast"]["max_diff"] = int(np.abs(diff).max())
+        print(f"      加速 {stage['legacy']['median_s'] / stage['fast']['median_s']:.2f}x，"
+              f"与原输出 PSNR {stage['fast']['psnr_db']} dB，最大像素差 {stage['fast']['max_diff']}")
+        return stage
+
+    def bench_composite(self, cards, art_paths):
+        """图层合成后端：只叠加图层（标题栏、底栏、带渐变遮罩的AI图片）与完整 compose_card，另记录与 pillow 的像素差"""
+        import numpy as np
+        from card_generator import CardGenerator
+        from compositor import COMPOSITORS, Layer
+
+        sample = cards[:self.compose_limit]
+        reference = CardGenerator(compositor="pillow")
+        background, title, introduce = reference._templates()
+        art = make_placeholder_art(size=595, seed=7).resize((595, 595))
+        mask = reference._fade_mask(595, 595, 20)
+        layers = [
+            Layer(title, (143, 50), title, static=True),
+            Layer(introduce, (39, background.height - introduce.height - 20), introduce, static=True),
+            Layer(art, (45, 50 + title.height + 20), mask),
+        ]
+        expected = [np.asarray(reference.compose_card(card, art_paths[i % len(art_paths)]))
+                    for i, card in enumerate(sample)]
+
+        stage = {}
+        for name, backend in COMPOSITORS.items():
+            compositor = backend()
+            generator = CardGenerator(compositor=name)
+            stage[f"layers_{name}"] = self._measure(
+                f"layers {name}", lambda: [compositor.composite(background, layers) for _ in sample], items=len(sample))
+
+            def compose_all():
+                return [generator.compose_card(card, art_paths[i % len(art_paths)]) for i, card in enumerate(sample)]
+
+            stage[f"compose_card_{name}"] = self._measure(f"compose_card {name}", compose_all, items=len(sample))
+            max_diff = max(
+                int(np.abs(np.asarray(image, dtype=np.int16) - reference_pixels).max())
+                for image, reference_pixels in zip(compose_all(), expected)
+            )
+            stage[f"compose_card_{name}"]["max_diff"] = max_diff
+            print(f"      与 pillow 输出的最大像素差 {max_diff}")
+        return stage
+
+    def run(self, stages):
+        art_paths = self._prepare_art()
+        for size in self.sizes:
+            print(f"\n📦 合成目录：{size} 张卡牌")
+            cards = make_synthetic_cards(size, seed=size)
+            cards_file = self._write_catalogue(cards, size)
+            result = {}
+            if "compose" in stages:
+                result.update(self.bench_compose(cards, art_paths))
+            if "composite" in stages:
+                result.update(self.bench_composite(cards, art_paths))
+            if "word" in stages:
+                result["export_to_word"] = self.bench_export_word(cards_file, size)
+            if "report" in stages:
+                result["generate_report"] = self.bench_report(cards_file, size)
+            self.results[str(size)] = result
+
+        if "sheet" in stages:
+            print("\n📈 游戏记录表（玩家数 x 轮数）")
+            self.results["sheet"] = {
+                f"generate_sheet_{players}x{rounds}": self.bench_sheet(players, rounds)
+                for players, rounds in SHEET_SIZES
+            }
+
+        if "art" in stages:
+            print("\n🖼️ AI原图缩放（边长 格式）")
+            self.results["art"] = {}
+            for size, fmt in ART_SOURCES:
+                for path, data in self.bench_art(size, fmt).items():
+                    self.results["art"][f"resize_{path}_{size}_{fmt.lower()}"] = data
+
+        if "workers" in stages:
+            from shared_templates import bench_workers
+            print("\n🧵 多进程合成（共享模板 vs 各自解码）：全部就绪耗时与每个工作进程的 RSS / USS")
+            self.results["workers"] = {}
+            for row in bench_workers(WORKER_COUNTS):
+                mode = "shared" if row["shared"] else "private"
+                print(f"   {row['workers']:>3} 进程 {mode:<8} 就绪 {row['spawn_s']:6.2f}s  "
+                      f"RSS {row['rss_mb'] or 0:6.1f} MB  USS {row['uss_mb'] or 0:6.1f} MB")
+                self.results["workers"][f"spawn_{mode}_{row['workers']}"] = {
+                    "median_s": row["spawn_s"],
+                    "per_item_ms": row["spawn_s"] * 1000 / row["workers"],
+                    "rss_mb": row["rss_mb"],
+                    "uss_mb": row["uss_mb"],
+                }
+        return self.results
+
+    def cleanup(self):
+        """删除临时工作目录"""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def to_baseline(self):
+        """机器可读的基线数据"""
+        import PIL
+        return {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pillow": PIL.__version__,
+            "platform": platform.platform(),
+            "repeat": self.repeat,
+            "compose_limit": self.compose_limit,
+            "results": self.results,
+        }
+
+
+def compare_baselines(current, baseline, threshold=0.2):
+    """对比两份基线，返回回退的阶段列表 [(分组, 阶段, 旧值, 新值)]"""
+    regressions = []
+    for group, stages in current["results"].items():
+        old_stages = baseline.get("results", {}).get(group, {})
+        for stage, data in stages.items():
+            old = old_stages.get(stage)
+            if not old:
+                continue
+            old_ms, new_ms = old["per_item_ms"], data["per_item_ms"]
+            ratio = new_ms / old_ms if old_ms else 1.0
+            flag = "🔺" if ratio > 1 + threshold else ("🔻" if ratio < 1 - threshold else "  ")
+            print(f"   {flag} {group:>6} {stage:<20} {old_ms:9.2f} → {new_ms:9.2f} ms/项 ({ratio:.2f}x)")
+            if ratio > 1 + threshold:
+                regressions.append((group, stage, old_ms, new_ms))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀卡牌生成/导出性能基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="合成目录的卡牌数量")
+    parser.add_argument("--stages", nargs="+", default=["compose", "word", "report", "sheet"],
+                        choices=["compose", "composite", "word", "report", "sheet", "art", "workers"], help="要测试的阶段")
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段重复次数（取中位数）")
+    parser.add_argument("--compose-limit", type=int, default=20, help="每个目录中实际合成的卡牌数")
+    parser.add_argument("--save", metavar="NAME", help="把结果保存为 bench_baselines/NAME.json")
+    parser.add_argument("--compare", metavar="FILE", help="与已有基线文件对比")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定回退的相对阈值（默认20%%）")
+    parser.add_argument("--verbose", action="store_true", help="显示被测代码的日志输出")
+    args = parser.parse_args(argv)
+
+    print("=" * 50)
+    print("🌟 春秋杀性能基准测试")
+    print("=" * 50)
+
+    suite = BenchmarkSuite(args.sizes, repeat=args.repeat, compose_limit=args.compose_limit, quiet=not args.verbose)
+    if not args.verbose:
+        # 生产级别日志：只保留错误输出
+        from color_logger import ColorLogger
+        ColorLogger.configure(level="error")
+    try:
+        suite.run(args.stages)
+    finally:
+        suite.cleanup()
+    baseline = suite.to_baseline()
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 基线已保存：{path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        print(f"\n📊 与基线对比：{args.compare} (revision {old.get('revision')})")
+        regressions = compare_baselines(baseline, old, args.threshold)
+        if regressions:
+            print(f"\n❌ 发现 {len(regressions)} 个阶段性能回退")
+            return 1
+        print("\n✅ 未发现性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 一键构建
+把各个产出物建模为依赖图：每个目标声明输入文件/目录、依赖的其他目标和输出文件。
+输入内容哈希与上一次构建相同且输出仍在时跳过；互不依赖的目标在多个进程中并行构建。
+
+目标：
+    cards   AI生成卡牌图片 → Generated_Cards/（需要浏览器登录，只在显式指定时构建）
+    word    卡牌汇总Word文档（嵌入卡图）→ dist/春秋杀卡牌汇总.docx
+    sheet   游戏记录表 → dist/春秋杀游戏记录表.xlsx
+    report  项目综合汇报 → dist/春秋杀项目综合汇报.docx
+
+用法：
+    python build.py                 # 构建默认目标（word sheet report）
+    python build.py cards word      # 指定目标
+    python build.py --list          # 查看各目标是否需要重新构建
+    python build.py --force         # 忽略哈希，全部重新构建
+"""
+
+import argparse
+import ast
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(BASE_PATH, "dist")
+STATE_FILE = os.path.join(BASE_PATH, ".build_state.json")
+
+
+# ---- 各目标的构建函数（在子进程中运行，须为模块级函数） ----
+
+def _build_cards(outputs):
+    import asyncio
+    from card_generator import CardGenerator
+    if not asyncio.run(CardGenerator().generate_all_cards()):
+        raise RuntimeError("部分卡牌生成失败")
+
+
+def _build_word(outputs):
+    from cards_to_word import CardsToWordExporter
+    exporter = CardsToWordExporter(embed_images=True)
+    exporter.output_file = outputs[0]
+    if not exporter.export_to_word():
+        raise RuntimeError("Word文档导出失败")
+
+
+def _build_sheet(outputs):
+    from country_data_sheet import GameRecordSheet
+    GameRecordSheet().generate_sheet(outputs[0])
+
+
+def _build_report(outputs):
+    from comprehensive_report import ComprehensiveReport
+    ComprehensiveReport(cards_file=os.path.join(BASE_PATH, "cards.json")).generate_report(outputs[0])
+
+
+def _run_target(builder, outputs):
+    """子进程入口：屏蔽构建函数的输出，只在失败时回传"""
+    os.chdir(BASE_PATH)
+    buffer = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            builder(outputs)
+    except Exception as e:
+        raise RuntimeError(f"{e}\n{buffer.getvalue()[-2000:]}") from None
+    return time.perf_counter() - started
+
+
+def local_modules(*entries):
+    """入口模块及其直接或间接导入（包括函数内的延迟导入）的本项目模块文件，按名称排序"""
+    found, pending = set(), list(entries)
+    while pending:
+        name = pending.pop()
+        path = os.path.join(BASE_PATH, f"{name}.py")
+        if name in found or not os.path.exists(path):
+            continue
+        found.add(name)
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                pending.append(node.module.split(".")[0])
+    return [f"{name}.py" for name in sorted(found)]
+
+
+class Target:
+    """构建目标；modules 为构建函数的入口模块，它们导入的本项目代码文件自动计入输入"""
+
+    def __init__(self, name, builder, inputs, outputs, modules=(), deps=(), default=True, in_process=False):
+        self.name = name
+        self.builder = builder
+        self.modules = list(modules)
+        self._data_inputs = list(inputs)
+        self._inputs = None
+        self.outputs = [os.path.join(BASE_PATH, path) for path in outputs]
+        self.deps = list(deps)
+        self.default = default
+        # 需要交互（浏览器登录、按回车）的目标在主进程中运行
+        self.in_process = in_process
+
+    @property
+    def inputs(self):
+        """数据输入 + 入口模块导入的全部本项目代码（首次使用时解析导入）"""
+        if self._inputs is None:
+            paths = self._data_inputs + local_modules(*self.modules)
+            self._inputs = [os.path.join(BASE_PATH, path) for path in paths]
+        return self._inputs
+
+
+TARGETS = {
+    target.name: target for target in [
+        Target("cards", _build_cards,
+               inputs=["cards.json", "Base_IMG", "themes.json"], modules=["card_generator"],
+               outputs=["Generated_Cards"], default=False, in_process=True),
+        Target("word", _build_word,
+               inputs=["cards.json", "Generated_Cards", "themes.json"], modules=["cards_to_word"],
+               outputs=["dist/春秋杀卡牌汇总.docx"], deps=["cards"]),
+        Target("sheet", _build_sheet,
+               inputs=[], modules=["country_data_sheet"],
+               outputs=["dist/春秋杀游戏记录表.xlsx"]),
+        Target("report", _build_report,
+               inputs=["cards.json"], modules=["comprehensive_report"],
+               outputs=["dist/春秋杀项目综合汇报.docx"]),
+    ]
+}
+
+
+class BuildState:
+    """上一次构建的输入哈希；文件哈希按 (修改时间, 大小) 缓存，未变化的文件不重新读取"""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.targets = data.get("targets", {})
+        self.files = data.get("files", {})
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"targets": self.targets, "files": self.files}, f, ensure_ascii=False, indent=2)
+
+    def _file_hash(self, path):
+        stat = os.stat(path)
+        entry = self.files.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.files[path] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+        return self.files[path][2]
+
+    def input_hash(self, target):
+        """目标所有输入（目录递归展开）的内容哈希"""
+        digest = hashlib.sha1()
+        for root_path in target.inputs:
+            if os.path.isdir(root_path):
+                paths = sorted(
+                    os.path.join(root, name)
+                    for root, _, names in os.walk(root_path) for name in names
+                )
+            else:
+                paths = [root_path]
+            for path in paths:
+                if not os.path.exists(path):
+                    continue
+                digest.update(os.path.relpath(path, BASE_PATH).encode("utf-8") + b"\0")
+                digest.update(self._file_hash(path).encode("ascii"))
+        return digest.hexdigest()
+
+    def is_fresh(self, target, input_hash):
+        return (self.targets.get(target.name) == input_hash
+                and all(os.path.exists(path) for path in target.outputs))
+
+
+class Builder:
+    """按依赖顺序调度目标，就绪的目标并行构建"""
+
+    def __init__(self, names, force=False, jobs=None):
+        self.names = names
+        self.force = force
+        self.jobs = jobs
+        self.state = BuildState()
+        self.results = {}
+
+    def _deps(self, target):
+        # 只考虑本次选中的依赖；未选中的依赖直接使用其现有输出
+        return [dep for dep in target.deps if dep in self.names]
+
+    def _check(self, target):
+        """依赖完成后计算输入哈希，返回 (是否需要构建, 哈希)"""
+        input_hash = self.state.input_hash(target)
+        return self.force or not self.state.is_fresh(target, input_hash), input_hash
+
+    def _finish(self, target, input_hash, status, seconds=0.0):
+        self.results[target.name] = (status, seconds)
+        if status == "built":
+            self.state.targets[target.name] = input_hash
+            print(f"   ✅ {target.name:<8} 构建完成 {seconds:.2f} 秒")
+        elif status == "skipped":
+            print(f"   ⏭️  {target.name:<8} 输入未变化，跳过")
+        else:
+            print(f"   ❌ {target.name:<8} 构建失败")
+
+    def run(self):
+        os.makedirs(DIST_DIR, exist_ok=True)
+        pending = [TARGETS[name] for name in self.names]
+        running = {}
+        started = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                # 提交所有依赖已完成的目标；依赖失败的目标不再构建
+                for target in list(pending):
+                    deps = self._deps(target)
+                    if any(dep not in self.results for dep in deps):
+                        continue
+                    pending.remove(target)
+                    if any(self.results[dep][0] == "failed" for dep in deps):
+                        print(f"   ⛔ {target.name:<8} 依赖构建失败，未构建")
+                        self.results[target.name] = ("failed", 0.0)
+                        continue
+                    needed, input_hash = self._check(target)
+                    if not needed:
+                        self._finish(target, input_hash, "skipped")
+                    elif target.in_process:
+                        print(f"   🔨 {target.name:<8} 开始构建（前台）")
+                        task_started = time.perf_counter()
+                        try:
+                            target.builder(target.outputs)
+                            self._finish(target, self.state.input_hash(target), "built",
+                                         time.perf_counter() - task_started)
+                        except Exception as e:
+                            print(f"      {e}")
+                            self._finish(target, input_hash, "failed")
+                    else:
+                        print(f"   🔨 {target.name:<8} 开始构建")
+                        running[pool.submit(_run_target, target.builder, target.outputs)] = (target, input_hash)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    target, input_hash = running.pop(future)
+                    try:
+                        self._finish(target, input_hash, "built", future.result())
+                    except Exception as e:
+                        print(f"      {e}")
+                        self._finish(target, input_hash, "failed")
+
+        self.state.save()
+        elapsed = time.perf_counter() - started
+        counts = {status: sum(1 for s, _ in self.results.values() if s == status)
+                  for status in ("built", "skipped", "failed")}
+        print(f"\n🎉 构建结束：构建 {counts['built']}，跳过 {counts['skipped']}，"
+              f"失败 {counts['failed']}，总耗时 {elapsed:.2f} 秒")
+        return counts["failed"] == 0
+
+
+def resolve_targets(names):
+    """检查目标名称并按定义顺序排列；未指定时使用默认目标
+    不会自动加入依赖目标：未选中的依赖（如需浏览器登录的 cards）直接使用其现有输出"""
+    if not names:
+        return [name for name, target in TARGETS.items() if target.default]
+    unknown = [name for name in names if name not in TARGETS]
+    if unknown:
+        raise SystemExit(f"❌ 未知目标：{', '.join(unknown)}（可用：{', '.join(TARGETS)}）")
+    return [name for name in TARGETS if name in names]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀一键构建")
+    parser.add_argument("targets", nargs="*", help=f"要构建的目标（{' / '.join(TARGETS)}），默认 word sheet report")
+    parser.add_argument("--force", action="store_true", help="忽略输入哈希，全部重新构建")
+    parser.add_argument("--jobs", type=int, help="并行进程数（默认CPU核数）")
+    parser.add_argument("--list", action="store_true", help="只列出各目标状态")
+    args = parser.parse_args(argv)
+
+    names = resolve_targets(args.targets)
+    if args.list:
+        state = BuildState()
+        for name, target in TARGETS.items():
+            fresh = state.is_fresh(target, state.input_hash(target))
+            mark = "✅ 最新" if fresh else "🔨 需要构建"
+            default = "" if target.default else "（需显式指定）"
+            print(f"   {name:<8} {mark}{default}  → {', '.join(os.path.relpath(p, BASE_PATH) for p in target.outputs)}")
+        state.save()
+        return 0
+
+    print("=" * 50)
+    print(f"🌟 春秋杀一键构建：{' '.join(names)}")
+    print("=" * 50)
+    return 0 if Builder(names, force=args.force, jobs=args.jobs).run() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 卡牌目录聚合
+一次遍历完成分组与各组计数，并同时计算输入内容哈希。
+Word导出（cards_to_word.py）和综合汇报（comprehensive_report.py）共用这份聚合结果；
+两者的命令行入口在聚合哈希未变化时直接沿用上一次生成的文档。
+"""
+
+import hashlib
+import json
+import os
+
+from card_store import store_enabled, open_store, file_hash
+from card_loader import iter_cards
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+REPORT_CACHE_FILE = os.path.join(BASE_PATH, ".report_cache.json")
+
+
+class CardCatalogue:
+    """按分组聚合的卡牌目录（分组保持首次出现顺序）"""
+
+    def __init__(self):
+        self.groups = {}
+        # 各分组卡牌数（与 groups 顺序相同）
+        self.counts = {}
+        self.total = 0
+        self._digest = hashlib.sha1()
+
+    def add(self, card):
+        """加入一张卡牌：分组、计数与哈希在同一遍中更新"""
+        group = card.get("card_group")
+        cards = self.groups.get(group)
+        if cards is None:
+            cards = self.groups[group] = []
+            self.counts[group] = 0
+        cards.append(card)
+        self.counts[group] += 1
+        self.total += 1
+        self._digest.update(json.dumps(card, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        self._digest.update(b"\n")
+
+    @classmethod
+    def from_cards(cls, cards):
+        catalogue = cls()
+        for card in cards:
+            catalogue.add(card)
+        return catalogue
+
+    @classmethod
+    def load(cls, cards_file, errors=None):
+        """从卡牌库（CARD_STORE启用时）或cards.json流式加载；errors 收集无效记录"""
+        if store_enabled():
+            with open_store(cards_file) as store:
+                return cls.from_cards(store.all_cards())
+        return cls.from_cards(iter_cards(cards_file, errors=errors))
+
+    @property
+    def input_hash(self):
+        """聚合输入的内容哈希（卡牌内容与顺序）"""
+        return self._digest.hexdigest()
+
+    def cards(self, group):
+        return self.groups.get(group, [])
+
+    def count(self, group):
+        return self.counts.get(group, 0)
+
+    def share(self, group):
+        """该分组占全部卡牌的百分比"""
+        return self.count(group) / self.total * 100 if self.total else 0.0
+
+    def __len__(self):
+        return self.total
+
+
+def build_key(catalogue, *parts):
+    """报告的构建键：聚合哈希 + 生成器源码等其他会影响输出的因素"""
+    digest = hashlib.sha1(catalogue.input_hash.encode("ascii"))
+    for part in parts:
+        digest.update(b"\0" + str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def source_hash(module_file):
+    """生成器源码哈希：修改报告代码后自动重新生成"""
+    return file_hash(module_file)
+
+
+def _read_report_cache():
+    try:
+        with open(REPORT_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_report(kind, key):
+    """构建键未变化且文件仍存在时返回上一次生成的文档路径"""
+    entry = _read_report_cache().get(kind)
+    if entry and entry.get("key") == key and os.path.exists(entry.get("path", "")):
+        return entry["path"]
+    return None
+
+
+def record_report(kind, key, path):
+    """记录本次生成的文档"""
+    cache = _read_report_cache()
+    cache[kind] = {"key": key, "path": os.path.abspath(path)}
+    with open(REPORT_CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
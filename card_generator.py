@@ -1,127 +1,119 @@
 import json
 import asyncio
+import contextlib
+import hashlib
+import io
 import os
 import time
-import requests
-from PIL import Image, ImageDraw, ImageFont, ImageFilter
-from playwright.async_api import async_playwright
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from PIL import Image, ImageDraw, ImageFont
 from urllib.parse import urlparse
-import tempfile
+from color_logger import ColorLogger
+from run_log import RunLog
+from progress_display import ProgressDisplay
+from card_store import store_enabled, open_store
+from card_loader import load_cards, format_error
+from art_quality import ArtQualityGate
+from art_fit import fit_art, open_image
+from theme_registry import get_registry
+from memory_budget import MemoryBudget, MemoryMonitor
+from compositor import Layer, get_compositor
 
-class ColorLogger:
-    """炫酷的彩色日志输出类"""
-    
-    # ANSI颜色代码
-    COLORS = {
-        'RED': '\033[91m',
-        'GREEN': '\033[92m',
-        'YELLOW': '\033[93m',
-        'BLUE': '\033[94m',
-        'MAGENTA': '\033[95m',
-        'CYAN': '\033[96m',
-        'WHITE': '\033[97m',
-        'BOLD': '\033[1m',
-        'UNDERLINE': '\033[4m',
-        'END': '\033[0m'
-    }
-    
-    @classmethod
-    def _print_colored(cls, message, color='WHITE', style=''):
-        """打印彩色文本"""
-        color_code = cls.COLORS.get(color.upper(), cls.COLORS['WHITE'])
-        style_code = cls.COLORS.get(style.upper(), '')
-        print(f"{style_code}{color_code}{message}{cls.COLORS['END']}")
-    
-    @classmethod
-    def success(cls, message):
-        """成功信息 - 绿色"""
-        cls._print_colored(f"✅ {message}", 'GREEN', 'BOLD')
-    
-    @classmethod
-    def error(cls, message):
-        """错误信息 - 红色"""
-        cls._print_colored(f"❌ {message}", 'RED', 'BOLD')
-    
-    @classmethod
-    def warning(cls, message):
-        """警告信息 - 黄色"""
-        cls._print_colored(f"⚠️  {message}", 'YELLOW', 'BOLD')
-    
-    @classmethod
-    def info(cls, message):
-        """信息 - 蓝色"""
-        cls._print_colored(f"ℹ️  {message}", 'BLUE')
-    
-    @classmethod
-    def progress(cls, message):
-        """进度信息 - 青色"""
-        cls._print_colored(f"🚀 {message}", 'CYAN', 'BOLD')
-    
-    @classmethod
-    def generating(cls, message):
-        """生成中 - 洋红色"""
-        cls._print_colored(f"🎨 {message}", 'MAGENTA', 'BOLD')
-    
-    @classmethod
-    def download(cls, message):
-        """下载信息 - 绿色"""
-        cls._print_colored(f"📥 {message}", 'GREEN')
-    
-    @classmethod
-    def compose(cls, message):
-        """合成信息 - 黄色"""
-        cls._print_colored(f"🔧 {message}", 'YELLOW')
+# ================================================================
+# 设置从第几张卡牌开始生成（基于列表中的顺序，从1开始计数）
+# 修改此数字以从不同的卡牌开始，并会覆盖已生成的文件（batch_estimator 的预估使用同一设置）
+START_FROM_CARD = 12
+# ================================================================
+
+def select_cards(cards, start_from_card=START_FROM_CARD):
+    """本次要生成的卡牌：从第 start_from_card 张开始全部覆盖生成，不跳过已有图片"""
+    return list(cards[max(start_from_card, 1) - 1:])
+
+def smart_wrap_text(text, font, max_width):
+    """更智能的文本换行，正确处理中英文"""
+    lines = []
+    current_line = ""
+
+    for char in text:
+        if font.getlength(current_line + char) <= max_width:
+            current_line += char
+        else:
+            lines.append(current_line)
+            current_line = char
     
-    @classmethod
-    def header(cls, message):
-        """标题 - 粗体白色"""
-        cls._print_colored(f"\n{'='*50}", 'CYAN')
-        cls._print_colored(f"🌟 {message}", 'WHITE', 'BOLD')
-        cls._print_colored(f"{'='*50}", 'CYAN')
+    if current_line:
+        lines.append(current_line)
     
-    @classmethod
-    def progress_bar(cls, current, total, prefix="", suffix="", length=30):
-        """炫酷进度条"""
-        percent = int(100 * (current / total))
-        filled_length = int(length * current // total)
-        
-        # 创建进度条
-        bar_filled = '█' * filled_length
-        bar_empty = '░' * (length - filled_length)
-        bar = f"[{bar_filled}{bar_empty}]"
-        
-        # 创建彩色输出
-        color_code = cls.COLORS['CYAN']
-        bold_code = cls.COLORS['BOLD']
-        end_code = cls.COLORS['END']
-        
-        # 使用\r实现同行覆盖
-        progress_line = f"\r{bold_code}{color_code}🚀 {prefix} {bar} {percent}% {suffix}{end_code}"
-        print(progress_line, end='', flush=True)
+    # 获取字体高度
+    try:
+        line_height = font.getbbox("A")[3]
+    except AttributeError:
+        # 备用方案
+        line_height = font.getsize("A")[1]
+
+    return lines, line_height
 
 class CardGenerator:
-    def __init__(self):
+    def __init__(self, run_log=None, progress=None, image_backend=None, compositor=None):
         self.base_path = os.path.dirname(os.path.abspath(__file__))
         self.base_img_path = os.path.join(self.base_path, "Base_IMG")
         self.output_path = os.path.join(self.base_path, "Generated_Cards")
+        # AI原图存档：修改卡牌文字或模板后可直接重新合成，无需重新生成图片
+        self.art_path = os.path.join(self.base_path, "AI_Art")
         self.user_data_path = os.path.join(self.base_path, "browser_data")
         self.cookies_path = os.path.join(self.base_path, "cookies.json")
+        # 从第几张卡牌开始生成（见 START_FROM_CARD）
+        self.start_from_card = START_FROM_CARD
+        
+        # 阶段计时日志（生成卡牌时自动创建，自动创建的日志由 close() 关闭）
+        self.run_log = run_log
+        self._owns_run_log = False
+        # 多任务进度显示（整副卡牌进度 + 每张进行中的卡牌）
+        self.progress = progress or ProgressDisplay()
+        # 可选的SQLite卡牌库（CARD_STORE 环境变量启用），记录生成状态与原图哈希
+        self.store = None
+        # AI原图质量检查：不合格时重新生成，最多尝试 max_art_attempts 次
+        self.quality_gate = None
+        self.max_art_attempts = 3
+        # 可替换的图片后端：async (prompt, task_id) -> 图片字节；默认使用浏览器中的Copilot
+        self.image_backend = image_backend
+        # 主题色、卡牌类型图标与字形位图缓存（可用 themes.json 扩展）
+        self.themes = get_registry()
+        # 已解码的模板图片（按文件修改时间失效）
+        self._template_cache = None
+        # 图层合成后端："pillow"（默认）或 "numpy"，也可用 CARD_COMPOSITOR 环境变量选择
+        self.compositor = get_compositor(compositor)
+        # 可复用的合成缓冲（渐变遮罩等），按尺寸缓存
+        self._scratch = {}
         
         # 创建必要的目录
-        for path in [self.output_path, self.user_data_path]:
+        for path in [self.output_path, self.art_path, self.user_data_path]:
             if not os.path.exists(path):
                 os.makedirs(path)
+    
+    def _span(self, stage, **fields):
+        """阶段计时（未启用运行日志时不记录）"""
+        if self.run_log is None:
+            return contextlib.nullcontext({})
+        return self.run_log.span(stage, **fields)
     def load_cards_config(self):
         """读取卡牌配置文件"""
         config_path = os.path.join(self.base_path, "cards.json")
+        if store_enabled():
+            self.store = open_store(config_path)
+            cards_data = self.store.all_cards()
+            ColorLogger.success(f"从卡牌库加载 {len(cards_data)} 张卡牌配置")
+            return cards_data
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                cards_data = json.load(f)
-                ColorLogger.success(f"成功加载 {len(cards_data)} 张卡牌配置")
-                return cards_data
+            # 流式解析并逐条校验，单条错误只跳过该卡牌
+            cards_data, errors = load_cards(config_path)
         except Exception as e:
             ColorLogger.error(f"读取配置文件失败: {e}")
             return []
+        for error in errors:
+            ColorLogger.warning(f"跳过无效卡牌配置 {format_error(error)}")
+        ColorLogger.success(f"成功加载 {len(cards_data)} 张卡牌配置")
+        return cards_data
     
     async def save_cookies(self, context):
         """保存cookies"""
@@ -145,8 +137,8 @@ class CardGenerator:
             ColorLogger.error(f"加载Cookies失败: {e}")
         return False
     
-    async def generate_ai_image(self, prompt):
-        """使用Playwright生成AI图片"""
+    async def generate_ai_image(self, prompt, task_id=None):
+        """使用Playwright生成AI图片，返回图片字节（task_id 用于在进度面板中更新对应卡牌）"""
         # 添加总体提示词前缀
         base_prompt = "写实融合国风插画风格（参考《清明上河图》的精致线条感与《鬼谷八荒》的色彩层次）。整体色调偏复古，低饱和度，背景带有米黄羊皮纸质感。图片长宽比注意只能是1比1。生成字时请使用标准正楷字。"
         full_prompt = base_prompt + " " + prompt
@@ -154,17 +146,21 @@ class CardGenerator:
         ColorLogger.generating(f"正在生成AI图片...")
         ColorLogger.info(f"提示词: {prompt}")
         
+        # 浏览器相关依赖只在真正生成图片时导入，合成/重新合成等命令启动更快
+        from playwright.async_api import async_playwright
+        
         async with async_playwright() as p:
             # 启动浏览器，使用持久化用户数据目录
-            browser = await p.chromium.launch_persistent_context(
-                user_data_dir=self.user_data_path,
-                headless=False,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-web-security',
-                    '--disable-features=VizDisplayCompositor'
-                ]
-            )
+            with self._span("browser_launch"):
+                browser = await p.chromium.launch_persistent_context(
+                    user_data_dir=self.user_data_path,
+                    headless=False,
+                    args=[
+                        '--disable-blink-features=AutomationControlled',
+                        '--disable-web-security',
+                        '--disable-features=VizDisplayCompositor'
+                    ]
+                )
             
             try:
                 # 如果没有打开的页面，创建新页面
@@ -177,9 +173,10 @@ class CardGenerator:
                 current_url = page.url
                 if 'copilot.microsoft.com' not in current_url:
                     ColorLogger.info("导航到Copilot网站...")
-                    await page.goto("https://copilot.microsoft.com", timeout=60000)
-                    # 等待页面加载
-                    await page.wait_for_timeout(3000)
+                    with self._span("navigate"):
+                        await page.goto("https://copilot.microsoft.com", timeout=60000)
+                        # 等待页面加载
+                        await page.wait_for_timeout(3000)
                 
                 # 检查是否需要登录
                 try:
@@ -219,71 +216,75 @@ class CardGenerator:
                         ColorLogger.error("未找到输入框，请检查页面状态")
                         return None
                   # 清空输入框并输入新提示词
-                await page.fill(input_selector, "")
-                await page.type(input_selector, full_prompt, delay=50)
-                
-                # 发送消息
-                await page.keyboard.press('Enter')
-                
-                # 等待生成开始 - 检查是否有生成指示器
-                ColorLogger.progress("等待AI开始生成...")
-                try:
-                    await page.wait_for_selector('.size-3\\.5.rounded.bg-salmon-550', timeout=10000)
-                    ColorLogger.generating("检测到AI正在生成中...")
-                except:
-                    ColorLogger.info("未检测到生成指示器，继续等待...")
-                
-                # 等待生成完成 - 生成指示器消失
-                max_wait_time = 1000  # 最多等待2分钟
-                wait_interval = 2
-                waited_time = 0
-                
-                # 显示初始进度条
-                ColorLogger.progress_bar(0, max_wait_time, prefix="生成中...", suffix=f"(0s/{max_wait_time}s)")
+                with self._span("type_prompt", chars=len(full_prompt)):
+                    await page.fill(input_selector, "")
+                    await page.type(input_selector, full_prompt, delay=50)
+                    
+                    # 发送消息
+                    await page.keyboard.press('Enter')
                 
-                while waited_time < max_wait_time:
+                with self._span("wait_generation") as wait_span:
+                    # 等待生成开始 - 检查是否有生成指示器
+                    ColorLogger.progress("等待AI开始生成...")
                     try:
-                        # 检查是否还在生成
-                        generating_indicator = await page.query_selector('.size-3\\.5.rounded.bg-salmon-550')
-                        if not generating_indicator:
-                            ColorLogger.progress_bar(waited_time, max_wait_time, prefix="生成完成", suffix=f"({waited_time}s/{max_wait_time}s)")
-                            print()  # 换行
-                            ColorLogger.success("AI生成完成！")
-                            break
+                        await page.wait_for_selector('.size-3\\.5.rounded.bg-salmon-550', timeout=10000)
+                        ColorLogger.generating("检测到AI正在生成中...")
                     except:
-                        pass
+                        ColorLogger.info("未检测到生成指示器，继续等待...")
                     
-                    await page.wait_for_timeout(wait_interval * 1000)
-                    waited_time += wait_interval
-                    ColorLogger.progress_bar(waited_time, max_wait_time, prefix="生成中...", suffix=f"({waited_time}s/{max_wait_time}s)")
-                
-                # 如果超时，也要换行
-                if waited_time >= max_wait_time:
-                    print()  # 换行
-                    ColorLogger.warning("等待超时，但继续尝试查找图片...")
-                
-                # 等待图片出现
-                await page.wait_for_timeout(3000)
-                
-                # 查找生成的图片
-                img_selectors = [
-                    'div.w-full.max-w-96.rounded-2xl img',
-                    'img[alt*="生成"]',
-                    'img[alt*="Generated"]',
-                    'div.rounded-2xl img',
-                    'div[class*="aspect-auto"] img'
-                ]
+                    # 等待生成完成 - 生成指示器消失
+                    max_wait_time = 1000  # 最多等待2分钟
+                    wait_interval = 2
+                    waited_time = 0
+                    
+                    # 显示初始进度
+                    self.progress.update(task_id, 0, max_wait_time, note="生成中...")
+                    
+                    while waited_time < max_wait_time:
+                        try:
+                            # 检查是否还在生成
+                            generating_indicator = await page.query_selector('.size-3\\.5.rounded.bg-salmon-550')
+                            if not generating_indicator:
+                                self.progress.update(task_id, waited_time, note="生成完成")
+                                ColorLogger.success(f"AI生成完成！（{waited_time}s）")
+                                break
+                        except:
+                            pass
+                        
+                        await page.wait_for_timeout(wait_interval * 1000)
+                        waited_time += wait_interval
+                        self.progress.update(task_id, waited_time)
+                    
+                    if waited_time >= max_wait_time:
+                        ColorLogger.warning("等待超时，但继续尝试查找图片...")
+                        wait_span["status"] = "timeout"
                 
-                img_element = None
-                for selector in img_selectors:
-                    try:
-                        await page.wait_for_selector(selector, timeout=10000)
-                        img_elements = await page.query_selector_all(selector)
-                        if img_elements:
-                            img_element = img_elements[-1]  # 获取最新的图片
-                            break
-                    except:
-                        continue
+                with self._span("image_lookup") as lookup_span:
+                    # 等待图片出现
+                    await page.wait_for_timeout(3000)
+                    
+                    # 查找生成的图片
+                    img_selectors = [
+                        'div.w-full.max-w-96.rounded-2xl img',
+                        'img[alt*="生成"]',
+                        'img[alt*="Generated"]',
+                        'div.rounded-2xl img',
+                        'div[class*="aspect-auto"] img'
+                    ]
+                    
+                    img_element = None
+                    for selector in img_selectors:
+                        try:
+                            await page.wait_for_selector(selector, timeout=10000)
+                            img_elements = await page.query_selector_all(selector)
+                            if img_elements:
+                                img_element = img_elements[-1]  # 获取最新的图片
+                                break
+                        except:
+                            continue
+                    
+                    if not img_element:
+                        lookup_span["status"] = "not_found"
                 
                 if img_element:
                     img_url = await img_element.get_attribute('src')
@@ -307,7 +308,7 @@ class CardGenerator:
                 pass
     
     async def download_image(self, url):
-        """下载图片"""
+        """下载图片，返回图片的原始字节（不经过临时文件）"""
         try:
             # 处理相对URL
             if url.startswith('//'):
@@ -317,38 +318,77 @@ class CardGenerator:
             
             ColorLogger.download("正在下载图片...")
             
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
+            import requests
             
-            # 创建临时文件
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_file:
-                temp_file.write(response.content)
-                temp_path = temp_file.name
+            with self._span("download") as download_span:
+                response = requests.get(url, timeout=30)
+                response.raise_for_status()
+                download_span["bytes"] = len(response.content)
             
             ColorLogger.success(f"图片下载完成")
-            return temp_path
+            return response.content
             
         except Exception as e:
             ColorLogger.error(f"下载图片失败: {e}")
             return None
-    def compose_card(self, card_data, ai_image_path):
-        """合成最终卡牌（优化布局与融合效果）"""
+    def _template_stamp(self):
+        """模板文件的 (修改时间, 大小)，用于判断已解码的模板是否过期"""
+        names = ("background.png", "title.png", "introduce.png")
+        paths = [os.path.join(self.base_img_path, name) for name in names]
+        return paths, tuple((os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+    
+    def _templates(self):
+        """模板图片 (background, title, introduce)；文件未变化时复用已解码的图片"""
+        paths, stamp = self._template_stamp()
+        if self._template_cache is None or self._template_cache[0] != stamp:
+            images = []
+            for path in paths:
+                with Image.open(path) as image:
+                    image.load()
+                    images.append(image.copy())
+            self._template_cache = (stamp, tuple(images))
+        return self._template_cache[1]
+    
+    def adopt_templates(self, images, stamp):
+        """使用外部已解码的模板（例如共享内存中的只读图片）；模板文件变化后仍会从磁盘重新加载"""
+        self._template_cache = (stamp, tuple(images))
+    
+    def _fade_mask(self, width, height, fade_height):
+        """AI图片的上下渐变遮罩：与逐行粘贴时每行的alpha相同，按尺寸缓存"""
+        key = (width, height, fade_height)
+        mask = self._scratch.get(key)
+        if mask is None:
+            mask = Image.new('L', (width, height), 255)
+            for i in range(fade_height):
+                # 上边缘alpha从0（透明）渐变到255（不透明），下边缘相反
+                mask.paste(int(255 * (i / (fade_height - 1))), (0, i, width, i + 1))
+            for i in range(fade_height):
+                alpha = int(255 * ((fade_height - 1 - i) / (fade_height - 1)))
+                source_y = height - fade_height + i
+                mask.paste(alpha, (0, source_y, width, source_y + 1))
+            self._scratch[key] = mask
+        return mask
+    
+    def compose_card(self, card_data, ai_image):
+        """合成最终卡牌（优化布局与融合效果）
+        ai_image 可以是文件路径、图片字节或PIL图片，返回合成后的PIL图片（失败时返回None）"""
         try:
             ColorLogger.compose("开始合成卡牌...")
             
-            # 加载基础图片
-            background = Image.open(os.path.join(self.base_img_path, "background.png"))
-            title = Image.open(os.path.join(self.base_img_path, "title.png"))
-            introduce = Image.open(os.path.join(self.base_img_path, "introduce.png"))
+            # 加载基础图片（已缓存）
+            background, title, introduce = self._templates()
             
             # 加载AI生成的图片
-            if ai_image_path and os.path.exists(ai_image_path):
-                ai_image = Image.open(ai_image_path)
-                ColorLogger.success("AI图片加载成功")
-            else:
+            if isinstance(ai_image, (str, os.PathLike)) and not os.path.exists(ai_image):
+                ai_image = None
+            if ai_image is None:
                 ColorLogger.error("AI图片不存在，跳过合成")
                 return None
-            final_card = background.copy()
+            owns_source = not isinstance(ai_image, Image.Image)
+            ai_image = open_image(ai_image)
+            ColorLogger.success("AI图片加载成功")
+            # 标题栏、底栏与AI图片按顺序叠加到背景上，由合成后端一次完成
+            layers = []
             bg_width, bg_height = background.size
             title_width, title_height = title.size
             intro_width, intro_height = introduce.size            
@@ -371,165 +411,63 @@ class CardGenerator:
             # title位置：基于实际内容居中，再往下20px
             title_x = (bg_width - title_content_width) // 2 - title_content_bbox[0]
             title_y = 50  # 原30+20
-            if title.mode == 'RGBA':
-                final_card.paste(title, (title_x, title_y), title)
-            else:
-                final_card.paste(title, (title_x, title_y))
+            layers.append(Layer(title, (title_x, title_y), title if title.mode == 'RGBA' else None, static=True))
 
             ColorLogger.compose("处理AI图片尺寸...")
             
-            # AI图片处理：进一步缩小尺寸，避免图片过大
-            original_width, original_height = ai_image.size
-            
-            # 计算合适的尺寸：适应卡牌宽度，左侧收窄3px
-            available_width = bg_width - 85  # 左边距44px，右边距41px
-            
-            if original_width > available_width:
-                # 需要缩放以适应宽度
-                scale = available_width / original_width
-                final_target_width = available_width
-                final_target_height = int(original_height * scale)
-                ai_image_resized = ai_image.resize((final_target_width, final_target_height), Image.Resampling.LANCZOS)
-                crop_width = final_target_width
-            else:
-                # 原图已经够小，缩小更多
-                final_target_width = int(original_width * 0.75)  # 缩小到75%
-                final_target_height = int(original_height * 0.75)
-                ai_image_resized = ai_image.resize((final_target_width, final_target_height), Image.Resampling.LANCZOS)
-                crop_width = final_target_width
-            
-            # 无需额外裁剪，直接使用处理后的图片
-            ai_image_cropped = ai_image_resized
-            
-            # 添加轻微高斯模糊
-            ai_image_blurred = ai_image_cropped.filter(ImageFilter.GaussianBlur(radius=0.8))
+            # AI图片区域：宽度适应卡牌（左边距44px，右边距41px），1:1，但不能超过底栏上沿
+            available_width = bg_width - 85
+            ai_y = title_y + title_height + 20
+            intro_y = bg_height - intro_height - 20
+            final_target_width = available_width
+            final_target_height = min(available_width, intro_y - ai_y)
+            crop_width = final_target_width
+
+            # 去掉边框/黑边，按区域长宽比智能裁切并缩放到精确尺寸，同时添加轻微高斯模糊
+            # 只对本函数打开的图片使用JPEG缩小解码，调用方传入的图片对象不做修改
+            ai_image_blurred, fit_info = fit_art(
+                ai_image, (final_target_width, final_target_height), blur=0.8, draft=owns_source,
+            )
+            if fit_info["crop"] != (0, 0) + ai_image.size:
+                ColorLogger.compose(f"AI图片裁切: {ai_image.size[0]}x{ai_image.size[1]} → 区域 {fit_info['crop']}")
+            # 原图只在缩放前需要，由本函数打开的立即释放解码后的像素
+            if owns_source and ai_image is not ai_image_blurred:
+                ai_image.close()
+            ai_image = None
               
             # 向右偏移定位（准备渐变粘贴）
             ai_x = (bg_width - crop_width) // 2 + 3  # 向右偏移3px
-            ai_y = title_y + title_height + 20
             # 注意：AI图片不在这里直接粘贴，而是通过下面的渐变融合方式
 
             # introduce粘贴
             intro_x = (bg_width - intro_width) // 2
-            intro_y = bg_height - intro_height - 20
-            if introduce.mode == 'RGBA':
-                final_card.paste(introduce, (intro_x, intro_y), introduce)
-            else:
-                final_card.paste(introduce, (intro_x, intro_y))            
+            layers.append(Layer(introduce, (intro_x, intro_y), introduce if introduce.mode == 'RGBA' else None, static=True))
                 
             ColorLogger.compose("应用渐变融合效果...")
             
             # --- 创建平滑的渐变融合效果：消除割裂感 ---
-            # 不再使用模糊带，而是使用alpha渐变来实现平滑融合
-            
-            # 先移除AI图片的直接粘贴，改为分段渐变粘贴
+            # 上下边缘各 fade_height 行从透明渐变到不透明，中间主体不透明；
+            # 渐变遮罩按尺寸缓存复用，整张AI图片一次粘贴，不再逐行裁切
             fade_height = 20  # 渐变区域高度
-            
-            # 1. 粘贴AI图片的中间主体部分（非渐变区域）
-            middle_start = fade_height
-            middle_end = final_target_height - fade_height
-            if middle_end > middle_start:
-                middle_section = ai_image_blurred.crop((0, middle_start, crop_width, middle_end))
-                final_card.paste(middle_section, (ai_x, ai_y + middle_start))
-            
-            # 2. 创建上边缘渐变融合（从透明到不透明）
-            for i in range(fade_height):
-                # alpha值从0（透明）渐变到255（不透明）
-                alpha = int(255 * (i / (fade_height - 1)))
-                
-                # 提取AI图片的一行像素
-                line = ai_image_blurred.crop((0, i, crop_width, i + 1))
-                
-                # 创建渐变alpha遮罩
-                mask = Image.new('L', (crop_width, 1), alpha)
-                
-                # 应用alpha遮罩并粘贴
-                final_card.paste(line, (ai_x, ai_y + i), mask)
-            
-            # 3. 创建下边缘渐变融合（从不透明到透明）
-            for i in range(fade_height):
-                # alpha值从255（不透明）渐变到0（透明）
-                alpha = int(255 * ((fade_height - 1 - i) / (fade_height - 1)))
-                
-                # 提取AI图片底部的一行像素
-                source_y = final_target_height - fade_height + i
-                line = ai_image_blurred.crop((0, source_y, crop_width, source_y + 1))
-                
-                # 创建渐变alpha遮罩
-                mask = Image.new('L', (crop_width, 1), alpha)
-                
-                # 应用alpha遮罩并粘贴
-                final_card.paste(line, (ai_x, ai_y + source_y), mask)
+            mask = self._fade_mask(crop_width, final_target_height, fade_height)
+            layers.append(Layer(ai_image_blurred, (ai_x, ai_y), mask))
+            final_card = self.compositor.composite(background, layers)
+            ai_image_blurred.close()
 
             ColorLogger.compose("添加文字信息...")
             
             # --- 文字 ---
             draw = ImageDraw.Draw(final_card)
-            # 字体更大
-            try:
-                font_title = ImageFont.truetype("simhei.ttf", 44)
-                font_desc = ImageFont.truetype("simhei.ttf", 24)  # 稍微小一点，为了更好布局
-                # 尝试加载支持emoji的字体
-                try:
-                    font_emoji = ImageFont.truetype("seguiemj.ttf", 40)  # Windows emoji字体
-                except:
-                    try:
-                        font_emoji = ImageFont.truetype("NotoColorEmoji.ttf", 40)  # Linux emoji字体
-                    except:
-                        font_emoji = font_title  # 回退到标题字体
-            except:
-                try:
-                    font_title = ImageFont.truetype("arial.ttf", 44)
-                    font_desc = ImageFont.truetype("arial.ttf", 24)
-                    font_emoji = font_title
-                except:
-                    font_title = ImageFont.load_default()
-                    font_desc = ImageFont.load_default()
-                    font_emoji = font_title
-
-            # 卡牌类型emoji映射
-            card_type_emojis = {
-                "国家卡": "🏰",
-                "思想卡": "🧠", 
-                "变法卡": "⚖️",
-                "连锁卡": "🔗",
-                "军事卡": "⚔️",
-                "经济卡": "💰",
-                "道具卡": "🎁",
-                "锦囊牌": "📜",
-                "祭祀卡": "🙏"
-            }
+            # 字体、卡牌类型emoji与主题色都由注册表解析（进程内只加载一次）
+            font_title, font_desc, _ = self.themes.fonts()
             
             # 获取卡牌类型和对应emoji
             card_group = card_data.get('card_group', '')
-            emoji = card_type_emojis.get(card_group, '')
+            emoji = self.themes.group_emoji(card_group)
             
-            # 根据卡牌主题色确定emoji颜色（使用更和谐的颜色）
+            # 根据卡牌主题色确定emoji颜色
             color_theme = card_data.get('color_theme', '')
-            
-            # 使用更温和、更协调的颜色方案
-            if '黑金' in color_theme or '墨' in color_theme:
-                emoji_color = '#FFD700'  # 亮金色
-            elif '深红' in color_theme or '红' in color_theme:
-                emoji_color = '#DC143C'  # 猩红色
-            elif '蓝' in color_theme:
-                emoji_color = '#4169E1'  # 皇家蓝
-            elif '银' in color_theme or '灰' in color_theme:
-                emoji_color = '#C0C0C0'  # 银色
-            elif '紫' in color_theme:
-                emoji_color = '#9370DB'  # 中紫色
-            elif '绿' in color_theme:
-                emoji_color = '#32CD32'  # 柠檬绿
-            elif '橙' in color_theme:
-                emoji_color = '#FF8C00'  # 暗橙色
-            elif '古铜' in color_theme or '褐' in color_theme:
-                emoji_color = '#CD853F'  # 秘鲁色
-            elif '青' in color_theme:
-                emoji_color = '#40E0D0'  # 绿松石色
-            elif '黄' in color_theme:
-                emoji_color = '#FFD700'  # 金色
-            else:
-                emoji_color = '#F0E68C'  # 卡其色（温和的默认色）
+            emoji_color = self.themes.emoji_color(color_theme)
             
             # 卡牌名称和图标布局优化
             card_name = card_data.get('card_name', '')
@@ -552,9 +490,9 @@ class CardGenerator:
             
             # 如果有emoji，在文字右边绘制
             if emoji:
-                emoji_bbox = draw.textbbox((0, 0), emoji, font=font_emoji)
-                emoji_width = emoji_bbox[2] - emoji_bbox[0]
-                emoji_height = emoji_bbox[3] - emoji_bbox[1]
+                # 预渲染的字形位图（同一emoji与颜色只渲染一次）
+                glyph = self.themes.glyph(emoji, emoji_color)
+                emoji_height = glyph.height
                 
                 # emoji位置：文字右边 + 间距
                 emoji_spacing = 15  # 增加间距避免重叠
@@ -564,8 +502,8 @@ class CardGenerator:
                 emoji_y_offset = 10  # 手动偏移量，向下调整17像素
                 emoji_y = title_content_center_y - emoji_height // 2 + emoji_y_offset
                 
-                # 绘制emoji
-                draw.text((emoji_x, emoji_y), emoji, fill=emoji_color, font=font_emoji)
+                # 粘贴emoji字形
+                self.themes.paste_glyph(final_card, glyph, (emoji_x, emoji_y))
                 
                 ColorLogger.compose(f"添加卡牌标题: {card_name} {emoji} (颜色: {emoji_color})")
                 ColorLogger.compose(f"布局 - 文字位置: ({name_x}, {name_y}), emoji位置: ({emoji_x}, {emoji_y}) [向下偏移: {emoji_y_offset}px]")
@@ -584,32 +522,7 @@ class CardGenerator:
             
             ColorLogger.compose(f"底栏可用宽度: {available_text_width}px (总宽度: {intro_width}px, 边距: {text_margin}px)")
             
-            # 智能换行
-            def smart_wrap_text(text, font, max_width):
-                """更智能的文本换行，正确处理中英文"""
-                lines = []
-                current_line = ""
-
-                for char in text:
-                    if font.getlength(current_line + char) <= max_width:
-                        current_line += char
-                    else:
-                        lines.append(current_line)
-                        current_line = char
-                
-                if current_line:
-                    lines.append(current_line)
-                
-                # 获取字体高度
-                try:
-                    line_height = font.getbbox("A")[3]
-                except AttributeError:
-                    # 备用方案
-                    line_height = font.getsize("A")[1]
-
-                return lines, line_height
-
-            # 根据计算出的可用宽度进行换行
+            # 根据计算出的可用宽度进行智能换行
             description_lines, line_height = smart_wrap_text(description, font_desc, available_text_width)
             
             # 计算文字总高度
@@ -629,7 +542,8 @@ class CardGenerator:
                 available_x_width = intro_width - (text_margin * 2)
                 line_x = available_x_start + (available_x_width - line_width) // 2
                 
-                ColorLogger.compose(f"第{i+1}行文字位置: x={line_x}, 宽度={line_width}, 边距区域={available_x_start}-{available_x_start + available_x_width}")
+                if ColorLogger.is_enabled('compose'):
+                    ColorLogger.compose(f"第{i+1}行文字位置: x={line_x}, 宽度={line_width}, 边距区域={available_x_start}-{available_x_start + available_x_width}")
                 
                 # 确保不超出边界（双重保护）
                 if line_x < intro_x + text_margin:
@@ -651,85 +565,265 @@ class CardGenerator:
     async def generate_single_card(self, card_data):
         """生成单张卡牌"""
         card_name = card_data.get('card_name', 'unknown')
-        ai_prompt = card_data.get('ai_prompt', '')
         
         ColorLogger.header(f"开始生成卡牌: {card_name}")
         
-        # 生成AI图片
-        ai_image_path = await self.generate_ai_image(ai_prompt)
+        if self.run_log is None:
+            self.run_log = RunLog()
+            self._owns_run_log = True
+        
+        self.progress.add_task(card_name, card_name)
+        output_path = None
+        try:
+            with self.run_log.card(card_name) as card_span:
+                output_path = await self._generate_single_card(card_data)
+                if not output_path:
+                    card_span["status"] = "failed"
+        finally:
+            self.progress.finish_task(card_name, ok=bool(output_path))
+        return output_path
+    
+    async def _generate_single_card(self, card_data):
+        """生成单张卡牌（各阶段计入当前卡牌的运行日志）"""
+        card_name = card_data.get('card_name', 'unknown')
+        ai_prompt = card_data.get('ai_prompt', '')
+        
+        # 生成AI图片（质量检查不合格时重新生成），下载结果直接在内存中合成
+        ai_art = await self.generate_checked_image(ai_prompt, card_name)
+        art_hash = hashlib.sha1(ai_art).hexdigest() if ai_art and self.store is not None else None
         
-        if ai_image_path:
+        if ai_art:
             # 合成最终卡牌
-            final_card = self.compose_card(card_data, ai_image_path)
+            with self._span("compose") as compose_span:
+                final_card = self.compose_card(card_data, ai_art)
+                if not final_card:
+                    compose_span["status"] = "failed"
             
             if final_card:
                 # 保存卡牌
                 output_filename = f"{card_name}.png"
                 output_path = os.path.join(self.output_path, output_filename)
-                final_card.save(output_path, 'PNG')
+                with self._span("save"), final_card:
+                    self.save_card(final_card, output_path)
                 ColorLogger.success(f"卡牌生成完成: {output_path}")
+                self._record_generation(card_data, "done", art_hash, output_path)
                 
-                # 清理临时文件
+                # 写入AI原图存档
                 try:
-                    os.unlink(ai_image_path)
-                    ColorLogger.info("临时文件已清理")
-                except:
-                    pass
+                    self.archive_art(card_name, ai_art)
+                    ColorLogger.info("AI原图已存档")
+                except OSError as e:
+                    ColorLogger.warning(f"AI原图存档失败: {e}")
                 
                 return output_path
             else:
                 ColorLogger.error(f"卡牌 {card_name} 合成失败")
+                self._record_generation(card_data, "compose_failed", art_hash)
         else:
             ColorLogger.error(f"卡牌 {card_name} AI图片生成失败")
+            self._record_generation(card_data, "image_failed")
         
         return None
     
+    async def generate_checked_image(self, prompt, card_name):
+        """生成AI图片并做质量检查；不合格的图片丢弃后重新生成"""
+        if self.quality_gate is None:
+            self.quality_gate = ArtQualityGate()
+            self.quality_gate.seed_from_dir(self.art_path)
+        
+        for attempt in range(1, self.max_art_attempts + 1):
+            ai_art = await (self.image_backend or self.generate_ai_image)(prompt, task_id=card_name)
+            if not ai_art:
+                return None
+            with self._span("quality_gate", attempt=attempt) as gate_span:
+                result = self.quality_gate.check(ai_art)
+                gate_span.update(result.metrics)
+                if not result.ok:
+                    gate_span["status"] = "rejected"
+            if result.ok:
+                self.quality_gate.accept(result, card_name)
+                return ai_art
+            
+            ColorLogger.warning(f"AI图片未通过质量检查（第{attempt}次）：{'；'.join(result.reasons)}")
+            if attempt < self.max_art_attempts:
+                ColorLogger.info("重新生成图片...")
+        
+        ColorLogger.error(f"连续 {self.max_art_attempts} 次未通过质量检查，放弃卡牌 {card_name}")
+        return None
+    
+    def art_file(self, card_name):
+        """卡牌的AI原图存档路径"""
+        return os.path.join(self.art_path, f"{card_name}.png")
+    
+    def archive_art(self, card_name, data):
+        """原子地写入AI原图存档（先写临时文件再替换）"""
+        path = self.art_file(card_name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return path
+    
+    def save_card(self, final_card, output_path):
+        """原子地保存卡牌PNG：共享目录中的读者不会看到写了一半的文件"""
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        final_card.save(temp_path, 'PNG')
+        os.replace(temp_path, output_path)
+    
+    def compose_to_bytes(self, card_data, ai_image, format="PNG", **save_options):
+        """在内存中合成卡牌并编码，返回图片字节（失败时返回None），不读写任何临时文件"""
+        final_card = self.compose_card(card_data, ai_image)
+        if final_card is None:
+            return None
+        with final_card:
+            buffer = io.BytesIO()
+            final_card.save(buffer, format, **save_options)
+        return buffer.getvalue()
+    
+    def compose_stream(self, jobs, format=None, workers=1, memory_limit=None, **save_options):
+        """流式批量合成：jobs 为 (卡牌数据, AI图片) 可迭代对象，按完成顺序产出 (序号, 结果)
+        format 为空时结果是PIL图片（由调用方负责关闭），否则是编码后的字节；
+        同时进行的任务不超过 workers 个，进程内存超过 memory_limit（MB）时等进行中的任务完成后再提交"""
+        def compose(job):
+            card_data, ai_image = job
+            if format:
+                return self.compose_to_bytes(card_data, ai_image, format, **save_options)
+            return self.compose_card(card_data, ai_image)
+        
+        # 模板在并行前加载一次，各线程共用
+        self._templates()
+        if workers <= 1:
+            # 逐张合成：同一时间只有一张卡牌的图片在内存中
+            for index, job in enumerate(jobs):
+                yield index, compose(job)
+            return
+        
+        budget = MemoryBudget(memory_limit)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            for index, job in enumerate(jobs):
+                while pending and (len(pending) >= workers or budget.exceeded()):
+                    if len(pending) < workers:
+                        budget.throttled += 1
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+                pending[pool.submit(compose, job)] = index
+            for future in as_completed(list(pending)):
+                yield pending.pop(future), future.result()
+        if budget.throttled:
+            ColorLogger.warning(f"内存超过上限 {memory_limit} MB，{budget.throttled} 次暂停提交新的合成任务")
+    
+    def compose_batch(self, jobs, format=None, workers=1, memory_limit=None, **save_options):
+        """批量合成：jobs 为 (卡牌数据, AI图片) 序列，按顺序返回结果列表
+        format 为空时返回PIL图片，否则返回编码后的字节；workers>1 时用线程并行（缩放与编码会释放GIL）"""
+        jobs = list(jobs)
+        results = [None] * len(jobs)
+        for index, result in self.compose_stream(jobs, format, workers, memory_limit, **save_options):
+            results[index] = result
+        return results
+    
+    def recompose_all(self, cards, workers=1, memory_limit=None):
+        """用存档的AI原图批量重新合成并保存，每张卡牌保存后立即释放；返回 (成功数, 内存峰值MB)
+        不保留任何合成结果，内存占用只取决于同时进行的任务数，与卡牌总数无关"""
+        cards = [card for card in cards if os.path.exists(self.art_file(card.get('card_name', 'unknown')))]
+        jobs = ((card, self.art_file(card['card_name'])) for card in cards)
+        done = 0
+        with MemoryMonitor() as monitor:
+            for index, final_card in self.compose_stream(jobs, workers=workers, memory_limit=memory_limit):
+                card_data = cards[index]
+                if final_card is None:
+                    ColorLogger.error(f"卡牌 {card_data['card_name']} 合成失败")
+                    continue
+                with final_card:
+                    output_path = os.path.join(self.output_path, f"{card_data['card_name']}.png")
+                    self.save_card(final_card, output_path)
+                self._record_generation(card_data, "done", output_path=output_path)
+                done += 1
+        if monitor.peak is not None:
+            ColorLogger.info(f"内存峰值 {monitor.peak_mb:.0f} MB（开始时 {monitor.start_mb:.0f} MB）")
+        return done, monitor.peak_mb
+    
+    def recompose_card(self, card_data, art_path=None):
+        """用存档的AI原图重新合成卡牌（不启动浏览器），返回输出路径"""
+        card_name = card_data.get('card_name', 'unknown')
+        art_path = art_path or self.art_file(card_name)
+        if not os.path.exists(art_path):
+            ColorLogger.warning(f"卡牌 {card_name} 没有存档的AI原图，无法重新合成")
+            return None
+        
+        with self._span("compose", card=card_name) as compose_span:
+            final_card = self.compose_card(card_data, art_path)
+            if not final_card:
+                compose_span["status"] = "failed"
+                return None
+        output_path = os.path.join(self.output_path, f"{card_name}.png")
+        with self._span("save", card=card_name), final_card:
+            self.save_card(final_card, output_path)
+        self._record_generation(card_data, "done", output_path=output_path)
+        return output_path
+    
+    def _record_generation(self, card_data, status, art_hash=None, output_path=None):
+        """写入卡牌库中的生成状态（未启用卡牌库时忽略）"""
+        if self.store is None:
+            return
+        try:
+            self.store.record_generation(card_data, status, art_hash=art_hash, output_path=output_path)
+        except Exception as e:
+            ColorLogger.warning(f"记录生成状态失败: {e}")
+    
+    def close(self):
+        """关闭生成器自己创建的运行日志（外部传入的日志由调用方关闭）"""
+        if self._owns_run_log and self.run_log is not None:
+            self.run_log.close()
+            self.run_log = None
+            self._owns_run_log = False
+    
     async def generate_all_cards(self):
-        """生成所有卡牌"""
+        """生成所有卡牌，全部成功时返回True（结束时关闭运行日志）"""
+        try:
+            return await self._generate_all_cards()
+        finally:
+            self.close()
+    
+    async def _generate_all_cards(self):
         cards_to_generate = self.load_cards_config()
         if not cards_to_generate:
             ColorLogger.error("没有要生成的卡牌，程序退出")
-            return
+            return False
 
-        # ================================================================
-        # 设置从第几张卡牌开始生成（基于列表中的顺序，从1开始计数）
-        # 修改此数字以从不同的卡牌开始，并会覆盖已生成的文件
-        start_from_card = 12 
-        # ================================================================
-        
+        start_from_card = self.start_from_card
         total_cards = len(cards_to_generate)
         if start_from_card > total_cards:
             ColorLogger.error(f"起始卡牌号 ({start_from_card}) 大于总卡牌数 ({total_cards})，程序退出。")
-            return
+            return False
 
         ColorLogger.header(f"将从第 {start_from_card} 张卡牌开始覆盖生成，直到第 {total_cards} 张。")
         
         generated_count = 0
+        planned = select_cards(cards_to_generate, start_from_card)
+        cards_to_process_count = len(planned)
+        self.progress.start_batch(cards_to_process_count)
         
-        # 使用1-based的索引来方便匹配 start_from_card
-        for i, card_data in enumerate(cards_to_generate, 1):
-            # 如果当前卡牌编号小于指定的起始编号，则跳过
-            if i < start_from_card:
-                continue
-
+        # 使用1-based的卡牌编号，与 start_from_card 一致
+        for i, card_data in enumerate(planned, max(start_from_card, 1)):
             card_name = card_data.get("card_name", f"未知卡牌_{i}")
             ColorLogger.header(f"正在处理卡牌 {i}/{total_cards}: {card_name}")
 
             try:
-                await self.generate_single_card(card_data)
-                generated_count += 1
-                ColorLogger.success(f"成功生成或覆盖卡牌: {card_name}")
+                if await self.generate_single_card(card_data):
+                    generated_count += 1
+                    ColorLogger.success(f"成功生成或覆盖卡牌: {card_name}")
             except Exception as e:
                 ColorLogger.error(f"生成卡牌 '{card_name}' 时发生错误: {e}")
                 ColorLogger.warning("将在5秒后继续处理下一张卡牌...")
                 await asyncio.sleep(5)
-            
-            # 计算并显示本次任务的进度
-            cards_to_process_count = total_cards - start_from_card + 1
-            current_card_in_task = i - start_from_card + 1
-            ColorLogger.header(f"本次任务进度: {current_card_in_task}/{cards_to_process_count}")
 
+        self.progress.close()
         ColorLogger.header(f"生成完成！本次任务成功生成/覆盖 {generated_count} 张卡牌")
+        if self.run_log is not None:
+            ColorLogger.info(f"阶段耗时日志: {self.run_log.path}（使用 python run_log.py summary 查看汇总）")
+        return generated_count == cards_to_process_count
 
 async def main():
     generator = CardGenerator()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 流式卡牌目录加载器
+按块增量解析 cards.json 顶层数组，逐条校验字段后惰性产出卡牌。
+单条记录格式错误或缺少必填字段只会跳过该条并报告其行列位置，不会导致整个目录加载失败；
+内存占用只与单条记录和读取块大小有关，10万张卡牌的目录也能平稳处理。
+
+用法：
+    python card_loader.py validate [cards.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import namedtuple
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# 字段 -> (类型, 是否必填)
+CARD_SCHEMA = {
+    "card_name": (str, True),
+    "card_group": (str, True),
+    "color_theme": (str, False),
+    "ai_prompt": (str, False),
+    "description": (str, False),
+    "price": (str, False),
+}
+
+CardLoadError = namedtuple("CardLoadError", ["index", "line", "column", "message"])
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def validate_card(card):
+    """按 CARD_SCHEMA 校验一条卡牌记录，返回错误信息列表"""
+    if not isinstance(card, dict):
+        return [f"记录应为对象，实际为 {type(card).__name__}"]
+    problems = []
+    for field, (expected, required) in CARD_SCHEMA.items():
+        if field not in card:
+            if required:
+                problems.append(f"缺少必填字段 {field}")
+            continue
+        value = card[field]
+        if not isinstance(value, expected):
+            problems.append(f"字段 {field} 应为 {expected.__name__}，实际为 {type(value).__name__}")
+        elif required and not value.strip():
+            problems.append(f"必填字段 {field} 为空")
+    return problems
+
+
+def _find_element_end(text, start):
+    """从start开始扫描一个完整的JSON值（跟踪括号深度与字符串），返回结束位置；不完整时返回None"""
+    depth = 0
+    in_string = False
+    escaped = False
+    i = start
+    length = len(text)
+    while i < length:
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            depth -= 1
+            if depth <= 0:
+                return i + 1
+        elif ch == "," and depth == 0:
+            return i
+        i += 1
+    return None
+
+
+class CardStreamReader:
+    """增量解析卡牌数组的读取器"""
+
+    def __init__(self, path, chunk_size=1 << 16, validate=True):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.validate = validate
+        self.errors = []
+        self.loaded = 0
+
+    # ---- 缓冲区与行列跟踪 ----
+
+    def _fill(self):
+        """读取下一块；文件结束时返回False"""
+        # 已处理的部分超过一个块时压缩缓冲区，避免反复复制整个缓冲区
+        if self._pos > self.chunk_size:
+            self._buffer = self._buffer[self._pos:]
+            self._line_start -= self._pos
+            self._pos = 0
+        chunk = self._file.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def _advance(self, new_pos):
+        """前移当前位置并更新行号"""
+        buffer = self._buffer
+        newlines = buffer.count("\n", self._pos, new_pos)
+        if newlines:
+            self._line += newlines
+            self._line_start = buffer.rfind("\n", self._pos, new_pos) + 1
+        self._pos = new_pos
+
+    def _location(self, offset):
+        """缓冲区位置 -> (行, 列)"""
+        buffer = self._buffer
+        newlines = buffer.count("\n", self._pos, offset)
+        if newlines:
+            return self._line + newlines, offset - buffer.rfind("\n", self._pos, offset)
+        return self._line, offset - self._line_start + 1
+
+    def _error(self, index, offset, message):
+        line, column = self._location(offset)
+        self.errors.append(CardLoadError(index, line, column, message))
+
+    def _skip(self, chars):
+        """跳过指定字符，必要时补读；返回是否还有内容"""
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            length = len(buffer)
+            while pos < length and buffer[pos] in chars:
+                pos += 1
+            self._advance(pos)
+            if pos < length:
+                return True
+            if self._eof or not self._fill():
+                return False
+
+    # ---- 解析 ----
+
+    def __iter__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._line = 1
+        self._line_start = 0
+        self._eof = False
+        with open(self.path, "r", encoding="utf-8-sig") as self._file:
+            # 定位顶层数组的起始 '['
+            if not self._skip(_WHITESPACE) or self._buffer[self._pos] != "[":
+                self._error(None, self._pos, "cards.json 顶层应为数组")
+                return
+            self._advance(self._pos + 1)
+
+            index = 0
+            while True:
+                if not self._skip(_WHITESPACE + ","):
+                    self._error(index, self._pos, "文件意外结束，缺少结尾的 ]")
+                    return
+                if self._buffer[self._pos] == "]":
+                    return
+
+                start = self._pos
+                try:
+                    card, end = _decoder.raw_decode(self._buffer, start)
+                except json.JSONDecodeError as e:
+                    end = _find_element_end(self._buffer, start)
+                    if end is None and not self._eof:
+                        # 记录尚未读完，继续读取
+                        self._fill()
+                        continue
+                    # 记录完整但格式错误：报告位置后跳过该条
+                    self._error(index, e.pos, f"JSON格式错误: {e.msg}")
+                    if end is None:
+                        return
+                    self._advance(end)
+                    index += 1
+                    continue
+
+                if end >= len(self._buffer) and not self._eof and not isinstance(card, (dict, list)):
+                    # 标量可能被块边界截断（如数字），补读后重新解析
+                    self._fill()
+                    continue
+
+                problems = validate_card(card) if self.validate else []
+                if problems:
+                    self._error(index, start, "；".join(problems))
+                else:
+                    self.loaded += 1
+                    yield card
+                self._advance(end)
+                index += 1
+
+
+def iter_cards(path, errors=None, chunk_size=1 << 16, validate=True):
+    """惰性产出通过校验的卡牌；errors 列表（如提供）会收集所有错误"""
+    reader = CardStreamReader(path, chunk_size=chunk_size, validate=validate)
+    try:
+        yield from reader
+    finally:
+        if errors is not None:
+            errors.extend(reader.errors)
+
+
+def load_cards(path, chunk_size=1 << 16):
+    """读取整个目录，返回 (卡牌列表, 错误列表)"""
+    errors = []
+    cards = list(iter_cards(path, errors=errors, chunk_size=chunk_size))
+    return cards, errors
+
+
+def format_error(error):
+    """错误的可读形式"""
+    where = f"第{error.line}行第{error.column}列"
+    if error.index is not None:
+        where = f"第{error.index + 1}条记录（{where}）"
+    return f"{where}: {error.message}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀卡牌目录校验")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_validate = sub.add_parser("validate", help="逐条校验卡牌目录")
+    p_validate.add_argument("path", nargs="?", default=os.path.join(BASE_PATH, "cards.json"))
+    args = parser.parse_args(argv)
+
+    errors = []
+    count = sum(1 for _ in iter_cards(args.path, errors=errors))
+    for error in errors:
+        print(f"❌ {format_error(error)}")
+    print(f"{'✅' if not errors else '⚠️ '} 有效卡牌 {count} 张，错误 {len(errors)} 条")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
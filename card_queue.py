@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 分布式生成队列
+多台机器（各自登录自己的Copilot浏览器配置）共同生成同一副卡牌：
+    • 卡牌任务放在共享目录中的SQLite队列里（queue.db）
+    • 工作进程租用任务（lease），处理期间定时心跳续租
+    • 卡牌图片与AI原图写入共享目录的 Generated_Cards / AI_Art，先写临时文件再原子重命名
+    • 进程崩溃或断网导致租约过期的任务自动回到队列，由其他工作进程接手
+
+注意：共享目录所在的文件系统需要支持SQLite文件锁；租约时间使用各机器的系统时钟，请保持时间同步。
+
+用法：
+    python card_queue.py enqueue [cards.json] [--force]   # 把卡牌加入队列（内容未变的已完成卡牌不重复生成）
+    python card_queue.py worker [--shared DIR]            # 启动一个工作进程（每台机器各启动一个）
+    python card_queue.py status                           # 查看队列状态
+    python card_queue.py scale-test --workers 1 2 4       # 离线后端的多进程扩展性测试
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from card_loader import load_cards, format_error
+from card_store import card_content_hash
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+QUEUE_FILE = "queue.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    card_name    TEXT PRIMARY KEY,
+    position     INTEGER NOT NULL,
+    data         TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'queued',
+    worker       TEXT,
+    lease_until  REAL,
+    heartbeat_at REAL,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    output_path  TEXT,
+    art_path     TEXT,
+    error        TEXT,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, position);
+"""
+
+# 任务状态
+QUEUED, LEASED, DONE, FAILED = "queued", "leased", "done", "failed"
+
+
+class JobQueue:
+    """SQLite任务队列；每个线程/进程使用自己的 JobQueue 实例"""
+
+    def __init__(self, db_path, max_attempts=3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        # 自动提交模式，需要原子性的操作显式使用 BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """写事务：BEGIN IMMEDIATE 立即取得写锁，避免两个进程租到同一个任务"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def enqueue(self, cards, force=False):
+        """加入或更新卡牌任务：新卡牌、内容变化的卡牌（或 force）重新排队，返回排队中的任务数"""
+        now = time.time()
+        with self._transaction() as conn:
+            for position, card in enumerate(cards):
+                conn.execute(
+                    """
+                    INSERT INTO jobs(card_name, position, data, content_hash, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(card_name) DO UPDATE SET
+                        position = excluded.position,
+                        data = excluded.data,
+                        status = CASE WHEN ? OR jobs.content_hash != excluded.content_hash
+                                      THEN 'queued' ELSE jobs.status END,
+                        attempts = CASE WHEN ? OR jobs.content_hash != excluded.content_hash
+                                        THEN 0 ELSE jobs.attempts END,
+                        content_hash = excluded.content_hash,
+                        updated_at = excluded.updated_at
+                    """,
+                    (card["card_name"], position, json.dumps(card, ensure_ascii=False),
+                     card_content_hash(card), now, bool(force), bool(force)),
+                )
+        return self.counts().get(QUEUED, 0)
+
+    def _requeue_expired(self, conn, now):
+        """租约过期的任务重新排队；已用完尝试次数的标记为失败"""
+        return conn.execute(
+            """
+            UPDATE jobs SET
+                status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                error = '租约过期（' || COALESCE(worker, '') || '）',
+                worker = NULL, lease_until = NULL, updated_at = ?
+            WHERE status = 'leased' AND lease_until < ?
+            """,
+            (self.max_attempts, now, now),
+        ).rowcount
+
+    def requeue_expired(self):
+        with self._transaction() as conn:
+            return self._requeue_expired(conn, time.time())
+
+    def lease(self, worker, lease_seconds):
+        """租用队列中最靠前的任务，返回 {card_name, card, attempts}；队列为空时返回None"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT card_name, data, attempts FROM jobs WHERE status = 'queued' ORDER BY position LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                """
+                UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, heartbeat_at = ?,
+                                attempts = attempts + 1, error = NULL, updated_at = ?
+                WHERE card_name = ?
+                """,
+                (worker, now + lease_seconds, now, now, row["card_name"]),
+            )
+        return {"card_name": row["card_name"], "card": json.loads(row["data"]), "attempts": row["attempts"] + 1}
+
+    def _owned_update(self, sql, params, card_name, worker):
+        """只更新仍由该工作进程持有租约的任务；租约已被收回时返回False"""
+        cursor = self.conn.execute(
+            sql + " WHERE card_name = ? AND worker = ? AND status = 'leased'",
+            params + (card_name, worker),
+        )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, card_name, worker, lease_seconds):
+        now = time.time()
+        return self._owned_update(
+            "UPDATE jobs SET lease_until = ?, heartbeat_at = ?",
+            (now + lease_seconds, now), card_name, worker,
+        )
+
+    def complete(self, card_name, worker, output_path=None, art_path=None):
+        return self._owned_update(
+            "UPDATE jobs SET status = 'done', lease_until = NULL, output_path = ?, art_path = ?, updated_at = ?",
+            (output_path, art_path, time.time()), card_name, worker,
+        )
+
+    def fail(self, card_name, worker, error):
+        """任务失败：还有尝试次数时重新排队"""
+        return self._owned_update(
+            """
+            UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                            worker = NULL, lease_until = NULL, error = ?, updated_at = ?
+            """,
+            (self.max_attempts, error, time.time()), card_name, worker,
+        )
+
+    def counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+    def unfinished(self):
+        """排队中与处理中的任务数（处理中的任务可能因租约过期回到队列）"""
+        counts = self.counts()
+        return counts.get(QUEUED, 0) + counts.get(LEASED, 0)
+
+    def jobs(self, status=None):
+        sql = "SELECT * FROM jobs" + (" WHERE status = ?" if status else "") + " ORDER BY position"
+        return [dict(row) for row in self.conn.execute(sql, (status,) if status else ())]
+
+
+class _Heartbeat(threading.Thread):
+    """处理任务期间定时续租（独立的数据库连接）；租约被收回时设置 lost"""
+
+    def __init__(self, db_path, card_name, worker, lease_seconds, interval):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.card_name = card_name
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.interval = interval
+        self.lost = False
+        self._halt = threading.Event()
+
+    def run(self):
+        with JobQueue(self.db_path) as queue:
+            while not self._halt.wait(self.interval):
+                if not queue.heartbeat(self.card_name, self.worker, self.lease_seconds):
+                    self.lost = True
+                    return
+
+    def stop(self):
+        self._halt.set()
+        self.join()
+
+
+class QueueWorker:
+    """工作进程：租用任务 → 生成卡牌（写入共享目录）→ 提交结果"""
+
+    def __init__(self, shared_dir=BASE_PATH, generator=None, worker_id=None,
+                 lease_seconds=180.0, heartbeat_interval=None, poll_interval=5.0):
+        from card_generator import CardGenerator
+
+        self.shared_dir = shared_dir
+        self.db_path = os.path.join(shared_dir, QUEUE_FILE)
+        self.queue = JobQueue(self.db_path)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval or lease_seconds / 4
+        self.poll_interval = poll_interval
+
+        self.generator = generator or CardGenerator()
+        # 卡牌图片与AI原图写入共享目录；浏览器登录配置仍使用本机目录
+        self.generator.output_path = os.path.join(shared_dir, "Generated_Cards")
+        self.generator.art_path = os.path.join(shared_dir, "AI_Art")
+        for path in (self.generator.output_path, self.generator.art_path):
+            os.makedirs(path, exist_ok=True)
+        self.done = 0
+        self.failed = 0
+
+    async def process(self, job):
+        """处理一个已租用的任务，返回是否成功提交"""
+        card_name = job["card_name"]
+        heartbeat = _Heartbeat(self.db_path, card_name, self.worker_id, self.lease_seconds, self.heartbeat_interval)
+        heartbeat.start()
+        try:
+            output_path = await self.generator.generate_single_card(job["card"])
+            error = None if output_path else "生成失败"
+        except Exception as e:
+            output_path, error = None, f"{type(e).__name__}: {e}"
+        finally:
+            heartbeat.stop()
+
+        if heartbeat.lost:
+            print(f"⚠️  [{self.worker_id}] {card_name} 的租约已被收回，结果交由新的持有者提交")
+            return False
+        if output_path:
+            committed = self.queue.complete(card_name, self.worker_id, output_path, self.generator.art_file(card_name))
+            self.done += committed
+            return committed
+        self.queue.fail(card_name, self.worker_id, error)
+        self.failed += 1
+        return False
+
+    async def run(self, max_jobs=None):
+        """循环处理任务，直到队列中没有未完成的任务（或处理了 max_jobs 个）"""
+        print(f"🛠️  工作进程 {self.worker_id} 启动，队列：{self.db_path}")
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self.queue.lease(self.worker_id, self.lease_seconds)
+            if job is None:
+                if self.queue.unfinished() == 0:
+                    break
+                # 其他进程还在处理：等待它们完成，或租约过期后接手
+                await asyncio.sleep(self.poll_interval)
+                continue
+            print(f"📥 [{self.worker_id}] 租用 {job['card_name']}（第{job['attempts']}次尝试）")
+            await self.process(job)
+            processed += 1
+        print(f"🎉 工作进程 {self.worker_id} 结束：完成 {self.done}，失败 {self.failed}")
+        return self.done
+
+
+def print_status(queue):
+    counts = queue.counts()
+    total = sum(counts.values())
+    print(f"📋 队列任务 {total} 个：排队 {counts.get(QUEUED, 0)}，处理中 {counts.get(LEASED, 0)}，"
+          f"完成 {counts.get(DONE, 0)}，失败 {counts.get(FAILED, 0)}")
+    now = time.time()
+    for job in queue.jobs(LEASED):
+        print(f"   🔨 {job['card_name']} ← {job['worker']}（租约剩余 {job['lease_until'] - now:.0f} 秒）")
+    for job in queue.jobs(FAILED):
+        print(f"   ❌ {job['card_name']}：{job['error']}")
+
+
+# ---- 扩展性测试 ----
+
+def _scale_worker(shared_dir, worker_id, latency, lease_seconds, heartbeat_interval):
+    """扩展性测试的工作进程入口：离线后端 + 独立运行日志，只输出错误"""
+    from card_generator import CardGenerator
+    from color_logger import ColorLogger
+    from offline_backend import OfflineImageBackend
+    from progress_display import ProgressDisplay
+    from run_log import RunLog
+
+    ColorLogger.configure(level="error")
+    with RunLog(os.path.join(shared_dir, f"run_{worker_id}.jsonl")) as run_log:
+        generator = CardGenerator(
+            run_log=run_log,
+            progress=ProgressDisplay(interactive=False, summary_interval=3600),
+            image_backend=OfflineImageBackend(latency=latency),
+        )
+        worker = QueueWorker(shared_dir, generator, worker_id=worker_id, lease_seconds=lease_seconds,
+                             heartbeat_interval=heartbeat_interval, poll_interval=0.2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            asyncio.run(worker.run())
+
+
+def _verify(shared_dir, cards):
+    """检查每张卡牌都已完成且只有一份输出，没有残留的临时文件"""
+    with JobQueue(os.path.join(shared_dir, QUEUE_FILE)) as queue:
+        counts = queue.counts()
+        jobs = queue.jobs()
+    outputs = glob.glob(os.path.join(shared_dir, "Generated_Cards", "*.png"))
+    arts = glob.glob(os.path.join(shared_dir, "AI_Art", "*.png"))
+    leftovers = glob.glob(os.path.join(shared_dir, "*", "*.tmp"))
+    problems = []
+    if counts.get(DONE, 0) != len(cards):
+        problems.append(f"完成 {counts.get(DONE, 0)}/{len(cards)}")
+    if len(outputs) != len(cards) or len(arts) != len(cards):
+        problems.append(f"输出 {len(outputs)} 张卡牌、{len(arts)} 张原图")
+    if leftovers:
+        problems.append(f"残留临时文件 {len(leftovers)} 个")
+    return problems, jobs
+
+
+def scale_test(worker_counts, card_count, latency, lease_seconds=30.0, crash=False):
+    """在本机用多个工作进程 + 离线后端处理同一队列，报告吞吐量并检查结果完整性"""
+    from benchmark import make_synthetic_cards
+
+    cards = make_synthetic_cards(card_count, seed=card_count)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    runs = [(n, False) for n in worker_counts] + ([(max(2, max(worker_counts)), True)] if crash else [])
+    for workers, kill_one in runs:
+        shared_dir = tempfile.mkdtemp(prefix="card_queue_")
+        try:
+            # 崩溃测试使用短租约，让被杀掉的进程的任务尽快回到队列
+            lease = 2.0 if kill_one else lease_seconds
+            with JobQueue(os.path.join(shared_dir, QUEUE_FILE)) as queue:
+                queue.enqueue(cards)
+            started = time.perf_counter()
+            processes = [
+                context.Process(target=_scale_worker, args=(shared_dir, f"w{i}", latency, lease, lease / 4))
+                for i in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            if kill_one:
+                # 等第一个进程租到任务后强行结束它
+                with JobQueue(os.path.join(shared_dir, QUEUE_FILE)) as queue:
+                    while not any(job["worker"] == "w0" for job in queue.jobs(LEASED)):
+                        time.sleep(0.05)
+                processes[0].kill()
+            for process in processes:
+                process.join()
+            elapsed = time.perf_counter() - started
+
+            problems, jobs = _verify(shared_dir, cards)
+            retried = sum(1 for job in jobs if job["attempts"] > 1)
+            label = f"{workers} 进程" + ("（杀掉1个）" if kill_one else "")
+            rate = len(cards) / elapsed
+            mark = "❌" if problems else "✅"
+            print(f"   {mark} {label:<12} {elapsed:7.2f} 秒  {rate:6.2f} 张/秒  重试 {retried}"
+                  + (f"  问题：{'；'.join(problems)}" if problems else ""))
+            results.append({"workers": workers, "crash": kill_one, "seconds": elapsed,
+                            "cards_per_s": rate, "retried": retried, "problems": problems})
+        finally:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+    base = next((r for r in results if r["workers"] == min(worker_counts) and not r["crash"]), None)
+    if base:
+        for result in results:
+            if not result["crash"] and result is not base:
+                speedup = result["cards_per_s"] / base["cards_per_s"]
+                print(f"   📈 {result['workers']} 进程相对 {base['workers']} 进程加速 {speedup:.2f}x")
+    return all(not result["problems"] for result in results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀分布式生成队列")
+    parser.add_argument("--shared", default=BASE_PATH, help="共享目录（队列、卡牌图片与AI原图，默认项目目录）")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_enqueue = sub.add_parser("enqueue", help="把卡牌加入队列")
+    p_enqueue.add_argument("cards_file", nargs="?", default=os.path.join(BASE_PATH, "cards.json"))
+    p_enqueue.add_argument("--force", action="store_true", help="已完成的卡牌也重新生成")
+    p_worker = sub.add_parser("worker", help="启动工作进程")
+    p_worker.add_argument("--id", help="工作进程名（默认 主机名-进程号）")
+    p_worker.add_argument("--lease", type=float, default=180.0, help="租约时长（秒，默认180）")
+    p_worker.add_argument("--max-jobs", type=int, help="最多处理的任务数")
+    p_worker.add_argument("--offline", action="store_true", help="使用离线图片后端（不打开浏览器）")
+    sub.add_parser("status", help="查看队列状态")
+    p_scale = sub.add_parser("scale-test", help="离线后端的多进程扩展性测试")
+    p_scale.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="工作进程数")
+    p_scale.add_argument("--cards", type=int, default=24, help="卡牌数量")
+    p_scale.add_argument("--latency", type=float, default=1.0, help="模拟每张AI图片的生成耗时（秒）")
+    p_scale.add_argument("--crash", action="store_true", help="额外测试一个进程中途被杀掉的情况")
+    args = parser.parse_args(argv)
+
+    if args.command == "scale-test":
+        print(f"🧪 扩展性测试：{args.cards} 张卡牌，模拟生成耗时 {args.latency} 秒")
+        return 0 if scale_test(args.workers, args.cards, args.latency, crash=args.crash) else 1
+
+    os.makedirs(args.shared, exist_ok=True)
+    if args.command == "worker":
+        generator = None
+        if args.offline:
+            from card_generator import CardGenerator
+            from offline_backend import OfflineImageBackend
+            generator = CardGenerator(image_backend=OfflineImageBackend())
+        worker = QueueWorker(args.shared, generator, worker_id=args.id, lease_seconds=args.lease)
+        try:
+            asyncio.run(worker.run(args.max_jobs))
+        finally:
+            worker.generator.close()
+        return 0
+
+    with JobQueue(os.path.join(args.shared, QUEUE_FILE)) as queue:
+        if args.command == "enqueue":
+            cards, errors = load_cards(args.cards_file)
+            for error in errors:
+                print(f"⚠️  跳过无效卡牌 {format_error(error)}")
+            queued = queue.enqueue(cards, force=args.force)
+            print(f"✅ 已加入 {len(cards)} 张卡牌，排队中 {queued} 个任务")
+        else:
+            print_status(queue)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - SQLite卡牌库
+可选的 cards.json 索引副本：按 card_group / 卡牌名 / 内容哈希建立索引，
+同时记录每张卡牌的生成状态与AI原图哈希，供生成器、Word导出和综合汇报直接查询。
+
+启用方式：设置环境变量 CARD_STORE=1（使用默认的 cards.db）或 CARD_STORE=<数据库路径>。
+
+用法：
+    python card_store.py import [cards.json]   # 导入（内容未变化时跳过）
+    python card_store.py export out.json       # 导出为cards.json格式
+    python card_store.py stats                 # 分组统计与生成状态
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+from card_loader import iter_cards
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(BASE_PATH, "cards.db")
+DEFAULT_JSON_PATH = os.path.join(BASE_PATH, "cards.json")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    position     INTEGER PRIMARY KEY,
+    card_name    TEXT NOT NULL,
+    card_group   TEXT,
+    color_theme  TEXT,
+    ai_prompt    TEXT,
+    description  TEXT,
+    price        TEXT,
+    data         TEXT NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cards_group ON cards(card_group, position);
+CREATE INDEX IF NOT EXISTS idx_cards_name ON cards(card_name);
+CREATE INDEX IF NOT EXISTS idx_cards_hash ON cards(content_hash);
+
+CREATE TABLE IF NOT EXISTS generation_state (
+    card_name    TEXT PRIMARY KEY,
+    status       TEXT NOT NULL,
+    content_hash TEXT,
+    prompt_hash  TEXT,
+    art_hash     TEXT,
+    output_path  TEXT,
+    output_hash  TEXT,
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    error        TEXT,
+    updated_at   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generation_art ON generation_state(art_hash);
+CREATE INDEX IF NOT EXISTS idx_generation_status ON generation_state(status);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def card_content_hash(card):
+    """卡牌内容哈希（字段顺序无关）"""
+    canonical = json.dumps(card, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def text_hash(text):
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """文件内容哈希"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store_enabled():
+    """是否通过 CARD_STORE 环境变量启用了卡牌库"""
+    return bool(os.environ.get("CARD_STORE"))
+
+
+def open_store(json_path=None):
+    """打开CARD_STORE指定的卡牌库，并在cards.json变化时自动重新导入"""
+    value = os.environ.get("CARD_STORE", "")
+    db_path = DEFAULT_DB_PATH if value in ("", "1", "true", "yes") else value
+    store = CardStore(db_path)
+    store.sync_from_json(json_path or DEFAULT_JSON_PATH)
+    return store
+
+
+class CardStore:
+    """cards.json 的SQLite索引副本"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 元数据 ----
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        self.conn.execute(
+            "INSERT INTO meta(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    # ---- 导入导出 ----
+
+    def import_cards(self, cards, source_hash=None):
+        """整体替换卡牌表（单个事务，cards 可以是惰性迭代器）"""
+        rows = (
+            (
+                position,
+                card.get("card_name", ""),
+                card.get("card_group"),
+                card.get("color_theme"),
+                card.get("ai_prompt"),
+                card.get("description"),
+                card.get("price"),
+                json.dumps(card, ensure_ascii=False),
+                card_content_hash(card),
+            )
+            for position, card in enumerate(cards)
+        )
+        with self.conn:
+            self.conn.execute("DELETE FROM cards")
+            self.conn.executemany("INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            if source_hash:
+                self.set_meta("source_hash", source_hash)
+            self.set_meta("imported_at", datetime.now().isoformat(timespec="seconds"))
+        return self.count()
+
+    def import_json(self, json_path=DEFAULT_JSON_PATH):
+        """从cards.json流式导入；无效记录被跳过并保存在 last_import_errors"""
+        self.last_import_errors = []
+        cards = iter_cards(json_path, errors=self.last_import_errors)
+        return self.import_cards(cards, source_hash=file_hash(json_path))
+
+    def sync_from_json(self, json_path=DEFAULT_JSON_PATH):
+        """cards.json内容变化时才重新导入，返回是否导入"""
+        if not os.path.exists(json_path):
+            return False
+        if self.get_meta("source_hash") == file_hash(json_path):
+            return False
+        self.import_json(json_path)
+        return True
+
+    def export_json(self, json_path):
+        """按原顺序导出为cards.json格式"""
+        cards = self.all_cards()
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(cards, f, ensure_ascii=False, indent=2)
+        return len(cards)
+
+    # ---- 查询 ----
+
+    def _cards(self, sql, params=()):
+        return [json.loads(row["data"]) for row in self.conn.execute(sql, params)]
+
+    def all_cards(self):
+        return self._cards("SELECT data FROM cards ORDER BY position")
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def get_card(self, card_name):
+        cards = self._cards("SELECT data FROM cards WHERE card_name = ? ORDER BY position LIMIT 1", (card_name,))
+        return cards[0] if cards else None
+
+    def find_by_hash(self, content_hash):
+        return self._cards("SELECT data FROM cards WHERE content_hash = ? ORDER BY position", (content_hash,))
+
+    def cards_by_group(self, card_group):
+        return self._cards("SELECT data FROM cards WHERE card_group = ? ORDER BY position", (card_group,))
+
+    def groups(self):
+        """按首次出现顺序返回所有分组"""
+        rows = self.conn.execute(
+            "SELECT card_group, MIN(position) AS first FROM cards GROUP BY card_group ORDER BY first"
+        )
+        return [row["card_group"] for row in rows]
+
+    def group_counts(self):
+        """{分组: 数量}，按首次出现顺序"""
+        rows = self.conn.execute(
+            "SELECT card_group, COUNT(*) AS n, MIN(position) AS first FROM cards GROUP BY card_group ORDER BY first"
+        )
+        return {row["card_group"]: row["n"] for row in rows}
+
+    def grouped_cards(self):
+        """{分组: [卡牌...]}，一次查询完成分组"""
+        grouped = {}
+        rows = self.conn.execute(
+            "SELECT c.card_group, c.data FROM cards c "
+            "JOIN (SELECT card_group, MIN(position) AS first FROM cards GROUP BY card_group) g "
+            "ON c.card_group IS g.card_group ORDER BY g.first, c.position"
+        )
+        for row in rows:
+            grouped.setdefault(row["card_group"], []).append(json.loads(row["data"]))
+        return grouped
+
+    # ---- 生成状态 ----
+
+    def record_generation(self, card, status, art_hash=None, output_path=None, error=None):
+        """记录一张卡牌的生成结果"""
+        output_hash = file_hash(output_path) if output_path and os.path.exists(output_path) else None
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO generation_state(card_name, status, content_hash, prompt_hash, art_hash,
+                                             output_path, output_hash, attempts, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(card_name) DO UPDATE SET
+                    status = excluded.status,
+                    content_hash = excluded.content_hash,
+                    prompt_hash = excluded.prompt_hash,
+                    art_hash = COALESCE(excluded.art_hash, generation_state.art_hash),
+                    output_path = COALESCE(excluded.output_path, generation_state.output_path),
+                    output_hash = COALESCE(excluded.output_hash, generation_state.output_hash),
+                    attempts = generation_state.attempts + 1,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    card.get("card_name", ""), status, card_content_hash(card), text_hash(card.get("ai_prompt")),
+                    art_hash, output_path, output_hash, error, datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+
+    def generation_state(self, card_name):
+        row = self.conn.execute("SELECT * FROM generation_state WHERE card_name = ?", (card_name,)).fetchone()
+        return dict(row) if row else None
+
+    def find_by_art_hash(self, art_hash):
+        """哪些卡牌用了同一张AI原图"""
+        rows = self.conn.execute("SELECT card_name FROM generation_state WHERE art_hash = ?", (art_hash,))
+        return [row["card_name"] for row in rows]
+
+    def cards_needing_generation(self):
+        """尚未成功生成、或提示词已改变的卡牌"""
+        rows = self.conn.execute(
+            """
+            SELECT c.data, c.ai_prompt, s.status, s.prompt_hash FROM cards c
+            LEFT JOIN generation_state s ON s.card_name = c.card_name
+            ORDER BY c.position
+            """
+        )
+        pending = []
+        for row in rows:
+            if row["status"] != "done" or row["prompt_hash"] != text_hash(row["ai_prompt"]):
+                pending.append(json.loads(row["data"]))
+        return pending
+
+    def status_counts(self):
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM generation_state GROUP BY status")
+        return {row["status"]: row["n"] for row in rows}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀SQLite卡牌库")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="数据库路径（默认 cards.db）")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="从cards.json导入")
+    p_import.add_argument("json_path", nargs="?", default=DEFAULT_JSON_PATH)
+    p_import.add_argument("--force", action="store_true", help="即使内容未变化也重新导入")
+    p_export = sub.add_parser("export", help="导出为cards.json格式")
+    p_export.add_argument("json_path")
+    sub.add_parser("stats", help="分组统计与生成状态")
+    args = parser.parse_args(argv)
+
+    with CardStore(args.db) as store:
+        if args.command == "import":
+            if args.force:
+                count = store.import_json(args.json_path)
+                print(f"✅ 已导入 {count} 张卡牌 → {args.db}")
+            elif store.sync_from_json(args.json_path):
+                print(f"✅ 已导入 {store.count()} 张卡牌 → {args.db}")
+            else:
+                print("ℹ️  cards.json 未变化，跳过导入")
+        elif args.command == "export":
+            count = store.export_json(args.json_path)
+            print(f"✅ 已导出 {count} 张卡牌 → {args.json_path}")
+        else:
+            print(f"📋 卡牌总数：{store.count()} 张")
+            for group, count in store.group_counts().items():
+                print(f"   • {group}：{count} 张")
+            status = store.status_counts()
+            if status:
+                print("🎨 生成状态：" + "，".join(f"{k} {v}" for k, v in status.items()))
+            print(f"⏳ 待生成：{len(store.cards_needing_generation())} 张")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
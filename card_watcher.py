@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 监视模式
+监视 cards.json 与 Base_IMG 模板，变化后（去抖）与上一次的卡牌目录比较，只重新渲染受影响的卡牌：
+    • 只改了文字（名称以外的描述、价格、主题色、分组）→ 用存档的AI原图重新合成
+    • 模板图片变化 → 所有有原图存档的卡牌重新合成
+    • 提示词变化，或新卡牌还没有原图存档 → 加入AI生图队列（--generate-art 时在后台依次生成）
+    • 改名（提示词不变）→ 沿用旧名称的原图存档重新合成
+
+cards.json 中有卡牌解析失败时，这些卡牌保留上一次的记录，修正后不会被当作新卡牌重新生图。
+
+优先使用 watchdog 的文件系统通知；未安装时退回到轮询文件修改时间。
+
+用法：
+    python card_watcher.py
+    python card_watcher.py --generate-art
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+from color_logger import ColorLogger
+from card_loader import load_cards, format_error
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+
+# 这些字段变化只需要重新合成；ai_prompt 变化需要重新生成原图
+TEXT_FIELDS = ("card_group", "color_theme", "description", "price")
+
+
+def card_fingerprint(card, fields):
+    return json.dumps([card.get(field) for field in fields], ensure_ascii=False)
+
+
+def diff_catalogue(old_cards, new_cards, has_art=lambda name: False):
+    """比较两份卡牌目录 {卡牌名: 卡牌}，返回 (需重新合成, 需重新生成原图, 已删除) 的卡牌名列表
+    has_art(name) 表示该卡牌是否已有AI原图存档：不在旧目录中但已有存档的卡牌只需重新合成"""
+    recompose, new_art = [], []
+    for name, card in new_cards.items():
+        old = old_cards.get(name)
+        if old is None:
+            (recompose if has_art(name) else new_art).append(name)
+        elif old.get("ai_prompt") != card.get("ai_prompt"):
+            new_art.append(name)
+        elif card_fingerprint(old, TEXT_FIELDS) != card_fingerprint(card, TEXT_FIELDS):
+            recompose.append(name)
+    removed = [name for name in old_cards if name not in new_cards]
+    return recompose, new_art, removed
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """把文件系统通知转给监视器（只关心 cards.json 与模板目录）"""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.watcher.notify(event.src_path)
+            dest = getattr(event, "dest_path", None)
+            if dest:
+                self.watcher.notify(dest)
+
+
+class CardWatcher:
+    """监视卡牌目录与模板，增量重新渲染"""
+
+    def __init__(self, generator=None, debounce=0.25, poll_interval=0.2, generate_art=False, art_generator=None):
+        if generator is None:
+            from card_generator import CardGenerator
+            generator = CardGenerator()
+        self.generator = generator
+        self.cards_file = os.path.join(generator.base_path, "cards.json")
+        self.template_dir = generator.base_img_path
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.generate_art = generate_art
+        # 后台生图使用独立的生成器：计时日志、模板缓存与质量检查记录都不是线程安全的，
+        # 不能与主线程重新合成用的生成器共用（为空时在生图线程中创建）
+        self.art_generator = art_generator
+
+        self.cards = {}
+        self.template_hash = None
+        self.art_queue = []
+        self._art_jobs = queue.Queue()
+        self._changed = threading.Event()
+        self._last_event = 0.0
+        self._stop = threading.Event()
+
+    # ---- 状态 ----
+
+    def _load_catalogue(self):
+        """返回 ({卡牌名: 卡牌}, 错误列表)"""
+        cards, errors = load_cards(self.cards_file)
+        for error in errors:
+            ColorLogger.warning(f"跳过无效卡牌配置 {format_error(error)}")
+        return {card["card_name"]: card for card in cards}, errors
+
+    def _has_art(self, name):
+        return os.path.exists(self.generator.art_file(name))
+
+    def _adopt_renamed(self, names, new_cards, removed):
+        """新卡牌的提示词与某张已删除卡牌相同（改名）时，复制旧名称的原图存档，返回改为重新合成的卡牌名"""
+        renamed = []
+        for name in names:
+            prompt = new_cards[name].get("ai_prompt")
+            for old_name, old_card in removed.items():
+                if old_card.get("ai_prompt") == prompt and self._has_art(old_name):
+                    with open(self.generator.art_file(old_name), "rb") as f:
+                        self.generator.archive_art(name, f.read())
+                    ColorLogger.info(f"卡牌 {old_name} 改名为 {name}，沿用原图存档")
+                    del removed[old_name]
+                    renamed.append(name)
+                    break
+        return renamed
+
+    def _template_hash(self):
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(self.template_dir)):
+            path = os.path.join(self.template_dir, name)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    digest.update(name.encode("utf-8") + b"\0" + f.read())
+        return digest.hexdigest()
+
+    def _watched_mtimes(self):
+        paths = [self.cards_file] + [
+            os.path.join(self.template_dir, name) for name in os.listdir(self.template_dir)
+        ]
+        return {path: os.stat(path).st_mtime_ns for path in paths if os.path.exists(path)}
+
+    # ---- 通知 ----
+
+    def notify(self, path):
+        """记录一次相关文件变化（去抖由主循环处理）"""
+        path = os.path.abspath(path)
+        if path == self.cards_file or os.path.dirname(path) == self.template_dir:
+            self._last_event = time.monotonic()
+            self._changed.set()
+
+    def _start_observer(self):
+        if Observer is None:
+            ColorLogger.info("未安装watchdog，使用轮询方式监视文件（pip install watchdog 可改用系统通知）")
+            thread = threading.Thread(target=self._poll_loop, daemon=True)
+            thread.start()
+            return None
+        observer = Observer()
+        handler = _ChangeHandler(self)
+        observer.schedule(handler, os.path.dirname(self.cards_file), recursive=False)
+        observer.schedule(handler, self.template_dir, recursive=False)
+        observer.start()
+        return observer
+
+    def _poll_loop(self):
+        last = self._watched_mtimes()
+        while not self._stop.is_set():
+            time.sleep(self.poll_interval)
+            current = self._watched_mtimes()
+            for path in set(current) | set(last):
+                if current.get(path) != last.get(path):
+                    self.notify(path)
+            last = current
+
+    # ---- 重新渲染 ----
+
+    def _recompose(self, names):
+        done = 0
+        for name in names:
+            if self.generator.recompose_card(self.cards[name]):
+                done += 1
+        return done
+
+    def _queue_art(self, names):
+        for name in names:
+            if name not in self.art_queue:
+                self.art_queue.append(name)
+                if self.generate_art:
+                    self._art_jobs.put(name)
+        if names:
+            ColorLogger.generating(f"加入AI生图队列：{'、'.join(names)}（队列中共 {len(self.art_queue)} 张）")
+
+    def rebuild(self):
+        """比较目录与模板的变化并只渲染受影响的卡牌，返回重新合成的数量"""
+        started = time.perf_counter()
+        try:
+            new_cards, errors = self._load_catalogue()
+        except (OSError, ValueError) as e:
+            ColorLogger.error(f"读取cards.json失败: {e}")
+            return 0
+        template_hash = self._template_hash()
+
+        if errors:
+            # 解析失败的卡牌无法确定名称：目录中消失的卡牌先保留上一次的记录，修正后按未变化处理
+            kept = {name: card for name, card in self.cards.items() if name not in new_cards}
+            new_cards = {**new_cards, **kept}
+
+        recompose, new_art, removed = diff_catalogue(self.cards, new_cards, self._has_art)
+        removed = {name: self.cards[name] for name in removed}
+        renamed = self._adopt_renamed([name for name in new_art if name not in self.cards], new_cards, removed)
+        self.cards = new_cards
+        new_art = [name for name in new_art if name not in renamed]
+        recompose += renamed
+        if template_hash != self.template_hash:
+            self.template_hash = template_hash
+            ColorLogger.info("模板图片已变化，重新合成所有已有原图的卡牌")
+            recompose = [name for name in new_cards if name not in new_art and self._has_art(name)]
+
+        # 提示词没变、但还没有原图存档的卡牌也需要生成
+        for name in recompose:
+            if not self._has_art(name):
+                new_art.append(name)
+        recompose = [name for name in recompose if name not in new_art]
+
+        done = self._recompose(recompose)
+        self._queue_art(new_art)
+        if removed:
+            ColorLogger.info(f"已从目录中删除：{'、'.join(removed)}（保留已生成的图片）")
+        if recompose:
+            ColorLogger.success(f"重新合成 {done}/{len(recompose)} 张卡牌，用时 {(time.perf_counter() - started) * 1000:.0f} ms")
+        return done
+
+    def _art_worker(self):
+        """后台依次生成队列中的AI原图（使用独立的生成器）"""
+        generator = self.art_generator
+        if generator is None:
+            generator = type(self.generator)(
+                image_backend=self.generator.image_backend, compositor=self.generator.compositor.name,
+            )
+            self.art_generator = generator
+
+        async def work():
+            while not self._stop.is_set():
+                try:
+                    name = self._art_jobs.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                card = self.cards.get(name)
+                if card is not None:
+                    await generator.generate_single_card(card)
+                if name in self.art_queue:
+                    self.art_queue.remove(name)
+        try:
+            asyncio.run(work())
+        finally:
+            generator.close()
+
+    def run(self):
+        """启动监视，直到Ctrl+C"""
+        ColorLogger.header("春秋杀监视模式")
+        self.cards, _ = self._load_catalogue()
+        self.template_hash = self._template_hash()
+        missing = [name for name in self.cards if not self._has_art(name)]
+        ColorLogger.info(f"已载入 {len(self.cards)} 张卡牌，其中 {len(missing)} 张没有AI原图存档")
+        ColorLogger.info(f"正在监视 {self.cards_file} 与 {self.template_dir}（Ctrl+C 退出）")
+
+        if self.generate_art:
+            threading.Thread(target=self._art_worker, daemon=True).start()
+        observer = self._start_observer()
+        try:
+            while True:
+                self._changed.wait()
+                # 去抖：等到最后一次变化后安静 debounce 秒再处理，合并编辑器的多次写入
+                while time.monotonic() - self._last_event < self.debounce:
+                    time.sleep(self.debounce / 5)
+                self._changed.clear()
+                self.rebuild()
+        except KeyboardInterrupt:
+            ColorLogger.info("监视已停止")
+        finally:
+            self._stop.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀监视模式：修改卡牌或模板后增量重新渲染")
+    parser.add_argument("--debounce", type=float, default=0.25, help="去抖时间（秒，默认0.25）")
+    parser.add_argument("--generate-art", action="store_true", help="在后台为提示词变化的卡牌重新生成AI原图")
+    args = parser.parse_args(argv)
+    CardWatcher(debounce=args.debounce, generate_art=args.generate_art).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,57 +6,126 @@
 import json
 import os
 import glob
+import argparse
+import sys
+from xml.sax.saxutils import escape
 from datetime import datetime
-from collections import defaultdict
+
+from card_loader import format_error
+from card_catalogue import CardCatalogue, build_key, source_hash, cached_report, record_report
+from theme_registry import get_registry
 
 try:
     from docx import Document
     from docx.shared import Inches, Pt
     from docx.enum.text import WD_ALIGN_PARAGRAPH
     from docx.enum.table import WD_TABLE_ALIGNMENT
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
     from docx.oxml.shared import OxmlElement, qn
 except ImportError:
-    print("❌ 缺少python-docx库，请先安装：")
-    print("   pip install python-docx")
-    exit(1)
+    # 导入本模块不应直接退出进程；真正导出时再提示安装
+    Document = None
+
+# 表格样式：自定义样式名 -> 继承的内置样式（字体在样式中统一设置，不再逐个run设置）
+TABLE_STYLES = {
+    "春秋杀统计表": "Light Grid Accent 1",
+    "春秋杀卡牌表": "Light List Accent 1",
+}
+
+# 卡牌详细信息表：(表头, 取值字段, 列宽英寸, 是否加粗)
+CARD_TABLE_COLUMNS = [
+    ("卡牌名称", "card_name", 1.2, True),
+    ("价格", "price", 0.8, True),
+    ("主题色", "color_theme", 0.8, False),
+    ("AI提示词", "ai_prompt", 2.8, False),
+    ("效果描述", "description", 2.2, False),
+]
+
+# 嵌入卡图时额外的首列：(表头, 列宽英寸)，缩略图按 THUMBNAIL_DPI 缩放到列宽
+CARD_IMAGE_COLUMN = ("卡图", 0.9)
+THUMBNAIL_DPI = 200
+
+
+def _run_xml(text, bold=False):
+    """一个run的XML；换行与制表符转换为Word对应元素（与cell.text行为一致）"""
+    props = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    parts = []
+    for i, line in enumerate(str(text).split("\n")):
+        if i:
+            parts.append("<w:br/>")
+        for j, piece in enumerate(line.split("\t")):
+            if j:
+                parts.append("<w:tab/>")
+            if piece:
+                parts.append(f'<w:t xml:space="preserve">{escape(piece)}</w:t>')
+    return f"<w:r>{props}{''.join(parts)}</w:r>"
+
+
+def _row_xml(values, widths, bold=None, center=False):
+    """一行表格的XML"""
+    align = '<w:pPr><w:jc w:val="center"/></w:pPr>' if center else ""
+    cells = []
+    for i, value in enumerate(values):
+        run = _run_xml(value, bold[i] if bold else False) if value else ""
+        cells.append(
+            f'<w:tc><w:tcPr><w:tcW w:w="{widths[i]}" w:type="dxa"/></w:tcPr>'
+            f"<w:p>{align}{run}</w:p></w:tc>"
+        )
+    return f"<w:tr>{''.join(cells)}</w:tr>"
+
 
 class CardsToWordExporter:
-    def __init__(self):
+    def __init__(self, embed_images=False):
+        if Document is None:
+            raise ImportError("缺少python-docx库，请先安装：pip install python-docx")
         self.base_path = os.path.dirname(os.path.abspath(__file__))
         self.cards_file = os.path.join(self.base_path, "cards.json")
+        self.cards_dir = os.path.join(self.base_path, "Generated_Cards")
         self.output_file = os.path.join(self.base_path, f"春秋杀卡牌汇总_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx")
+        # 分组聚合结果（与综合汇报共用）
+        self.catalogue = None
+        # 可选：在卡牌表格首列嵌入缩小后的卡牌图片
+        self.embed_images = embed_images
+        self.thumbnails = None
         
-        # 卡牌类型emoji映射
-        self.type_emojis = {
-            "国家卡": "🏰",
-            "思想卡": "🧠", 
-            "变法卡": "⚖️",
-            "连锁卡": "🔗",
-            "军事卡": "⚔️",
-            "经济卡": "💰",
-            "道具卡": "🎁",
-            "锦囊牌": "📜",
-            "祭祀卡": "🙏"
-        }
+        # 卡牌类型emoji映射（与卡牌合成共用注册表，可用 themes.json 扩展）
+        self.type_emojis = get_registry().group_emojis
     
-    def load_cards_data(self):
-        """加载卡牌数据"""
+    def load_catalogue(self):
+        """一次遍历加载并聚合卡牌数据（启用CARD_STORE时从卡牌库读取）"""
+        if self.catalogue is not None:
+            return self.catalogue
+        errors = []
         try:
-            with open(self.cards_file, 'r', encoding='utf-8') as f:
-                cards_data = json.load(f)
-                print(f"✅ 成功加载 {len(cards_data)} 张卡牌数据")
-                return cards_data
+            self.catalogue = CardCatalogue.load(self.cards_file, errors=errors)
         except Exception as e:
             print(f"❌ 读取cards.json失败: {e}")
-            return []
+            return None
+        for error in errors:
+            print(f"⚠️  跳过无效卡牌 {format_error(error)}")
+        print(f"✅ 成功加载 {len(self.catalogue)} 张卡牌数据")
+        return self.catalogue
     
-    def group_cards_by_type(self, cards_data):
-        """按卡牌类型分组"""
-        grouped_cards = defaultdict(list)
-        for card in cards_data:
-            card_group = card.get('card_group', '未分类')
-            grouped_cards[card_group].append(card)
-        return dict(grouped_cards)
+    def build_key(self):
+        """文档构建键：卡牌聚合哈希 + 导出代码 + 类型图标 + 嵌入的卡图"""
+        images = ""
+        if self.embed_images and os.path.isdir(self.cards_dir):
+            entries = sorted(os.scandir(self.cards_dir), key=lambda entry: entry.name)
+            images = "|".join(f"{entry.name}:{entry.stat().st_mtime_ns}:{entry.stat().st_size}" for entry in entries)
+        emojis = json.dumps(self.type_emojis, ensure_ascii=False, sort_keys=True)
+        return build_key(self.catalogue, source_hash(__file__), emojis, self.embed_images, images)
+    
+    def cached_output(self):
+        """卡牌数据与导出选项都未变化时，返回上一次导出的文档路径"""
+        if not self.load_catalogue():
+            return None
+        return cached_report("word", self.build_key())
+    
+    @staticmethod
+    def group_label(card_group):
+        return card_group if card_group is not None else '未分类'
     
     def add_title_page(self, doc):
         """添加标题页"""
@@ -88,15 +157,14 @@ class CardsToWordExporter:
         # 分页
         doc.add_page_break()
     
-    def add_statistics_section(self, doc, grouped_cards):
+    def add_statistics_section(self, doc, catalogue):
         """添加统计信息部分"""
         doc.add_heading('📊 卡牌统计概览', level=1)
         
         # 总体统计
-        total_cards = sum(len(cards) for cards in grouped_cards.values())
         stats_para = doc.add_paragraph()
-        run1 = stats_para.add_run(f"📋 总卡牌数量：{total_cards} 张\n")
-        run2 = stats_para.add_run(f"🏷️ 卡牌类型：{len(grouped_cards)} 种\n")
+        run1 = stats_para.add_run(f"📋 总卡牌数量：{catalogue.total} 张\n")
+        run2 = stats_para.add_run(f"🏷️ 卡牌类型：{len(catalogue.groups)} 种\n")
         run3 = stats_para.add_run(f"🎯 设计理念：基于春秋战国历史背景的策略卡牌游戏")
         
         # 设置字体
@@ -110,39 +178,16 @@ class CardsToWordExporter:
         table_desc_run.font.name = '微软雅黑'
         table_desc_run.font.size = Pt(11)
         
-        table = doc.add_table(rows=1, cols=4)
-        table.style = 'Light Grid Accent 1'
-        table.alignment = WD_TABLE_ALIGNMENT.CENTER
-        
-        # 表头
-        header_cells = table.rows[0].cells
-        header_cells[0].text = '卡牌类型'
-        header_cells[1].text = 'emoji'
-        header_cells[2].text = '数量'
-        header_cells[3].text = '占比'
-        
-        # 设置表头格式
-        for cell in header_cells:
-            cell.paragraphs[0].runs[0].font.bold = True
-            cell.paragraphs[0].runs[0].font.name = '微软雅黑'
-            cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # 添加数据行
-        for card_type, cards in grouped_cards.items():
-            row_cells = table.add_row().cells
-            row_cells[0].text = card_type
-            row_cells[1].text = self.type_emojis.get(card_type, '')
-            row_cells[2].text = str(len(cards))
-            row_cells[3].text = f"{len(cards)/total_cards*100:.1f}%"
-            
-            # 居中对齐并设置字体
-            for cell in row_cells:
-                cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-                for run in cell.paragraphs[0].runs:
-                    run.font.name = '微软雅黑'
-        
-        # 统一设置整个表格字体
-        self.set_table_font(table)
+        rows = []
+        for card_group, count in catalogue.counts.items():
+            card_type = self.group_label(card_group)
+            rows.append([
+                card_type, self.type_emojis.get(card_type, ''), str(count), f"{catalogue.share(card_group):.1f}%",
+            ])
+        self.add_bulk_table(
+            doc, ['卡牌类型', 'emoji', '数量', '占比'], rows,
+            widths=[1.6, 1.0, 1.0, 1.0], style="春秋杀统计表", center=True,
+        )
         
         doc.add_paragraph()
     
@@ -176,61 +221,32 @@ class CardsToWordExporter:
         rules_run.font.size = Pt(11)
         doc.add_paragraph()
     
-    def add_cards_detail_section(self, doc, grouped_cards):
+    def add_cards_detail_section(self, doc, catalogue):
         """添加卡牌详细信息部分"""
         doc.add_heading('🃏 卡牌详细信息', level=1)
         
-        for card_type, cards in grouped_cards.items():
+        for card_group, cards in catalogue.groups.items():
+            card_type = self.group_label(card_group)
             # 添加卡牌类型标题
             emoji = self.type_emojis.get(card_type, '')
             type_heading = doc.add_heading(f'{emoji} {card_type} ({len(cards)}张)', level=2)
             
-            # 创建卡牌信息表格
-            table = doc.add_table(rows=1, cols=5)
-            table.style = 'Light List Accent 1'
-            table.alignment = WD_TABLE_ALIGNMENT.CENTER
-            
-            # 表头
-            header_cells = table.rows[0].cells
-            header_cells[0].text = '卡牌名称'
-            header_cells[1].text = '价格'
-            header_cells[2].text = '主题色'
-            header_cells[3].text = 'AI提示词'
-            header_cells[4].text = '效果描述'
-            
-            # 设置表头格式
-            for cell in header_cells:
-                cell.paragraphs[0].runs[0].font.bold = True
-                cell.paragraphs[0].runs[0].font.name = '微软雅黑'
-                cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # 添加卡牌数据
-            for card in cards:
-                row_cells = table.add_row().cells
-                row_cells[0].text = card.get('card_name', '')
-                row_cells[1].text = card.get('price', '')
-                row_cells[2].text = card.get('color_theme', '')
-                row_cells[3].text = card.get('ai_prompt', '')
-                row_cells[4].text = card.get('description', '')
-                
-                # 设置单元格格式
-                row_cells[0].paragraphs[0].runs[0].font.bold = True
-                row_cells[0].paragraphs[0].runs[0].font.name = '微软雅黑'
-                row_cells[1].paragraphs[0].runs[0].font.bold = True  # 价格也加粗
-                row_cells[1].paragraphs[0].runs[0].font.name = '微软雅黑'
-                row_cells[3].width = Inches(2.8)  # AI提示词列宽一些
-                row_cells[4].width = Inches(2.2)  # 效果描述列宽一些
-            
-            # 统一设置整个表格字体
-            self.set_table_font(table)
-            
-            # 设置表格列宽
-            for row in table.rows:
-                row.cells[0].width = Inches(1.2)  # 卡牌名称
-                row.cells[1].width = Inches(0.8)  # 价格
-                row.cells[2].width = Inches(0.8)  # 主题色
-                row.cells[3].width = Inches(2.8)  # AI提示词
-                row.cells[4].width = Inches(2.2)  # 效果描述
+            # 创建卡牌信息表格（卡牌名称与价格加粗）
+            rows = [[card.get(field, '') for _, field, _, _ in CARD_TABLE_COLUMNS] for card in cards]
+            headers = [header for header, _, _, _ in CARD_TABLE_COLUMNS]
+            widths = [width for _, _, width, _ in CARD_TABLE_COLUMNS]
+            bold_columns = [bold for _, _, _, bold in CARD_TABLE_COLUMNS]
+            images = None
+            if self.thumbnails:
+                images = [self.card_thumbnail(card) for card in cards]
+                rows = [[''] + row for row in rows]
+                headers = [CARD_IMAGE_COLUMN[0]] + headers
+                widths = [CARD_IMAGE_COLUMN[1]] + widths
+                bold_columns = [False] + bold_columns
+            self.add_bulk_table(
+                doc, headers, rows, widths=widths, style="春秋杀卡牌表",
+                bold_columns=bold_columns, images=images,
+            )
             
             doc.add_paragraph()  # 添加间距
     
@@ -273,24 +289,40 @@ class CardsToWordExporter:
         tech_run.font.name = '微软雅黑'
         tech_run.font.size = Pt(11)
     
-    def set_font_to_microsoft_yahei(self, element, size=Pt(11), bold=False):
-        """统一设置字体为微软雅黑"""
-        if hasattr(element, 'runs'):
-            for run in element.runs:
-                run.font.name = '微软雅黑'
-                run.font.size = size
-                run.font.bold = bold
-        elif hasattr(element, 'font'):
-            element.font.name = '微软雅黑'
-            element.font.size = size
-            element.font.bold = bold
+    def card_thumbnail(self, card):
+        """卡牌对应的缩略图路径（Generated_Cards/卡牌名.png），没有生成过时返回None"""
+        source = os.path.join(self.cards_dir, f"{card.get('card_name', '')}.png")
+        return self.thumbnails.get(source)
     
-    def set_table_font(self, table):
-        """设置表格字体为微软雅黑"""
-        for row in table.rows:
-            for cell in row.cells:
-                for paragraph in cell.paragraphs:
-                    self.set_font_to_microsoft_yahei(paragraph, size=Pt(10))
+    def add_bulk_table(self, doc, headers, rows, widths, style, bold_columns=None, center=False, images=None):
+        """一次性生成整张表格：所有行拼成一段XML后解析插入，字体由表格样式统一提供
+        
+        逐个单元格调用python-docx（cell.text、run.font、cell.width）在上万行时非常慢，
+        这里每行只做一次字符串拼接，表头与列宽也在同一遍中写入。
+        images（可选）与rows一一对应，图片插入到每行的首列，宽度为首列列宽。
+        """
+        table = doc.add_table(rows=0, cols=len(headers))
+        table.style = style
+        table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        
+        # 列宽（英寸 -> 缇）同时写入表格网格与每个单元格
+        twips = [int(width * 1440) for width in widths]
+        for column, width in zip(table.columns, widths):
+            column.width = Inches(width)
+        
+        header_xml = _row_xml(headers, twips, bold=[True] * len(headers), center=True)
+        body_xml = "".join(_row_xml(values, twips, bold=bold_columns, center=center) for values in rows)
+        fragment = parse_xml(f"<w:tbl {nsdecls('w')}>{header_xml}{body_xml}</w:tbl>")
+        new_rows = list(fragment)
+        table._tbl.extend(new_rows)
+        
+        if images:
+            # 同一张图片在文档包中只存一份，按需建立引用
+            for tr, image_path in zip(new_rows[1:], images):
+                if image_path:
+                    inline = doc.part.new_pic_inline(image_path, Inches(widths[0] - 0.1), None)
+                    tr.tc_lst[0].p_lst[0].add_r().add_drawing(inline)
+        return table
     
     def set_document_style(self, doc):
         """设置文档样式"""
@@ -324,18 +356,27 @@ class CardsToWordExporter:
             table_style.font.size = Pt(10)
         except:
             pass
+        
+        # 导出用的表格样式：继承内置配色，字体统一为微软雅黑10号
+        for name, base in TABLE_STYLES.items():
+            table_style = doc.styles.add_style(name, WD_STYLE_TYPE.TABLE)
+            table_style.base_style = doc.styles[base]
+            table_style.font.name = '微软雅黑'
+            table_style.font.size = Pt(10)
+            table_style.element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), '微软雅黑')
     
     def export_to_word(self):
         """导出到Word文档"""
         print("🚀 开始生成Word文档...")
         
-        # 加载卡牌数据
-        cards_data = self.load_cards_data()
-        if not cards_data:
+        # 加载并聚合卡牌数据
+        catalogue = self.load_catalogue()
+        if not catalogue:
             return False
         
-        # 按类型分组
-        grouped_cards = self.group_cards_by_type(cards_data)
+        if self.embed_images:
+            from thumbnail_cache import ThumbnailCache
+            self.thumbnails = ThumbnailCache(width_px=int(CARD_IMAGE_COLUMN[1] * THUMBNAIL_DPI))
         
         # 创建Word文档
         doc = Document()
@@ -346,17 +387,21 @@ class CardsToWordExporter:
         self.add_title_page(doc)
         
         print("📊 添加统计信息...")
-        self.add_statistics_section(doc, grouped_cards)
+        self.add_statistics_section(doc, catalogue)
         
         print("🎮 添加游戏规则...")
         self.add_game_rules_section(doc)
         
         print("🃏 添加卡牌详细信息...")
-        self.add_cards_detail_section(doc, grouped_cards)
+        self.add_cards_detail_section(doc, catalogue)
         
         print("⚙️ 添加技术实现...")
         self.add_technical_section(doc)
         
+        if self.thumbnails:
+            self.thumbnails.save_index()
+            print(f"🖼️ 卡图缩略图：复用 {self.thumbnails.hits} 张，新生成 {self.thumbnails.misses} 张")
+        
         # 保存文档
         try:
             doc.save(self.output_file)
@@ -367,12 +412,30 @@ class CardsToWordExporter:
             print(f"❌ 保存Word文档失败：{e}")
             return False
 
-def main():
+def main(argv=None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="春秋杀卡牌数据导出Word文档")
+    parser.add_argument("--images", action="store_true", help="在卡牌表格中嵌入Generated_Cards中的卡牌图片")
+    parser.add_argument("--force", action="store_true", help="即使卡牌数据未变化也重新生成")
+    args = parser.parse_args(argv)
+    
     print("=" * 50)
     print("🌟 春秋杀卡牌数据导出工具")
     print("=" * 50)
     
+    try:
+        exporter = CardsToWordExporter(embed_images=args.images)
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    # ♻️ 卡牌数据与导出选项都未变化时沿用上一次的文档
+    cached = None if args.force else exporter.cached_output()
+    if cached:
+        print(f"♻️ 卡牌数据未变化，沿用已有文档：{cached}")
+        print("   （使用 --force 强制重新生成）")
+        return 0
+    
     # 🗑️ 删除旧的卡牌汇总文件
     old_files = glob.glob("春秋杀卡牌汇总_*.docx")
     if old_files:
@@ -385,13 +448,14 @@ def main():
                 print(f"   ❌ 删除失败：{file}")
         print()
     
-    exporter = CardsToWordExporter()
     success = exporter.export_to_word()
     
     if success:
+        record_report("word", exporter.build_key(), exporter.output_file)
         print("\n🎉 导出完成！可以用于汇报展示了！")
-    else:
-        print("\n💥 导出失败，请检查错误信息")
+        return 0
+    print("\n💥 导出失败，请检查错误信息")
+    return 1
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
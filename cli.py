@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 统一命令行入口
+各子命令只在执行时才导入自己需要的依赖（Playwright、Pillow、python-docx、openpyxl），
+查看帮助或只做合成的命令不会加载浏览器和文档库。
+
+用法：
+    python cli.py generate                  # 打开浏览器生成卡牌
+    python cli.py generate --dry-run        # 根据历史记录预估耗时与失败数（不生成）
+    python cli.py recompose [卡牌名 ...]     # 用存档的AI原图重新合成（不打开浏览器）
+    python cli.py export-word [--images]    # 导出卡牌汇总Word文档
+    python cli.py report [--force]          # 生成项目综合汇报
+    python cli.py sheet [--players 8]       # 生成游戏记录表
+    python cli.py bench [--stages compose]  # 性能基准测试
+    python cli.py estimate [--missing]      # 批量生成耗时与成本预估
+"""
+
+import argparse
+import os
+import sys
+
+
+def _generate(args):
+    if args.dry_run:
+        from batch_estimator import main as estimate
+        return estimate([])
+
+    import asyncio
+    from card_generator import CardGenerator
+
+    backend = None
+    if args.offline:
+        from offline_backend import OfflineImageBackend
+        backend = OfflineImageBackend()
+    asyncio.run(CardGenerator(image_backend=backend).generate_all_cards())
+    return 0
+
+
+def _recompose(args):
+    from card_generator import CardGenerator
+    from color_logger import ColorLogger
+
+    generator = CardGenerator()
+    cards = generator.load_cards_config()
+    if args.names:
+        wanted = set(args.names)
+        unknown = wanted - {card.get("card_name") for card in cards}
+        if unknown:
+            ColorLogger.error(f"未找到卡牌：{'、'.join(sorted(unknown))}")
+            return 1
+        cards = [card for card in cards if card.get("card_name") in wanted]
+        for card in cards:
+            if not os.path.exists(generator.art_file(card["card_name"])):
+                ColorLogger.warning(f"卡牌 {card['card_name']} 没有存档的AI原图，无法重新合成")
+    if args.processes > 1:
+        # 多进程合成：模板只解码一次，通过共享内存交给各工作进程
+        from shared_templates import RenderPool
+        with RenderPool(workers=args.processes, generator=generator) as pool:
+            done = pool.recompose(cards)
+    else:
+        done, _ = generator.recompose_all(cards, workers=args.workers, memory_limit=args.memory_limit)
+    ColorLogger.success(f"重新合成 {done} 张卡牌")
+    return 0 if done or not cards else 1
+
+
+def _forward(module, argv):
+    """转发给模块自己的命令行（模块在这里才导入）"""
+    result = __import__(module).main(argv)
+    return result or 0
+
+
+COMMANDS = {
+    "export-word": ("cards_to_word", "导出卡牌汇总Word文档（参数同 cards_to_word.py）"),
+    "report": ("comprehensive_report", "生成项目综合汇报（参数同 comprehensive_report.py）"),
+    "sheet": ("country_data_sheet", "生成游戏记录表（参数同 country_data_sheet.py）"),
+    "bench": ("benchmark", "性能基准测试（参数同 benchmark.py）"),
+    "estimate": ("batch_estimator", "批量生成耗时与成本预估（参数同 batch_estimator.py）"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="春秋杀卡牌工具")
+    sub = parser.add_subparsers(dest="command", required=True, metavar="命令")
+
+    p_generate = sub.add_parser("generate", help="打开浏览器用AI生成卡牌")
+    p_generate.add_argument("--offline", action="store_true", help="使用离线占位图片（不打开浏览器）")
+    p_generate.add_argument("--dry-run", action="store_true", help="只根据历史运行记录预估耗时、失败数和建议并发，不生成")
+    p_generate.set_defaults(handler=_generate)
+
+    p_recompose = sub.add_parser("recompose", help="用存档的AI原图重新合成卡牌（不打开浏览器）")
+    p_recompose.add_argument("names", nargs="*", help="卡牌名（默认所有有原图存档的卡牌）")
+    p_recompose.add_argument("--workers", type=int, default=1, help="并行合成的线程数")
+    p_recompose.add_argument("--processes", type=int, default=1,
+                             help="多进程合成的进程数（共享模板内存，大于1时忽略 --workers）")
+    p_recompose.add_argument("--memory-limit", type=float, metavar="MB",
+                             help="进程内存上限（MB），超过时暂停提交新的合成任务")
+    p_recompose.set_defaults(handler=_recompose)
+
+    # 其余子命令把剩余参数原样交给各自模块的命令行解析（包括 --help）
+    for name, (module, help_text) in COMMANDS.items():
+        p_forward = sub.add_parser(name, help=help_text, add_help=False)
+        p_forward.set_defaults(forward=module)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if getattr(args, "forward", None):
+        return _forward(args.forward, extra)
+    if extra:
+        parser.error(f"无法识别的参数：{' '.join(extra)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
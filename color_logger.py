@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 分级日志输出
+ColorLogger 的各个方法对应不同的日志级别，通过后台队列异步写出，热循环中不会阻塞在终端输出上。
+
+环境变量：
+    CARD_LOG_LEVEL   debug / info / warning(quiet) / error，默认 info
+    CARD_LOG_FORMAT  auto / color / plain / json，默认 auto（终端彩色，非终端纯文本）
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+LOGGER_NAME = "chunqiu"
+
+# 级别别名：quiet / production 只输出警告和错误
+LEVEL_ALIASES = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "quiet": logging.WARNING,
+    "production": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+
+class ColorFormatter(logging.Formatter):
+    """终端彩色格式（保留原有的emoji与配色）"""
+
+    def __init__(self, colors):
+        super().__init__()
+        self.colors = colors
+
+    def _paint(self, text, color, style):
+        color_code = self.colors.get(color.upper(), self.colors['WHITE'])
+        style_code = self.colors.get(style.upper(), '')
+        return f"{style_code}{color_code}{text}{self.colors['END']}"
+
+    def format(self, record):
+        kind = getattr(record, "kind", "info")
+        message = record.getMessage()
+        if kind == "header":
+            line = '=' * 50
+            return "\n".join([
+                self._paint(f"\n{line}", 'CYAN', ''),
+                self._paint(f"🌟 {message}", 'WHITE', 'BOLD'),
+                self._paint(line, 'CYAN', ''),
+            ])
+        if kind == "progress_bar":
+            return "\r" + self._paint(f"🚀 {message}", 'CYAN', 'BOLD')
+        icon, color, style, _ = ColorLogger.STYLES.get(kind, ColorLogger.STYLES["info"])
+        return self._paint(f"{icon}{message}", color, style)
+
+
+class PlainFormatter(logging.Formatter):
+    """无颜色的纯文本格式（重定向到文件或CI日志时使用）"""
+
+    def format(self, record):
+        kind = getattr(record, "kind", "info")
+        message = record.getMessage()
+        if kind == "header":
+            return f"{'=' * 50}\n🌟 {message}\n{'=' * 50}"
+        icon = ColorLogger.STYLES.get(kind, ColorLogger.STYLES["info"])[0]
+        return f"{icon}{message}"
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志一行JSON，便于日志平台收集"""
+
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "kind": getattr(record, "kind", "info"),
+            "message": record.getMessage(),
+        }
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _ProgressAwareStreamHandler(logging.StreamHandler):
+    """彩色终端下进度条使用 \\r 同行覆盖，多行进度面板固定在输出底部；其他格式按普通行输出"""
+
+    def __init__(self, stream, inline_progress):
+        super().__init__(stream)
+        self.inline_progress = inline_progress
+        self._frame = ""
+        self._frame_lines = 0
+
+    def _erase_frame(self):
+        if self._frame_lines:
+            # 光标回到面板第一行并清除到屏幕末尾
+            self.stream.write(f"\033[{self._frame_lines}F\033[J")
+
+    def _draw_frame(self):
+        if self._frame:
+            self.stream.write(self._frame + "\n")
+        self._frame_lines = self._frame.count("\n") + 1 if self._frame else 0
+
+    def emit(self, record):
+        kind = getattr(record, "kind", "info")
+        if not self.inline_progress:
+            if kind in ("progress_end", "progress_frame"):
+                return
+            return super().emit(record)
+        try:
+            if kind == "progress_end":
+                # 同行进度条需要补一个换行；多行面板保留最后一帧
+                if not self._frame_lines:
+                    self.stream.write("\n")
+                self._frame = ""
+                self._frame_lines = 0
+            elif kind == "progress_frame":
+                self._erase_frame()
+                self._frame = record.getMessage()
+                self._draw_frame()
+            elif kind == "progress_bar":
+                self.stream.write(self.format(record))
+            else:
+                # 普通日志写在面板上方，然后重绘面板
+                self._erase_frame()
+                self.stream.write(self.format(record) + self.terminator)
+                self._draw_frame()
+            self.flush()
+        except Exception:
+            self.handleError(record)
+
+
+class ColorLogger:
+    """炫酷的彩色日志输出类"""
+
+    # ANSI颜色代码
+    COLORS = {
+        'RED': '\033[91m',
+        'GREEN': '\033[92m',
+        'YELLOW': '\033[93m',
+        'BLUE': '\033[94m',
+        'MAGENTA': '\033[95m',
+        'CYAN': '\033[96m',
+        'WHITE': '\033[97m',
+        'BOLD': '\033[1m',
+        'UNDERLINE': '\033[4m',
+        'END': '\033[0m'
+    }
+
+    # 日志类型 -> (前缀, 颜色, 样式, 级别)
+    STYLES = {
+        'success': ("✅ ", 'GREEN', 'BOLD', logging.INFO),
+        'error': ("❌ ", 'RED', 'BOLD', logging.ERROR),
+        'warning': ("⚠️  ", 'YELLOW', 'BOLD', logging.WARNING),
+        'info': ("ℹ️  ", 'BLUE', '', logging.INFO),
+        'progress': ("🚀 ", 'CYAN', 'BOLD', logging.INFO),
+        'generating': ("🎨 ", 'MAGENTA', 'BOLD', logging.INFO),
+        'download': ("📥 ", 'GREEN', '', logging.INFO),
+        'compose': ("🔧 ", 'YELLOW', '', logging.INFO),
+        'header': ("🌟 ", 'WHITE', 'BOLD', logging.INFO),
+        'progress_bar': ("🚀 ", 'CYAN', 'BOLD', logging.INFO),
+        'progress_end': ("", 'WHITE', '', logging.INFO),
+        'progress_frame': ("", 'CYAN', '', logging.INFO),
+    }
+
+    _logger = None
+    _listener = None
+    _interactive = False
+    _config = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, level=None, fmt=None, stream=None, background=True):
+        """配置日志级别、输出格式与输出流；background=False 时同步写出（测试用）"""
+        with cls._lock:
+            cls._shutdown_listener()
+            cls._config = {"level": level, "fmt": fmt, "stream": stream, "background": background}
+
+            level = level or os.environ.get("CARD_LOG_LEVEL", "info")
+            if isinstance(level, str):
+                level = LEVEL_ALIASES.get(level.lower(), logging.INFO)
+            fmt = (fmt or os.environ.get("CARD_LOG_FORMAT", "auto")).lower()
+            stream = stream or sys.stdout
+            if fmt == "auto":
+                fmt = "color" if hasattr(stream, "isatty") and stream.isatty() else "plain"
+
+            formatter = {
+                "color": lambda: ColorFormatter(cls.COLORS),
+                "json": JsonFormatter,
+            }.get(fmt, PlainFormatter)()
+
+            cls._interactive = fmt == "color"
+            stream_handler = _ProgressAwareStreamHandler(stream, inline_progress=cls._interactive)
+            stream_handler.setFormatter(formatter)
+
+            logger = logging.getLogger(LOGGER_NAME)
+            logger.handlers.clear()
+            logger.setLevel(level)
+            logger.propagate = False
+
+            if background:
+                log_queue = queue.SimpleQueue()
+                logger.addHandler(logging.handlers.QueueHandler(log_queue))
+                cls._listener = logging.handlers.QueueListener(log_queue, stream_handler)
+                cls._listener.start()
+            else:
+                logger.addHandler(stream_handler)
+
+            cls._logger = logger
+            return logger
+
+    @classmethod
+    def _shutdown_listener(cls):
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+    @classmethod
+    def flush(cls):
+        """等待队列中的日志全部写出"""
+        with cls._lock:
+            cls._shutdown_listener()
+            cls._logger = None
+
+    @classmethod
+    def _get_logger(cls):
+        if cls._logger is None:
+            cls.configure(**cls._config)
+        return cls._logger
+
+    @classmethod
+    def is_enabled(cls, kind):
+        """该类型的日志在当前级别下是否会输出（可用于跳过昂贵的消息拼接）"""
+        return cls._get_logger().isEnabledFor(cls.STYLES[kind][3])
+
+    @classmethod
+    def is_interactive(cls):
+        """当前输出是否为可重绘的彩色终端"""
+        cls._get_logger()
+        return cls._interactive
+
+    @classmethod
+    def _log(cls, kind, message):
+        logger = cls._get_logger()
+        level = cls.STYLES[kind][3]
+        if logger.isEnabledFor(level):
+            logger.log(level, message, extra={"kind": kind})
+
+    @classmethod
+    def success(cls, message):
+        """成功信息 - 绿色"""
+        cls._log('success', message)
+
+    @classmethod
+    def error(cls, message):
+        """错误信息 - 红色"""
+        cls._log('error', message)
+
+    @classmethod
+    def warning(cls, message):
+        """警告信息 - 黄色"""
+        cls._log('warning', message)
+
+    @classmethod
+    def info(cls, message):
+        """信息 - 蓝色"""
+        cls._log('info', message)
+
+    @classmethod
+    def progress(cls, message):
+        """进度信息 - 青色"""
+        cls._log('progress', message)
+
+    @classmethod
+    def generating(cls, message):
+        """生成中 - 洋红色"""
+        cls._log('generating', message)
+
+    @classmethod
+    def download(cls, message):
+        """下载信息 - 绿色"""
+        cls._log('download', message)
+
+    @classmethod
+    def compose(cls, message):
+        """合成信息 - 黄色"""
+        cls._log('compose', message)
+
+    @classmethod
+    def header(cls, message):
+        """标题 - 粗体白色"""
+        cls._log('header', message)
+
+    @classmethod
+    def progress_frame(cls, frame):
+        """多行进度面板（仅彩色终端显示，整帧替换上一帧）"""
+        cls._log('progress_frame', frame)
+
+    @classmethod
+    def end_progress(cls):
+        """结束同行进度条（换行）"""
+        cls._log('progress_end', "")
+
+    @classmethod
+    def progress_bar(cls, current, total, prefix="", suffix="", length=30):
+        """炫酷进度条"""
+        percent = int(100 * (current / total))
+        filled_length = int(length * current // total)
+
+        # 创建进度条
+        bar_filled = '█' * filled_length
+        bar_empty = '░' * (length - filled_length)
+        bar = f"[{bar_filled}{bar_empty}]"
+
+        # 彩色终端下由格式化器加上颜色并使用\r实现同行覆盖
+        cls._log('progress_bar', f"{prefix} {bar} {percent}% {suffix}")
+
+
+atexit.register(ColorLogger.flush)
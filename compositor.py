@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 卡牌图层合成后端
+compose_card 把标题栏、AI图片（带上下渐变遮罩）和底栏按顺序叠加到背景上，叠加由合成后端完成：
+
+    pillow  逐层 Image.paste（默认）
+    numpy   在 NumPy 数组上做 alpha 混合，与 Pillow 的取整方式相同，输出逐像素一致；
+            不随卡牌变化的图层（模板）预先叠加并缓存，每张卡牌只混合AI图片区域
+
+运行时选择：CardGenerator(compositor="numpy")，或环境变量 CARD_COMPOSITOR=numpy。
+"""
+
+import os
+
+import numpy as np
+from PIL import Image
+
+# 默认合成后端（可用 CARD_COMPOSITOR 环境变量覆盖）
+DEFAULT_COMPOSITOR = "pillow"
+
+
+class Layer:
+    """一个图层：image 粘贴到 (x, y)，mask 为遮罩（None 表示直接覆盖）；static 表示各张卡牌都相同（模板）"""
+
+    __slots__ = ("image", "xy", "mask", "static")
+
+    def __init__(self, image, xy, mask=None, static=False):
+        self.image = image
+        self.xy = xy
+        self.mask = mask
+        self.static = static
+
+    @property
+    def box(self):
+        x, y = self.xy
+        return (x, y, x + self.image.width, y + self.image.height)
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _runs(flags):
+    """布尔数组中连续为 True 的区间 [(start, stop), ...]"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], flags, [False])).astype(np.int8)))
+    return zip(edges[::2].tolist(), edges[1::2].tolist())
+
+
+class PillowCompositor:
+    """逐层调用 Image.paste"""
+
+    name = "pillow"
+
+    def composite(self, background, layers):
+        canvas = background.copy()
+        for layer in layers:
+            canvas.paste(layer.image, layer.xy, layer.mask)
+        return canvas
+
+
+class NumpyCompositor:
+    """在 uint8 数组上做与 Image.paste 相同的 alpha 混合（画布为 RGBA）"""
+
+    name = "numpy"
+
+    def __init__(self):
+        # 最近一次的模板底图：(背景, 静态图层引用, 数组)；持有引用，模板重新加载后自然失效
+        self._base = None
+        # 遮罩/图层像素数组，按图片对象缓存（渐变遮罩等由调用方复用）
+        self._arrays = {}
+
+    def _array(self, image, mode=None, cache=True):
+        if mode is not None and image.mode != mode:
+            return np.asarray(image.convert(mode))
+        if not cache:
+            return np.asarray(image)
+        key = id(image)
+        cached = self._arrays.get(key)
+        if cached is None or cached[0] is not image:
+            if len(self._arrays) > 16:
+                self._arrays.clear()
+            cached = (image, np.asarray(image))
+            self._arrays[key] = cached
+        return cached[1]
+
+    @staticmethod
+    def blend(canvas, source, alpha, xy):
+        """把 source (h, w, 4) 按 alpha (h, w) 混合到 RGBA 画布 canvas 的 xy 处（超出画布的部分裁掉）
+        取整与 Pillow 相同：(dst·(255-a) + src·a + 128) 再做一次近似除以255；
+        遮罩整行为255的行直接复制、整行为0的行跳过，只对渐变行做乘加"""
+        x, y = xy
+        height, width = source.shape[:2]
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + width, canvas.shape[1]), min(y + height, canvas.shape[0])
+        if left >= right or top >= bottom:
+            return
+        source = source[top - y:bottom - y, left - x:right - x]
+        region = canvas[top:bottom, left:right]
+        if alpha is None:
+            region[...] = source
+            return
+
+        alpha = alpha[top - y:bottom - y, left - x:right - x]
+        opaque = alpha.min(axis=1) == 255
+        partial = ~opaque & (alpha.max(axis=1) > 0)
+        # 连续的不透明行按切片复制（视图，不产生中间数组）
+        for start, stop in _runs(opaque):
+            region[start:stop] = source[start:stop]
+        rows = np.flatnonzero(partial)
+        if rows.size:
+            a = alpha[rows, :, None].astype(np.uint16)
+            mixed = region[rows] * (255 - a) + source[rows] * a + 128
+            region[rows] = ((mixed >> 8) + mixed) >> 8
+
+    def _apply(self, canvas, layer):
+        image = layer.image
+        # 每张卡牌不同的图层（AI图片）不缓存，避免持有已合成卡牌的图片；
+        # RGB 图片由 Pillow 转为 RGBA（alpha 为255，与 paste 的转换相同），比在数组上按通道拷贝快
+        source = self._array(image, "RGBA", cache=layer.static)
+        if layer.mask is None:
+            alpha = None
+        elif layer.mask is image and image.mode == "RGBA":
+            alpha = source[..., 3]
+        else:
+            mask = layer.mask
+            alpha = self._array(mask) if mask.mode == "L" else self._array(mask, "RGBA")[..., 3]
+        self.blend(canvas, source, alpha, layer.xy)
+
+    def _base_canvas(self, background, layers):
+        """先叠加与所有动态图层都不重叠的静态图层（此时叠加顺序不影响结果），按模板缓存"""
+        dynamic = [layer.box for layer in layers if not layer.static]
+        static = [
+            layer for layer in layers
+            if layer.static and not any(_overlaps(layer.box, box) for box in dynamic)
+        ]
+        refs = tuple((layer.image, layer.xy, layer.mask) for layer in static)
+        cached = self._base
+        if (cached is None or cached[0] is not background or len(cached[1]) != len(refs)
+                or any(a[0] is not b[0] or a[1] != b[1] or a[2] is not b[2] for a, b in zip(cached[1], refs))):
+            canvas = np.array(background.convert("RGBA"))
+            for layer in static:
+                self._apply(canvas, layer)
+            cached = self._base = (background, refs, canvas)
+        return cached[2].copy(), static
+
+    def composite(self, background, layers):
+        canvas, done = self._base_canvas(background, layers)
+        for layer in layers:
+            if not any(layer is d for d in done):
+                self._apply(canvas, layer)
+        result = Image.fromarray(canvas)
+        return result if background.mode == "RGBA" else result.convert(background.mode)
+
+
+COMPOSITORS = {
+    "pillow": PillowCompositor,
+    "numpy": NumpyCompositor,
+}
+
+
+def get_compositor(name=None):
+    """按名称创建合成后端；name 为空时读取 CARD_COMPOSITOR 环境变量"""
+    name = (name or os.environ.get("CARD_COMPOSITOR") or DEFAULT_COMPOSITOR).lower()
+    if name not in COMPOSITORS:
+        raise ValueError(f"未知的合成后端: {name}（可选 {', '.join(COMPOSITORS)}）")
+    return COMPOSITORS[name]()
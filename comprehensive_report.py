@@ -5,6 +5,7 @@
 生成包含所有功能、数据、分析的Word汇报文档
 """
 
+import argparse
 import json
 import os
 import subprocess
@@ -15,11 +16,42 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.oxml.shared import OxmlElement, qn
 import glob
+from card_loader import format_error
+from card_catalogue import CardCatalogue, build_key, source_hash, cached_report, record_report
+
+# 固定顺序优先展示的分组：(分组, 标题)，其余分组按名称排序，标题前缀为 🎯
+FEATURED_GROUPS = [
+    ('军事卡', '⚔️ 军事卡牌'),
+    ('经济卡', '💰 经济卡牌'),
+    ('锦囊牌', '📜 锦囊牌'),
+]
 
 class ComprehensiveReport:
-    def __init__(self):
+    def __init__(self, cards_file='cards.json'):
+        self.cards_file = cards_file
+        self.catalogue = None
         self.doc = Document()
         self.setup_styles()
+    
+    def load_catalogue(self):
+        """一次遍历加载并聚合卡牌数据（与Word导出共用同一聚合层）"""
+        if self.catalogue is None:
+            errors = []
+            try:
+                self.catalogue = CardCatalogue.load(self.cards_file, errors=errors)
+            except Exception as e:
+                print(f"❌ 读取cards.json失败: {e}")
+                self.catalogue = CardCatalogue()
+            for error in errors:
+                print(f"⚠️  跳过无效卡牌 {format_error(error)}")
+        return self.catalogue
+    
+    def build_key(self):
+        return build_key(self.load_catalogue(), source_hash(__file__))
+    
+    def cached_output(self):
+        """卡牌数据与汇报代码都未变化时，返回上一次生成的汇报路径"""
+        return cached_report("report", self.build_key())
         
     def setup_styles(self):
         """设置文档样式"""
@@ -67,103 +99,50 @@ class ComprehensiveReport:
         """添加纯卡牌功能汇总"""
         self.doc.add_heading('🃏 卡牌功能汇总', 1)
         
-        # 读取卡牌数据
-        try:
-            with open('cards.json', 'r', encoding='utf-8') as f:
-                cards_data = json.load(f)
-        except:
-            cards_data = []
-        
-        if not cards_data:
+        catalogue = self.load_catalogue()
+        if not catalogue.total:
             self.doc.add_paragraph("❌ 未找到卡牌数据文件")
             return
-            
-        # 军事卡牌汇总
-        self.doc.add_heading('⚔️ 军事卡牌', 2)
-        military_cards = [card for card in cards_data if card.get('card_group') == '军事卡']
-        
-        military_table = self.doc.add_table(rows=1, cols=2)
-        military_table.style = 'Light Grid Accent 1'
-        
-        header_cells = military_table.rows[0].cells
-        header_cells[0].text = '🃏 卡牌名称'
-        header_cells[1].text = '📝 卡牌描述'
-        
-        for card in military_cards:
-            row_cells = military_table.add_row().cells
-            row_cells[0].text = card.get('card_name', '')
-            row_cells[1].text = card.get('description', '')
-        
-        # 经济卡牌汇总
-        self.doc.add_heading('💰 经济卡牌', 2)
-        economy_cards = [card for card in cards_data if card.get('card_group') == '经济卡']
-        
-        economy_table = self.doc.add_table(rows=1, cols=2)
-        economy_table.style = 'Light Grid Accent 1'
-        
-        header_cells = economy_table.rows[0].cells
-        header_cells[0].text = '🃏 卡牌名称'
-        header_cells[1].text = '📝 卡牌描述'
         
-        for card in economy_cards:
-            row_cells = economy_table.add_row().cells
-            row_cells[0].text = card.get('card_name', '')
-            row_cells[1].text = card.get('description', '')
-        
-        # 锦囊牌汇总（单独处理，确保显示）
-        self.doc.add_heading('📜 锦囊牌', 2)
-        jinlang_cards = [card for card in cards_data if card.get('card_group') == '锦囊牌']
-        
-        jinlang_table = self.doc.add_table(rows=1, cols=2)
-        jinlang_table.style = 'Light Grid Accent 1'
-        
-        header_cells = jinlang_table.rows[0].cells
-        header_cells[0].text = '🃏 卡牌名称'
-        header_cells[1].text = '📝 卡牌描述'
-        
-        for card in jinlang_cards:
-            row_cells = jinlang_table.add_row().cells
-            row_cells[0].text = card.get('card_name', '')
-            row_cells[1].text = card.get('description', '')
-        
-        # 其他卡牌类型汇总（排除军事卡、经济卡、锦囊牌）
-        other_groups = set(card.get('card_group') for card in cards_data) - {'军事卡', '经济卡', '锦囊牌'}
-        
-        for group in sorted(other_groups):
-            if not group:
+        # 军事、经济、锦囊牌固定在前（锦囊牌单独处理，确保显示），其余类型按名称排序
+        featured = {group for group, _ in FEATURED_GROUPS}
+        sections = list(FEATURED_GROUPS) + [
+            (group, f'🎯 {group}')
+            for group in sorted(g for g in catalogue.groups if g and g not in featured)
+        ]
+        for group, heading in sections:
+            group_cards = catalogue.cards(group)
+            if group not in featured and not group_cards:
                 continue
-                
-            group_cards = [card for card in cards_data if card.get('card_group') == group]
-            if group_cards:
-                self.doc.add_heading(f'🎯 {group}', 2)
-                
-                group_table = self.doc.add_table(rows=1, cols=2)
-                group_table.style = 'Light Grid Accent 1'
-                
-                header_cells = group_table.rows[0].cells
-                header_cells[0].text = '🃏 卡牌名称'
-                header_cells[1].text = '📝 卡牌描述'
-                
-                for card in group_cards:
-                    row_cells = group_table.add_row().cells
-                    row_cells[0].text = card.get('card_name', '')
-                    row_cells[1].text = card.get('description', '')
+            self.doc.add_heading(heading, 2)
+            
+            group_table = self.doc.add_table(rows=1, cols=2)
+            group_table.style = 'Light Grid Accent 1'
+            
+            header_cells = group_table.rows[0].cells
+            header_cells[0].text = '🃏 卡牌名称'
+            header_cells[1].text = '📝 卡牌描述'
+            
+            for card in group_cards:
+                row_cells = group_table.add_row().cells
+                row_cells[0].text = card.get('card_name', '')
+                row_cells[1].text = card.get('description', '')
         
         # 卡牌功能统计
         self.doc.add_heading('📊 卡牌统计概览', 2)
         stats_text = f"""
-🃏 卡牌总数：{len(cards_data)} 张
+🃏 卡牌总数：{catalogue.total} 张
 
 📋 分类统计：
-• ⚔️ 军事卡牌：{len([c for c in cards_data if c.get('card_group') == '军事卡'])} 张
-• 💰 经济卡牌：{len([c for c in cards_data if c.get('card_group') == '经济卡'])} 张
-• 🏰 国家卡牌：{len([c for c in cards_data if c.get('card_group') == '国家卡'])} 张
-• 🧠 思想卡牌：{len([c for c in cards_data if c.get('card_group') == '思想卡'])} 张
-• ⚖️ 变法卡牌：{len([c for c in cards_data if c.get('card_group') == '变法卡'])} 张
-• 🔗 连锁卡牌：{len([c for c in cards_data if c.get('card_group') == '连锁卡'])} 张
-• 🎁 道具卡牌：{len([c for c in cards_data if c.get('card_group') == '道具卡'])} 张
-• 📜 锦囊卡牌：{len([c for c in cards_data if c.get('card_group') == '锦囊牌'])} 张
-• 🙏 祭祀卡牌：{len([c for c in cards_data if c.get('card_group') == '祭祀卡'])} 张
+• ⚔️ 军事卡牌：{catalogue.count('军事卡')} 张
+• 💰 经济卡牌：{catalogue.count('经济卡')} 张
+• 🏰 国家卡牌：{catalogue.count('国家卡')} 张
+• 🧠 思想卡牌：{catalogue.count('思想卡')} 张
+• ⚖️ 变法卡牌：{catalogue.count('变法卡')} 张
+• 🔗 连锁卡牌：{catalogue.count('连锁卡')} 张
+• 🎁 道具卡牌：{catalogue.count('道具卡')} 张
+• 📜 锦囊卡牌：{catalogue.count('锦囊牌')} 张
+• 🙏 祭祀卡牌：{catalogue.count('祭祀卡')} 张
         """
         self.doc.add_paragraph(stats_text)
     
@@ -183,13 +162,21 @@ class ComprehensiveReport:
         print(f"🎉 综合汇报生成完成：{filename}")
         return filename
 
-def main():
+def main(argv=None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="春秋杀项目综合汇报生成器")
+    parser.add_argument("--force", action="store_true", help="即使卡牌数据未变化也重新生成")
+    args = parser.parse_args(argv)
+    
     print("📊 春秋杀项目综合汇报生成器")
     print("=" * 50)
     
+    # ♻️ 卡牌数据未变化时沿用上一次的综合汇报
+    report_generator = ComprehensiveReport()
+    cached = None if args.force else report_generator.cached_output()
+    
     # 🗑️ 删除旧的综合汇报文件和游戏记录表
-    old_reports = glob.glob("春秋杀项目综合汇报_*.docx")
+    old_reports = [] if cached else glob.glob("春秋杀项目综合汇报_*.docx")
     old_sheets = glob.glob("春秋杀游戏记录表_*.xlsx")
     old_files = old_reports + old_sheets
     
@@ -214,8 +201,12 @@ def main():
         print(f"⚠️  游戏记录表生成失败：{e}")
     
     # 生成综合汇报
-    report_generator = ComprehensiveReport()
-    report_file = report_generator.generate_report()
+    if cached:
+        print(f"♻️ 卡牌数据未变化，沿用已有汇报：{cached}（--force 强制重新生成）")
+        report_file = cached
+    else:
+        report_file = report_generator.generate_report()
+        record_report("report", report_generator.build_key(), report_file)
     
     print("\n📋 汇报内容包含：")
     print("   • 🃏 卡牌功能汇总")
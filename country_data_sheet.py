@@ -6,37 +6,77 @@
 """
 
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+import argparse
 import glob
+import json
 import os
+import time
+
+# 8个国家的初始数据参考（玩家多于8人时其余行留空）
+COUNTRIES_DATA = [
+    "🐉 秦国 (军85/经70/政60)",
+    "🐦 楚国 (军75/经80/政70)",
+    "🦅 齐国 (军70/经90/政85)",
+    "🕊️ 燕国 (军60/经50/政55)",
+    "🐎 赵国 (军80/经65/政70)",
+    "🛡️ 魏国 (军75/经75/政80)",
+    "🏹 韩国 (军65/经60/政65)",
+    "👑 周王室 (军40/经85/政95)"
+]
+
+LAST_COLUMN = 13  # A-M
+
+def country_reference(country):
+    """'秦国' / '秦' -> 带初始数据的参考文字；不在列表中时原样返回"""
+    if not country:
+        return None
+    for entry in COUNTRIES_DATA:
+        name = entry.split()[1]
+        if country in (name, name.rstrip('国')):
+            return entry
+    return country
 
 class GameRecordSheet:
-    def __init__(self):
-        self.workbook = openpyxl.Workbook()
-        self.worksheet = self.workbook.active
-        self.worksheet.title = "春秋杀游戏记录表"
-        
-        # 样式定义
-        self.header_font = Font(name='微软雅黑', size=12, bold=True, color='FFFFFF')
-        self.label_font = Font(name='微软雅黑', size=10, bold=True)
-        self.data_font = Font(name='微软雅黑', size=9)
-        self.small_font = Font(name='微软雅黑', size=8)
+    """游戏记录表（按玩家数与轮数参数化，使用命名样式 + 只写流式模式逐行写出）"""
+    
+    def __init__(self, players=8, rounds=10, tax_rounds=15, roster=None, title=None, game_date=None, start_time=None):
+        # roster：预填的玩家列表 [{"name": ..., "country": ...}]，提供时玩家数取名单人数
+        self.roster = roster or []
+        self.players = len(self.roster) if self.roster else players
+        self.rounds = rounds
+        self.tax_rounds = tax_rounds
+        self.title = title
+        self.game_date = game_date
+        self.start_time = start_time
+        
+        # 只写模式：行写出后不再保留在内存中，表格再大内存也保持平稳
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet("春秋杀游戏记录表")
+        self.current_row = 0
+        
+        # 字体
+        header_font = Font(name='微软雅黑', size=12, bold=True, color='FFFFFF')
+        label_font = Font(name='微软雅黑', size=10, bold=True)
+        small_font = Font(name='微软雅黑', size=8)
         
         # 填充色
-        self.header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        self.label_fill = PatternFill(start_color='D9E2F3', end_color='D9E2F3', fill_type='solid')
-        self.round_fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
+        header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+        label_fill = PatternFill(start_color='D9E2F3', end_color='D9E2F3', fill_type='solid')
+        round_fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
         
         # 边框样式
-        self.thick_border = Border(
+        thick_border = Border(
             left=Side(style='thick'),
             right=Side(style='thick'),
             top=Side(style='thick'),
             bottom=Side(style='thick')
         )
-        self.thin_border = Border(
+        thin_border = Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
             top=Side(style='thin'),
@@ -44,54 +84,112 @@ class GameRecordSheet:
         )
         
         # 对齐样式
-        self.center_alignment = Alignment(horizontal='center', vertical='center')
-        self.left_alignment = Alignment(horizontal='left', vertical='center')
-        
+        center_alignment = Alignment(horizontal='center', vertical='center')
+        left_alignment = Alignment(horizontal='left', vertical='center')
+        
+        # 命名样式：在工作簿中只注册一次，单元格按名称引用
+        styles = {
+            "记录表标题": dict(font=Font(name='微软雅黑', size=18, bold=True, color='2F5597'),
+                          fill=header_fill, alignment=center_alignment, border=thick_border),
+            "区域标题": dict(font=header_font, fill=header_fill, alignment=center_alignment, border=thick_border),
+            "表头": dict(font=label_font, fill=label_fill, alignment=center_alignment, border=thin_border),
+            "小表头": dict(font=small_font, fill=label_fill, alignment=center_alignment, border=thin_border),
+            "标签": dict(font=label_font, fill=label_fill, border=thin_border),
+            "轮次分隔": dict(font=label_font, fill=round_fill, alignment=center_alignment, border=thick_border),
+            "回合": dict(font=small_font, fill=round_fill, border=thin_border),
+            "玩家标识": dict(font=small_font, fill=label_fill, border=thin_border),
+            "小字": dict(font=small_font, border=thin_border),
+            "说明": dict(font=small_font, alignment=left_alignment, border=thin_border),
+            "空白格": dict(border=thin_border),
+        }
+        # 每个样式只按名称解析一次，之后的单元格直接共用解析好的样式数组
+        self._style_arrays = {}
+        for name, attrs in styles.items():
+            self.workbook.add_named_style(NamedStyle(name=name, **attrs))
+            prototype = WriteOnlyCell(self.worksheet)
+            prototype.style = name
+            self._style_arrays[name] = prototype._style
+    
+    # ---- 逐行写出 ----
+    
+    def cell(self, value=None, style="空白格"):
+        """带命名样式的单元格"""
+        return Cell(self.worksheet, row=1, column=1, value=value, style_array=self._style_arrays[style])
+    
+    def append_row(self, cells=(), merges=()):
+        """写出一行；merges 为本行需要合并的 (起始列, 结束列)"""
+        self.worksheet.append(list(cells))
+        self.current_row += 1
+        for first, last in merges:
+            self.worksheet.merged_cells.add(
+                f'{get_column_letter(first)}{self.current_row}:{get_column_letter(last)}{self.current_row}'
+            )
+    
+    def pad_to(self, row):
+        """补空行，使下一行写在第row行"""
+        while self.current_row < row - 1:
+            self.append_row()
+    
+    def merged_row(self, value, style, last_column=LAST_COLUMN):
+        """整行合并的单行（合并区域内每格使用相同样式，保证边框完整）"""
+        cells = [self.cell(value, style)] + [self.cell(None, style) for _ in range(last_column - 1)]
+        self.append_row(cells, merges=[(1, last_column)])
+    
+    def section_title(self, start_row, title):
+        """区域标题"""
+        self.pad_to(start_row)
+        self.merged_row(title, "区域标题")
+    
+    def header_row(self, headers, style="表头"):
+        self.append_row([self.cell(header, style) for header in headers])
+    
+    def blank_rows(self, count, columns, first_column=None):
+        """预留的空白填写行；first_column(行号) 返回首列单元格"""
+        for i in range(1, count + 1):
+            cells = [first_column(i)] if first_column else [self.cell()]
+            cells += [self.cell() for _ in range(columns - 1)]
+            self.append_row(cells)
+    
+    def player_name(self, player_num):
+        """名单中的玩家姓名，没有名单时为 玩家N"""
+        if player_num <= len(self.roster) and self.roster[player_num - 1].get("name"):
+            return self.roster[player_num - 1]["name"]
+        return f"玩家{player_num}"
+    
+    # ---- 各区域 ----
+    
     def setup_game_info(self):
         """设置游戏基本信息区域"""
         # 主标题
-        self.worksheet.merge_cells('A1:M1')
-        title_cell = self.worksheet['A1']
-        title_cell.value = "🏰 春秋杀游戏记录表"
-        title_cell.font = Font(name='微软雅黑', size=18, bold=True, color='2F5597')
-        title_cell.alignment = self.center_alignment
-        title_cell.fill = self.header_fill
-        title_cell.border = self.thick_border
-        
-        # 游戏信息
+        title = "🏰 春秋杀游戏记录表"
+        if self.title:
+            title += f" - {self.title}"
+        self.merged_row(title, "记录表标题")
+        
+        # 游戏信息（有名单时预填玩家数量与轮数）
         row = 3
         info_data = [
-            ("📅 游戏日期:", ""),
-            ("🎮 玩家数量:", ""),
-            ("⏰ 开始时间:", ""),
-            ("🎯 游戏轮数:", ""),
+            ("📅 游戏日期:", self.game_date or ""),
+            ("🎮 玩家数量:", f"{self.players}人" if self.roster else ""),
+            ("⏰ 开始时间:", self.start_time or ""),
+            ("🎯 游戏轮数:", f"{self.rounds}轮" if self.roster else ""),
         ]
         
+        self.pad_to(row)
+        cells = []
+        merges = []
         for i, (label, value) in enumerate(info_data):
-            # 标签
-            label_cell = self.worksheet.cell(row=row, column=1 + i*3)
-            label_cell.value = label
-            label_cell.font = self.label_font
-            label_cell.fill = self.label_fill
-            label_cell.border = self.thin_border
-            
-            # 空白填写区域（合并2列）
-            self.worksheet.merge_cells(f'{get_column_letter(2 + i*3)}{row}:{get_column_letter(3 + i*3)}{row}')
-            value_cell = self.worksheet.cell(row=row, column=2 + i*3)
-            value_cell.border = self.thin_border
+            # 标签 + 空白填写区域（合并2列）
+            cells += [self.cell(label, "标签"), self.cell(value or None), self.cell()]
+            merges.append((2 + i*3, 3 + i*3))
+        self.append_row(cells, merges)
     
     def setup_player_info(self):
         """设置玩家初始信息区域"""
         start_row = 5
         
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "👥 玩家初始信息（8人）"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
+        self.section_title(start_row, f"👥 玩家初始信息（{self.players}人）")
         
         # 表头
         headers = [
@@ -106,63 +204,27 @@ class GameRecordSheet:
             "🌟 特殊状态",
             "📝 备注"
         ]
-        
-        header_row = start_row + 1
-        for col, header in enumerate(headers, 1):
-            cell = self.worksheet.cell(row=header_row, column=col)
-            cell.value = header
-            cell.font = self.label_font
-            cell.fill = self.label_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.thin_border
-        
-        # 8个国家的初始数据参考
-        countries_data = [
-            "🐉 秦国 (军85/经70/政60)",
-            "🐦 楚国 (军75/经80/政70)", 
-            "🦅 齐国 (军70/经90/政85)",
-            "🕊️ 燕国 (军60/经50/政55)",
-            "🐎 赵国 (军80/经65/政70)",
-            "🛡️ 魏国 (军75/经75/政80)",
-            "🏹 韩国 (军65/经60/政65)",
-            "👑 周王室 (军40/经85/政95)"
-        ]
-        
-        # 预留8个玩家位置
-        for player_num in range(1, 9):
-            row = header_row + player_num
-            for col in range(1, len(headers) + 1):
-                cell = self.worksheet.cell(row=row, column=col)
-                if col == 1:  # 玩家姓名列
-                    cell.value = f"玩家{player_num}:"
-                    cell.font = self.small_font
-                elif col == 2:  # 国家列，显示参考信息
-                    if player_num <= len(countries_data):
-                        cell.value = countries_data[player_num - 1]
-                        cell.font = self.small_font
-                cell.border = self.thin_border
-        
-        return start_row + 10  # 返回下一个区域的起始行
+        self.header_row(headers)
+        
+        # 预留玩家位置，国家列显示参考信息（有名单时填入玩家所选国家）
+        for player_num in range(1, self.players + 1):
+            if self.roster:
+                country = country_reference(self.roster[player_num - 1].get("country"))
+            else:
+                country = COUNTRIES_DATA[player_num - 1] if player_num <= len(COUNTRIES_DATA) else None
+            cells = [self.cell(f"{self.player_name(player_num)}:", "小字"), self.cell(country, "小字" if country else "空白格")]
+            cells += [self.cell() for _ in range(len(headers) - 2)]
+            self.append_row(cells)
+        
+        return start_row + self.players + 2  # 返回下一个区域的起始行
     
     def setup_zhou_tax_record(self, start_row):
         """设置周王室税收记录区域"""
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "👑 周王室税收记录"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
+        self.section_title(start_row, "👑 周王室税收记录")
         
         # 税收说明
-        tax_info_row = start_row + 1
-        self.worksheet.merge_cells(f'A{tax_info_row}:M{tax_info_row}')
-        tax_info_cell = self.worksheet[f'A{tax_info_row}']
-        tax_info_cell.value = "📋 各国向周王室纳税：秦10、楚8、齐12、燕5、赵8、魏10、韩6春秋币/回合（周王室自己不用纳税）"
-        tax_info_cell.font = self.small_font
-        tax_info_cell.alignment = self.left_alignment
-        tax_info_cell.border = self.thin_border
+        self.merged_row("📋 各国向周王室纳税：秦10、楚8、齐12、燕5、赵8、魏10、韩6春秋币/回合（周王室自己不用纳税）", "说明")
         
         # 表头
         headers = [
@@ -178,39 +240,17 @@ class GameRecordSheet:
             "💰 总收入",
             "📝 备注"
         ]
+        self.header_row(headers)
+        
+        # 预留税收记录
+        self.blank_rows(self.tax_rounds, len(headers), lambda n: self.cell(f"第{n}轮", "回合"))
         
-        header_row = start_row + 2
-        for col, header in enumerate(headers, 1):
-            cell = self.worksheet.cell(row=header_row, column=col)
-            cell.value = header
-            cell.font = self.label_font
-            cell.fill = self.label_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.thin_border
-        
-        # 预留15轮税收记录
-        for round_num in range(1, 16):
-            row = header_row + round_num
-            for col in range(1, len(headers) + 1):
-                cell = self.worksheet.cell(row=row, column=col)
-                if col == 1:  # 回合数列
-                    cell.value = f"第{round_num}轮"
-                    cell.font = self.small_font
-                    cell.fill = self.round_fill
-                cell.border = self.thin_border
-        
-        return start_row + 18  # 返回下一个区域的起始行
+        return start_row + self.tax_rounds + 3  # 返回下一个区域的起始行
     
     def setup_round_records(self, start_row):
         """设置回合记录区域（每轮每个玩家的状态）"""
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "🔄 每轮玩家状态记录（每轮结束时填写所有玩家当前状态）"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
+        self.section_title(start_row, "🔄 每轮玩家状态记录（每轮结束时填写所有玩家当前状态）")
         
         # 表头
         headers = [
@@ -225,114 +265,43 @@ class GameRecordSheet:
             "🌟 特殊加成",
             "📝 备注"
         ]
+        self.header_row(headers)
         
-        header_row = start_row + 1
-        for col, header in enumerate(headers, 1):
-            cell = self.worksheet.cell(row=header_row, column=col)
-            cell.value = header
-            cell.font = self.label_font
-            cell.fill = self.label_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.thin_border
-        
-        # 预留10轮记录空间，每轮8个玩家
-        for round_num in range(1, 11):
+        for round_num in range(1, self.rounds + 1):
             # 每轮开始先标记回合数
-            round_start_row = header_row + (round_num - 1) * 9 + 1
-            self.worksheet.merge_cells(f'A{round_start_row}:J{round_start_row}')
-            round_cell = self.worksheet[f'A{round_start_row}']
-            round_cell.value = f"--- 第 {round_num} 轮 ---"
-            round_cell.font = self.label_font
-            round_cell.fill = self.round_fill
-            round_cell.alignment = self.center_alignment
-            round_cell.border = self.thick_border
+            self.merged_row(f"--- 第 {round_num} 轮 ---", "轮次分隔", last_column=len(headers))
             
-            # 8个玩家记录行
-            for player_num in range(1, 9):
-                row = round_start_row + player_num
-                for col in range(1, len(headers) + 1):
-                    cell = self.worksheet.cell(row=row, column=col)
-                    if col == 1:  # 玩家标识列
-                        cell.value = f"玩家{player_num}"
-                        cell.font = self.small_font
-                        cell.fill = self.label_fill
-                    cell.border = self.thin_border
-        
-        return start_row + 91  # 返回下一个区域的起始行 (1标题 + 1表头 + 10轮*(1标题+8行))
+            # 每个玩家一行
+            self.blank_rows(self.players, len(headers), lambda n: self.cell(self.player_name(n), "玩家标识"))
+        
+        # 1标题 + 1表头 + 每轮(1标题 + 玩家行)
+        return start_row + 2 + self.rounds * (self.players + 1)
     
     def setup_card_records(self, start_row):
         """设置卡牌记录区域"""
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "🃏 卡牌购买/使用记录"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
-        
-        # 左侧：卡牌购买记录
-        buy_start_col = 1
-        self.worksheet.merge_cells(f'{get_column_letter(buy_start_col)}{start_row + 1}:{get_column_letter(buy_start_col + 5)}{start_row + 1}')
-        buy_title = self.worksheet.cell(row=start_row + 1, column=buy_start_col)
-        buy_title.value = "💰 卡牌购买记录"
-        buy_title.font = self.label_font
-        buy_title.fill = self.label_fill
-        buy_title.alignment = self.center_alignment
-        buy_title.border = self.thin_border
+        self.section_title(start_row, "🃏 卡牌购买/使用记录")
         
-        buy_headers = ["👤 玩家", "🃏 卡牌名称", "💰 价格", "🎯 回合", "📝 效果", "✅ 状态"]
-        for col, header in enumerate(buy_headers):
-            cell = self.worksheet.cell(row=start_row + 2, column=buy_start_col + col)
-            cell.value = header
-            cell.font = self.small_font
-            cell.fill = self.label_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.thin_border
-        
-        # 预留15行购买记录
-        for i in range(15):
-            for col in range(6):
-                cell = self.worksheet.cell(row=start_row + 3 + i, column=buy_start_col + col)
-                cell.border = self.thin_border
-        
-        # 右侧：卡牌使用记录
-        use_start_col = 7
-        self.worksheet.merge_cells(f'{get_column_letter(use_start_col)}{start_row + 1}:{get_column_letter(use_start_col + 5)}{start_row + 1}')
-        use_title = self.worksheet.cell(row=start_row + 1, column=use_start_col)
-        use_title.value = "🎯 卡牌使用记录"
-        use_title.font = self.label_font
-        use_title.fill = self.label_fill
-        use_title.alignment = self.center_alignment
-        use_title.border = self.thin_border
+        # 左侧：卡牌购买记录；右侧：卡牌使用记录（各6列，合并标题）
+        self.append_row(
+            [self.cell("💰 卡牌购买记录", "表头")] + [self.cell(None, "表头") for _ in range(5)]
+            + [self.cell("🎯 卡牌使用记录", "表头")] + [self.cell(None, "表头") for _ in range(5)],
+            merges=[(1, 6), (7, 12)],
+        )
         
+        buy_headers = ["👤 玩家", "🃏 卡牌名称", "💰 价格", "🎯 回合", "📝 效果", "✅ 状态"]
         use_headers = ["👤 玩家", "🃏 卡牌名称", "🎯 目标", "🎲 结果", "🔄 回合", "📝 说明"]
-        for col, header in enumerate(use_headers):
-            cell = self.worksheet.cell(row=start_row + 2, column=use_start_col + col)
-            cell.value = header
-            cell.font = self.small_font
-            cell.fill = self.label_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.thin_border
-        
-        # 预留15行使用记录
-        for i in range(15):
-            for col in range(6):
-                cell = self.worksheet.cell(row=start_row + 3 + i, column=use_start_col + col)
-                cell.border = self.thin_border
+        self.header_row(buy_headers + use_headers, style="小表头")
+        
+        # 预留15行购买/使用记录
+        self.blank_rows(15, len(buy_headers) + len(use_headers))
         
         return start_row + 19  # 返回下一个区域的起始行
     
     def setup_diplomacy_records(self, start_row):
         """设置外交记录区域"""
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "🤝 外交与结盟记录"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
+        self.section_title(start_row, "🤝 外交与结盟记录")
         
         # 表头
         headers = [
@@ -346,48 +315,28 @@ class GameRecordSheet:
             "🌟 特殊效果",
             "📝 备注"
         ]
-        
-        header_row = start_row + 1
-        for col, header in enumerate(headers, 1):
-            cell = self.worksheet.cell(row=header_row, column=col)
-            cell.value = header
-            cell.font = self.label_font
-            cell.fill = self.label_fill
-            cell.alignment = self.center_alignment
-            cell.border = self.thin_border
+        self.header_row(headers)
         
         # 预留12行外交记录
-        for i in range(12):
-            for col in range(1, len(headers) + 1):
-                cell = self.worksheet.cell(row=header_row + 1 + i, column=col)
-                cell.border = self.thin_border
+        self.blank_rows(12, len(headers))
         
         return start_row + 15  # 返回下一个区域的起始行
     
     def setup_notes_area(self, start_row):
         """设置备注区域"""
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "📝 游戏备注与总结"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
+        self.section_title(start_row, "📝 游戏备注与总结")
         
         # 备注区域（大空白区域）
         notes_area_rows = 8
         for row_offset in range(notes_area_rows):
-            self.worksheet.merge_cells(f'A{start_row + 1 + row_offset}:M{start_row + 1 + row_offset}')
-            cell = self.worksheet.cell(row=start_row + 1 + row_offset, column=1)
-            cell.border = self.thin_border
             if row_offset == 0:
-                cell.value = "💡 游戏心得、策略总结、有趣事件等..."
-                cell.font = self.small_font
-                cell.alignment = self.left_alignment
+                self.merged_row("💡 游戏心得、策略总结、有趣事件等...", "说明")
+            else:
+                self.merged_row(None, "空白格")
             
     def adjust_column_widths(self):
-        """调整列宽"""
+        """调整列宽（只写模式下必须在写出第一行之前设置）"""
         column_widths = {
             'A': 8,    # 第1列 - 回合/玩家 (很窄)
             'B': 11,   # 第2列 - 国家名称 (紧凑)
@@ -410,13 +359,7 @@ class GameRecordSheet:
     def add_game_rules_summary(self, start_row):
         """添加游戏规则简要说明"""
         # 标题
-        self.worksheet.merge_cells(f'A{start_row}:M{start_row}')
-        title_cell = self.worksheet[f'A{start_row}']
-        title_cell.value = "📖 游戏规则速查"
-        title_cell.font = self.header_font
-        title_cell.fill = self.header_fill
-        title_cell.alignment = self.center_alignment
-        title_cell.border = self.thick_border
+        self.section_title(start_row, "📖 游戏规则速查")
         
         # 规则说明
         rules_text = [
@@ -427,14 +370,8 @@ class GameRecordSheet:
             "🎯 胜利条件：军事征服、经济统治或政治影响力最高"
         ]
         
-        for i, rule in enumerate(rules_text):
-            row = start_row + 1 + i
-            self.worksheet.merge_cells(f'A{row}:M{row}')
-            cell = self.worksheet.cell(row=row, column=1)
-            cell.value = rule
-            cell.font = self.small_font
-            cell.alignment = self.left_alignment
-            cell.border = self.thin_border
+        for rule in rules_text:
+            self.merged_row(rule, "说明")
             
         return start_row + len(rules_text) + 2
             
@@ -443,8 +380,11 @@ class GameRecordSheet:
         if filename is None:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"春秋杀游戏记录表_{timestamp}.xlsx"
+        
+        # 只写模式下列宽需要最先设置
+        self.adjust_column_widths()
             
-        # 依次创建各个区域
+        # 依次创建各个区域（自上而下逐行写出）
         self.setup_game_info()
         
         current_row = self.setup_player_info()
@@ -455,15 +395,104 @@ class GameRecordSheet:
         current_row = self.add_game_rules_summary(current_row)
         self.setup_notes_area(current_row)
         
-        # 调整列宽
-        self.adjust_column_widths()
-        
         # 保存文件
         self.workbook.save(filename)
         return filename
 
-def main():
+def _table_name(table, index):
+    """桌名：名单中的 table / name，都没有时按顺序编号 table1、table2…"""
+    name = table.get("table") or table.get("name")
+    return str(name) if name else f"table{index + 1}"
+
+def _sheet_filename(name):
+    # 桌名可能含有路径分隔符
+    safe_name = "".join("_" if ch in '\\/:*?"<>|' else ch for ch in name)
+    return f"春秋杀游戏记录表_{safe_name}.xlsx"
+
+def _build_table_sheet(table, name, out_dir, defaults):
+    """进程池任务：生成一桌的记录表，返回 (桌名, 文件路径, 耗时秒)"""
+    started = time.perf_counter()
+    rounds = table.get("rounds", defaults.get("rounds", 10))
+    sheet = GameRecordSheet(
+        rounds=rounds,
+        tax_rounds=table.get("tax_rounds", defaults.get("tax_rounds", rounds)),
+        roster=table.get("players", []),
+        title=" ".join(part for part in (defaults.get("event"), name) if part),
+        game_date=table.get("date", defaults.get("date")),
+        start_time=table.get("start_time", defaults.get("start_time")),
+    )
+    filename = sheet.generate_sheet(os.path.join(out_dir, _sheet_filename(name)))
+    return name, filename, time.perf_counter() - started
+
+def generate_tournament_sheets(roster_file, out_dir=None, workers=None):
+    """按赛事名单为每一桌生成预填的记录表（进程池并行），不删除任何已有文件
+    
+    名单格式（JSON）：
+        {"event": "春秋杀邀请赛", "date": "2025-07-01", "rounds": 10,
+         "tables": [{"table": "1号桌", "players": [{"name": "张三", "country": "秦国"}, ...]}, ...]}
+    """
+    with open(roster_file, 'r', encoding='utf-8') as f:
+        roster = json.load(f)
+    tables = roster.get("tables", [])
+    if not tables:
+        print(f"❌ 名单中没有桌次：{roster_file}")
+        return []
+    
+    # 各桌写入不同的文件：文件名重复的桌次会互相覆盖，提交任务前就拒绝
+    names = [_table_name(table, i) for i, table in enumerate(tables)]
+    seen = {}
+    for name in names:
+        seen.setdefault(_sheet_filename(name), []).append(name)
+    duplicates = [" / ".join(group) for group in seen.values() if len(group) > 1]
+    if duplicates:
+        print(f"❌ 名单中的桌名重复（输出文件会互相覆盖）：{'；'.join(duplicates)}")
+        return []
+    
+    if out_dir is None:
+        out_dir = f"春秋杀赛事记录表_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    os.makedirs(out_dir, exist_ok=True)
+    defaults = {key: value for key, value in roster.items() if key != "tables"}
+    
+    print(f"🏁 共 {len(tables)} 桌，输出目录：{out_dir}")
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_build_table_sheet, table, name, out_dir, defaults): name
+            for table, name in zip(tables, names)
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                name, filename, seconds = future.result()
+            except Exception as e:
+                print(f"   ❌ {name}：生成失败 {e}")
+                continue
+            print(f"   ✅ {name}：{seconds * 1000:.0f} ms → {filename}")
+            results.append((name, filename, seconds))
+    
+    elapsed = time.perf_counter() - started
+    print(f"🎉 已生成 {len(results)}/{len(tables)} 张记录表，总耗时 {elapsed:.2f} 秒")
+    return results
+
+def main(argv=None):
     """主函数"""
+    parser = argparse.ArgumentParser(description="春秋杀游戏记录表生成器")
+    parser.add_argument("--players", type=int, default=8, help="玩家人数（默认8）")
+    parser.add_argument("--rounds", type=int, default=10, help="每轮状态记录的轮数（默认10）")
+    parser.add_argument("--tax-rounds", type=int, default=15, help="周王室税收记录的轮数（默认15）")
+    parser.add_argument("--roster", metavar="FILE", help="赛事名单JSON：为每一桌生成一张预填的记录表")
+    parser.add_argument("--out-dir", help="赛事记录表输出目录（默认按时间新建）")
+    parser.add_argument("--workers", type=int, help="并行进程数（默认CPU核数）")
+    args = parser.parse_args(argv)
+    
+    if args.roster:
+        # 赛事批量模式：只写入输出目录，不清理其他文件
+        print("🎮 春秋杀赛事记录表批量生成")
+        print("=" * 50)
+        generate_tournament_sheets(args.roster, args.out_dir, args.workers)
+        return
+    
     print("🎮 春秋杀游戏记录表生成器")
     print("=" * 50)
     
@@ -479,21 +508,21 @@ def main():
                 print(f"   ❌ 删除失败：{file}")
         print()
     
-    generator = GameRecordSheet()
+    generator = GameRecordSheet(players=args.players, rounds=args.rounds, tax_rounds=args.tax_rounds)
     filename = generator.generate_sheet()
     
     print(f"✅ 游戏记录表生成成功！")
     print(f"📄 文件路径：{filename}")
     print("📋 包含内容：")
     print("   • 🎮 游戏基本信息填写区")
-    print("   • 👥 玩家初始信息区（8个国家参考）")
-    print("   • 👑 周王室税收记录区（15轮税收）")
-    print("   • 🔄 每轮状态记录区（10轮×8玩家状态）")
+    print(f"   • 👥 玩家初始信息区（{args.players}人，8个国家参考）")
+    print(f"   • 👑 周王室税收记录区（{args.tax_rounds}轮税收）")
+    print(f"   • 🔄 每轮状态记录区（{args.rounds}轮×{args.players}玩家状态）")
     print("   • 🃏 卡牌购买/使用记录区")
     print("   • 🤝 外交结盟记录区")
     print("   • 📖 游戏规则速查")
     print("   • 📝 备注与总结区")
-    print("🎯 支持8人游戏，可打印出来手写记录！")
+    print(f"🎯 支持{args.players}人游戏，可打印出来手写记录！")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
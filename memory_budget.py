@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 批量合成内存预算
+读取进程常驻内存（RSS），在批量合成时统计每批的内存峰值，并在超过上限时暂停提交新的合成任务，
+让批量重新合成可以在内存较小的CI或打印服务器上运行。
+
+    with MemoryMonitor() as monitor:
+        ...
+    print(monitor.peak_mb)
+
+读取RSS优先使用 psutil（可选依赖），其次是 Linux 的 /proc/self/statm；都不可用时只记录不限流。
+"""
+
+import gc
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+# 后台采样间隔（秒）：合成一张卡牌约几十毫秒，足以捕捉单张卡牌的峰值
+SAMPLE_INTERVAL = 0.01
+
+
+def current_rss():
+    """当前进程的常驻内存（字节）；无法读取时返回 None"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def process_memory(pid=None):
+    """进程内存明细（字节）：rss 常驻、pss 按共享进程数分摊、uss 进程独占；无法读取时返回 None
+    多个工作进程共享的页面（共享内存、同一文件映射）只计入 pss 的一部分，不计入 uss"""
+    pid = os.getpid() if pid is None else pid
+    if psutil is not None:
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except (psutil.Error, AttributeError):
+            return None
+        return {"rss": info.rss, "pss": getattr(info, "pss", None), "uss": info.uss}
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return None
+    return {
+        "rss": fields.get("Rss"),
+        "pss": fields.get("Pss"),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def to_mb(value):
+    return None if value is None else value / (1 << 20)
+
+
+class MemoryMonitor:
+    """在后台线程中采样RSS，记录一段代码执行期间的起始值与峰值"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start = None
+        self.peak = None
+        self._halt = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+        return rss
+
+    def _run(self):
+        while not self._halt.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.start = self.sample()
+        if self.start is not None:
+            self._thread = threading.Thread(target=self._run, name="rss-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._halt.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample()
+        return False
+
+    @property
+    def start_mb(self):
+        return to_mb(self.start)
+
+    @property
+    def peak_mb(self):
+        return to_mb(self.peak)
+
+
+class MemoryBudget:
+    """内存上限（MB）：超过时调用方应等待进行中的任务完成后再提交新任务"""
+
+    def __init__(self, limit_mb=None):
+        self.limit = None if limit_mb is None else int(limit_mb * (1 << 20))
+        self.throttled = 0
+
+    def exceeded(self):
+        """是否超过上限；超过时先回收一次循环引用再判断"""
+        if self.limit is None:
+            return False
+        rss = current_rss()
+        if rss is None or rss <= self.limit:
+            return False
+        gc.collect()
+        rss = current_rss()
+        return rss is not None and rss > self.limit
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 离线图片后端
+不打开浏览器、不联网：按提示词哈希程序生成确定性的占位插画（PNG字节），可模拟生成耗时。
+用于队列工作进程的扩展性测试、基准测试，以及没有登录Copilot时检查整条流水线。
+
+    generator = CardGenerator(image_backend=OfflineImageBackend(latency=2.0))
+"""
+
+import asyncio
+import hashlib
+import io
+
+from benchmark import make_placeholder_art
+
+
+class OfflineImageBackend:
+    """离线图片后端：async (prompt, task_id) -> PNG字节"""
+
+    def __init__(self, latency=0.0, size=1024):
+        self.latency = latency
+        self.size = size
+
+    async def __call__(self, prompt, task_id=None):
+        if self.latency:
+            # 模拟等待AI生成（不占用CPU）
+            await asyncio.sleep(self.latency)
+        seed = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        buffer = io.BytesIO()
+        make_placeholder_art(size=self.size, seed=seed).save(buffer, "PNG", compress_level=1)
+        return buffer.getvalue()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 多任务进度显示
+同时跟踪多张正在生成的卡牌和整副卡牌的总体进度（吞吐量、预计剩余时间）。
+彩色终端下以限定帧率重绘多行面板；非交互环境（重定向、CI）定期输出一行汇总。
+"""
+
+import threading
+import time
+
+from color_logger import ColorLogger
+
+
+def format_duration(seconds):
+    """把秒数格式化为 1时02分 / 3分05秒 / 12秒"""
+    seconds = int(max(0, seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}时{minutes:02d}分"
+    if minutes:
+        return f"{minutes}分{secs:02d}秒"
+    return f"{secs}秒"
+
+
+def render_bar(current, total, length=20):
+    """文本进度条"""
+    ratio = min(1.0, current / total) if total else 0.0
+    filled = int(length * ratio)
+    return f"[{'█' * filled}{'░' * (length - filled)}]"
+
+
+class _Task:
+    def __init__(self, label, total):
+        self.label = label
+        self.total = total
+        self.current = 0
+        self.note = ""
+        self.started = time.monotonic()
+
+
+class ProgressDisplay:
+    """多任务进度渲染器（线程安全）"""
+
+    def __init__(self, max_fps=4, summary_interval=30, max_rows=8, interactive=None):
+        self.min_frame_gap = 1.0 / max_fps
+        self.summary_interval = summary_interval
+        self.max_rows = max_rows
+        self._interactive = interactive
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self.total = 0
+        self.completed = 0
+        self.failed = 0
+        self.batch_started = None
+        self._last_render = 0.0
+        self._last_summary = 0.0
+
+    @property
+    def interactive(self):
+        if self._interactive is None:
+            self._interactive = ColorLogger.is_interactive()
+        return self._interactive
+
+    def start_batch(self, total):
+        """开始一批任务"""
+        with self._lock:
+            self.total = total
+            self.completed = 0
+            self.failed = 0
+            self.batch_started = time.monotonic()
+            self._last_summary = self.batch_started
+        self.refresh(force=True)
+
+    def add_task(self, task_id, label=None, total=None):
+        """登记一个进行中的任务"""
+        with self._lock:
+            if self.batch_started is None:
+                self.batch_started = time.monotonic()
+                self._last_summary = self.batch_started
+                self.total = max(self.total, 1)
+            self._tasks[task_id] = _Task(label or str(task_id), total)
+        self.refresh()
+
+    def update(self, task_id, current, total=None, note=None):
+        """更新任务进度（按帧率限制重绘）"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                return
+            task.current = current
+            if total is not None:
+                task.total = total
+            if note is not None:
+                task.note = note
+        self.refresh()
+
+    def finish_task(self, task_id, ok=True):
+        """任务结束，计入总体进度"""
+        with self._lock:
+            self._tasks.pop(task_id, None)
+            self.completed += 1
+            if not ok:
+                self.failed += 1
+        self.refresh(force=True)
+
+    def close(self):
+        """结束显示：终端下保留最后一帧，非交互环境输出最终汇总"""
+        if self.interactive:
+            self.refresh(force=True)
+            ColorLogger.end_progress()
+        else:
+            ColorLogger.progress(self._summary_line())
+
+    # ---- 统计 ----
+
+    def _rate_and_eta(self):
+        elapsed = time.monotonic() - (self.batch_started or time.monotonic())
+        if not self.completed or elapsed <= 0:
+            return 0.0, None
+        rate = self.completed / elapsed  # 张/秒
+        remaining = max(0, self.total - self.completed)
+        return rate, remaining / rate
+
+    def _summary_line(self):
+        rate, eta = self._rate_and_eta()
+        percent = int(100 * self.completed / self.total) if self.total else 0
+        parts = [
+            f"卡牌进度 {self.completed}/{self.total} ({percent}%)",
+            f"进行中 {len(self._tasks)}",
+        ]
+        if self.failed:
+            parts.append(f"失败 {self.failed}")
+        parts.append(f"{rate * 60:.1f} 张/分钟")
+        parts.append(f"预计剩余 {format_duration(eta)}" if eta is not None else "预计剩余 --")
+        return " | ".join(parts)
+
+    def _frame(self):
+        colors = ColorLogger.COLORS
+        cyan, magenta, bold, end = colors['CYAN'], colors['MAGENTA'], colors['BOLD'], colors['END']
+        lines = [f"{bold}{cyan}🚀 {render_bar(self.completed, self.total, 30)} {self._summary_line()}{end}"]
+        tasks = list(self._tasks.values())
+        now = time.monotonic()
+        for task in tasks[:self.max_rows]:
+            if task.total:
+                detail = f"{render_bar(task.current, task.total)} {task.current}/{task.total}"
+            else:
+                detail = f"已用 {format_duration(now - task.started)}"
+            note = f" {task.note}" if task.note else ""
+            lines.append(f"{magenta}   🎨 {task.label:<12}{end} {detail}{note}")
+        if len(tasks) > self.max_rows:
+            lines.append(f"   … 还有 {len(tasks) - self.max_rows} 张进行中")
+        return "\n".join(lines)
+
+    # ---- 渲染 ----
+
+    def refresh(self, force=False):
+        """按帧率上限重绘；非交互环境按固定间隔输出汇总行"""
+        now = time.monotonic()
+        with self._lock:
+            if self.interactive:
+                if not force and now - self._last_render < self.min_frame_gap:
+                    return
+                self._last_render = now
+                frame = self._frame()
+            else:
+                if now - self._last_summary < self.summary_interval:
+                    return
+                self._last_summary = now
+                frame = None
+                line = self._summary_line()
+        if frame is not None:
+            ColorLogger.progress_frame(frame)
+        else:
+            ColorLogger.progress(line)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 卡牌生成运行日志
+把每张卡牌在各阶段（启动浏览器、导航、输入提示词、等待生成、查找图片、下载、合成、保存）
+的耗时记录为JSONL，并提供按阶段统计 p50/p95/max 与最慢卡牌的汇总命令
+
+用法：
+    python run_log.py summary                 # 汇总最近一次运行
+    python run_log.py summary run_logs/*.jsonl  # 汇总指定日志
+"""
+
+import argparse
+import contextlib
+import contextvars
+import glob
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+RUN_LOG_DIR = os.path.join(BASE_PATH, "run_logs")
+
+# 单张卡牌整体耗时使用的阶段名
+CARD_STAGE = "card"
+
+
+class RunLog:
+    """阶段计时记录器，每个阶段结束时写入一行JSON"""
+
+    def __init__(self, path=None):
+        if path is None:
+            os.makedirs(RUN_LOG_DIR, exist_ok=True)
+            path = os.path.join(RUN_LOG_DIR, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        self.path = path
+        self.run_id = os.path.splitext(os.path.basename(path))[0]
+        # 当前卡牌按线程/异步任务分别记录：并行合成的工作线程、监视模式的生图线程互不干扰
+        self._current_card = contextvars.ContextVar(f"current_card_{id(self)}", default=None)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @property
+    def current_card(self):
+        """当前线程（或异步任务）正在处理的卡牌"""
+        return self._current_card.get()
+
+    def write(self, record):
+        """写入一条记录"""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    @contextlib.contextmanager
+    def card(self, card_name):
+        """标记当前处理的卡牌，期间的阶段记录自动带上卡牌名，并记录整张卡牌耗时"""
+        token = self._current_card.set(card_name)
+        try:
+            with self.span(CARD_STAGE) as record:
+                yield record
+        finally:
+            self._current_card.reset(token)
+
+    @contextlib.contextmanager
+    def span(self, stage, card=None, **fields):
+        """记录一个阶段的耗时；可通过返回的字典标记 status 或附加字段"""
+        record = {
+            "run": self.run_id,
+            "card": card if card is not None else self.current_card,
+            "stage": stage,
+            "start": time.time(),
+            "status": "ok",
+        }
+        record.update(fields)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration"] = round(time.perf_counter() - started, 4)
+            self.write(record)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def load_spans(paths):
+    """读取一个或多个JSONL日志，跳过无法解析的行"""
+    spans = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+
+def percentile(values, pct):
+    """最近秩法百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(spans, top=5):
+    """按阶段统计耗时，并找出最慢的卡牌"""
+    by_stage = defaultdict(list)
+    failures = defaultdict(int)
+    card_totals = []
+    for span in spans:
+        if span.get("stage") == CARD_STAGE:
+            card_totals.append((span.get("duration", 0.0), span.get("card"), span.get("status")))
+            continue
+        by_stage[span["stage"]].append(span.get("duration", 0.0))
+        if span.get("status") != "ok":
+            failures[span["stage"]] += 1
+
+    stages = {}
+    for stage, durations in by_stage.items():
+        stages[stage] = {
+            "count": len(durations),
+            "failed": failures[stage],
+            "total": sum(durations),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "max": max(durations),
+        }
+    card_totals.sort(key=lambda item: item[0], reverse=True)
+    return stages, card_totals[:top]
+
+
+def print_summary(stages, slowest):
+    """打印汇总表"""
+    grand_total = sum(s["total"] for s in stages.values()) or 1.0
+    print(f"{'阶段':<18}{'次数':>6}{'失败':>6}{'p50(s)':>10}{'p95(s)':>10}{'max(s)':>10}{'占比':>8}")
+    print("-" * 68)
+    for stage, s in sorted(stages.items(), key=lambda item: item[1]["total"], reverse=True):
+        share = s["total"] / grand_total * 100
+        print(f"{stage:<18}{s['count']:>6}{s['failed']:>6}{s['p50']:>10.2f}{s['p95']:>10.2f}{s['max']:>10.2f}{share:>7.1f}%")
+
+    if slowest:
+        print("\n🐢 最慢的卡牌：")
+        for duration, card, status in slowest:
+            mark = "✅" if status == "ok" else "❌"
+            print(f"   {mark} {card}: {duration:.1f}s")
+
+
+def latest_log():
+    logs = sorted(glob.glob(os.path.join(RUN_LOG_DIR, "run_*.jsonl")))
+    return logs[-1] if logs else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="春秋杀卡牌生成运行日志工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="按阶段汇总耗时")
+    summary.add_argument("logs", nargs="*", help="JSONL日志文件（默认最近一次运行）")
+    summary.add_argument("--top", type=int, default=5, help="显示最慢的卡牌数量")
+    args = parser.parse_args(argv)
+
+    paths = args.logs or ([latest_log()] if latest_log() else [])
+    if not paths:
+        print("❌ 未找到运行日志")
+        return 1
+
+    spans = load_spans(paths)
+    print(f"📊 运行日志汇总：{', '.join(os.path.basename(p) for p in paths)}（{len(spans)} 条记录）\n")
+    stages, slowest = summarize(spans, top=args.top)
+    print_summary(stages, slowest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
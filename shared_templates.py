@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 多进程合成与共享模板
+父进程把已解码的模板图片（background / title / introduce）的像素放进一块共享内存，
+合成工作进程启动时直接以只读、零拷贝的方式引用这块内存，不再各自解码模板，
+模板内存不会随工作进程数成倍增加。
+
+    with RenderPool(workers=4) as pool:
+        pool.recompose(cards)
+
+字体由 FreeType 按文件路径打开，文件页面本来就由操作系统在进程间共享，无需额外处理。
+
+基准测试（1 / 4 / 16 个工作进程的启动耗时与每个进程的内存）：
+    python shared_templates.py --workers 1 4 16
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+from memory_budget import process_memory, to_mb
+
+# 共享内存句柄（可pickle，随进程池初始化参数传给工作进程）
+# layout 中每项为 (mode, size, offset, length)
+TemplateHandle = namedtuple("TemplateHandle", ["name", "layout", "stamp"])
+
+# Pillow 可以直接引用外部缓冲区（不拷贝）的模式；其余模式在工作进程中拷贝一份
+ZERO_COPY_MODES = ("L", "P", "RGBA", "RGBX", "CMYK", "I;16", "I", "F")
+
+
+class SharedTemplates:
+    """父进程持有的共享模板内存，关闭时释放"""
+
+    def __init__(self, images, stamp=None):
+        raws = [image.tobytes() for image in images]
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, sum(len(raw) for raw in raws)))
+        layout, offset = [], 0
+        for image, raw in zip(images, raws):
+            self._shm.buf[offset:offset + len(raw)] = raw
+            layout.append((image.mode, image.size, offset, len(raw)))
+            offset += len(raw)
+        self.handle = TemplateHandle(self._shm.name, tuple(layout), stamp)
+
+    @classmethod
+    def from_generator(cls, generator):
+        """使用生成器已解码（或刚解码）的模板"""
+        images = generator._templates()
+        return cls(images, stamp=generator._template_cache[0])
+
+    @property
+    def size(self):
+        return self._shm.size
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _open_shared(name):
+    """以使用者身份打开共享内存（不负责删除）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.12 及更早版本没有 track 参数；进程池的工作进程与父进程共用同一个资源回收进程，
+        # 重复登记同一名称不会导致提前删除，由父进程 unlink 时注销
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach(handle):
+    """在工作进程中引用共享模板，返回 (共享内存, 只读图片元组)；图片使用期间共享内存必须保持打开"""
+    shm = _open_shared(handle.name)
+    images = []
+    for mode, size, offset, length in handle.layout:
+        view = shm.buf[offset:offset + length]
+        if mode in ZERO_COPY_MODES:
+            images.append(Image.frombuffer(mode, size, view, "raw", mode, 0, 1))
+        else:
+            images.append(Image.frombytes(mode, size, bytes(view)))
+    return shm, tuple(images)
+
+
+# ---- 工作进程 ----
+
+_worker = None
+_worker_shm = None
+
+
+def _init_worker(handle, log_level, started_at, ready):
+    """工作进程初始化：引用共享模板（handle 为空时自己从磁盘解码，用于对比），然后报告就绪"""
+    global _worker, _worker_shm
+    from card_generator import CardGenerator
+    from color_logger import ColorLogger
+
+    ColorLogger.configure(level=log_level)
+    _worker = CardGenerator()
+    if handle is not None:
+        _worker_shm, images = attach(handle)
+        _worker.adopt_templates(images, handle.stamp)
+    else:
+        _worker._templates()
+    _worker.themes.fonts()
+    if ready is not None:
+        ready.put((os.getpid(), time.time() - started_at))
+
+
+def _compose_job(job):
+    """合成一张卡牌：给出输出路径时保存并返回路径，否则返回PNG字节"""
+    card_data, ai_image, output_path = job
+    if output_path is None:
+        return _worker.compose_to_bytes(card_data, ai_image)
+    final_card = _worker.compose_card(card_data, ai_image)
+    if final_card is None:
+        return None
+    with final_card:
+        _worker.save_card(final_card, output_path)
+    return output_path
+
+
+def _worker_pid(_):
+    return os.getpid()
+
+
+class RenderPool:
+    """多进程合成池：所有工作进程共用一份共享内存中的模板"""
+
+    def __init__(self, workers=4, generator=None, shared=True, log_level="warning"):
+        if generator is None:
+            from card_generator import CardGenerator
+            generator = CardGenerator()
+        self.generator = generator
+        self.workers = workers
+        self.templates = SharedTemplates.from_generator(generator) if shared else None
+        context = get_context("spawn")
+        self._ready = context.Queue()
+        self._started_at = time.time()
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker,
+            initargs=(self.templates.handle if shared else None, log_level, self._started_at, self._ready),
+        )
+
+    def warm_up(self, timeout=120):
+        """启动全部工作进程并等待初始化完成，返回 {pid: 启动耗时（秒）}"""
+        futures = [self.pool.submit(_worker_pid, i) for i in range(self.workers)]
+        for future in futures:
+            # 工作进程初始化失败时这里抛出 BrokenProcessPool，而不是一直等待就绪消息
+            future.result(timeout=timeout)
+        return dict(self._ready.get(timeout=timeout) for _ in range(len(self.pids())))
+
+    def pids(self):
+        return list(self.pool._processes)
+
+    def map(self, jobs, chunksize=1):
+        """jobs 为 (卡牌数据, AI图片, 输出路径或None) 序列，按顺序返回结果"""
+        return list(self.pool.map(_compose_job, jobs, chunksize=chunksize))
+
+    def recompose(self, cards):
+        """用存档的AI原图重新合成并保存，返回成功数"""
+        jobs = [
+            (card, self.generator.art_file(card["card_name"]),
+             os.path.join(self.generator.output_path, f"{card['card_name']}.png"))
+            for card in cards if os.path.exists(self.generator.art_file(card["card_name"]))
+        ]
+        return sum(1 for result in self.map(jobs) if result)
+
+    def close(self):
+        self.pool.shutdown()
+        self._ready.close()
+        if self.templates is not None:
+            self.templates.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def bench_workers(counts, cards_per_worker=2, art_size=1024):
+    """对比共享模板与各进程自行解码：启动耗时、每个工作进程的 RSS / PSS / USS（MB）"""
+    import tempfile
+    from benchmark import make_placeholder_art, make_synthetic_cards
+
+    work_dir = tempfile.mkdtemp(prefix="card_workers_")
+    art_path = os.path.join(work_dir, "art.png")
+    make_placeholder_art(size=art_size, seed=1).save(art_path)
+    try:
+        for count in counts:
+            cards = make_synthetic_cards(count * cards_per_worker, seed=count)
+            jobs = [(card, art_path, os.path.join(work_dir, f"{i}.png")) for i, card in enumerate(cards)]
+            for shared in (False, True):
+                started = time.perf_counter()
+                with RenderPool(workers=count, shared=shared, log_level="error") as pool:
+                    pool.warm_up()
+                    spawn = time.perf_counter() - started
+                    pool.map(jobs)
+                    memory = [process_memory(pid) for pid in pool.pids()]
+                memory = [m for m in memory if m]
+                row = {
+                    "workers": count,
+                    "shared": shared,
+                    "spawn_s": spawn,
+                }
+                for key in ("rss", "pss", "uss"):
+                    values = [m[key] for m in memory if m.get(key) is not None]
+                    row[f"{key}_mb"] = to_mb(sum(values) / len(values)) if values else None
+                yield row
+    finally:
+        import shutil
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _format_mb(value):
+    return "   -  " if value is None else f"{value:6.1f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="多进程合成：共享模板内存与进程启动基准测试")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16], help="工作进程数")
+    parser.add_argument("--cards-per-worker", type=int, default=2, help="每个工作进程合成的卡牌数")
+    args = parser.parse_args(argv)
+
+    print("🧪 每个工作进程的平均内存（MB）：RSS 常驻 / PSS 分摊共享页 / USS 独占")
+    print(f"{'进程数':>6} {'模板':>6} {'全部就绪':>9} {'RSS':>7} {'PSS':>7} {'USS':>7}")
+    for row in bench_workers(args.workers, args.cards_per_worker):
+        print(f"{row['workers']:>6} {'共享' if row['shared'] else '各自解码':>6} {row['spawn_s']:>8.2f}s "
+              f"{_format_mb(row['rss_mb'])} {_format_mb(row['pss_mb'])} {_format_mb(row['uss_mb'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
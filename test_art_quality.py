@@ -0,0 +1,47 @@
+"""
+AI原图质量检查测试
+质量检查只读取调用方传入的图片，不能修改它（例如对JPEG做缩小解码后，合成时拿到的就是缩小的图片）。
+可以用 pytest 运行，也可以直接 python test_art_quality.py。
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+from art_quality import ArtQualityGate
+
+
+def jpeg_bytes(size=1024, seed=0):
+    """彩色渐变加噪声的JPEG（能通过空白与主色检查）"""
+    ramp = np.linspace(0, 200, size, dtype=np.float32)
+    noise = np.random.default_rng(seed).integers(0, 56, (size, size, 3))
+    pixels = (np.stack(np.broadcast_arrays(ramp[:, None], ramp[None, :], ramp[::-1, None]), axis=2) + noise)
+    pixels = pixels.astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def test_check_does_not_modify_open_image():
+    with Image.open(io.BytesIO(jpeg_bytes())) as image:
+        result = ArtQualityGate().check(image)
+        assert result.ok, result.reasons
+        assert image.size == (1024, 1024)
+        image.load()
+        assert image.size == (1024, 1024)
+
+
+def test_check_bytes_matches_open_image():
+    data = jpeg_bytes(seed=1)
+    from_bytes = ArtQualityGate().check(data)
+    with Image.open(io.BytesIO(data)) as image:
+        from_image = ArtQualityGate().check(image)
+    assert from_bytes.metrics["width"] == from_image.metrics["width"] == 1024
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,44 @@
+"""
+批量预估与生成范围一致性测试
+`cli.py generate --dry-run` 预估的卡牌必须正是 `generate` 实际会处理的卡牌（同一起始卡牌号、同样覆盖生成）。
+可以用 pytest 运行，也可以直接 python test_estimator.py。
+"""
+
+import asyncio
+
+from batch_estimator import planned_cards
+from card_generator import CardGenerator, START_FROM_CARD
+from progress_display import ProgressDisplay
+
+
+def processed_cards():
+    """运行 generate_all_cards（不生成图片），返回实际处理的卡牌名"""
+    generator = CardGenerator(progress=ProgressDisplay(interactive=False, summary_interval=3600))
+    processed = []
+
+    async def record(card_data):
+        processed.append(card_data["card_name"])
+        return "ok"
+
+    generator.generate_single_card = record
+    asyncio.run(generator.generate_all_cards())
+    return processed
+
+
+def test_dry_run_matches_generated_cards():
+    planned = [card["card_name"] for card in planned_cards()]
+    assert planned
+    assert planned == processed_cards()
+
+
+def test_dry_run_starts_from_generator_start_card():
+    everything = planned_cards(start=1)
+    assert [card["card_name"] for card in planned_cards()] == \
+        [card["card_name"] for card in everything[START_FROM_CARD - 1:]]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,73 @@
+"""
+命令行启动时间测试
+`cli.py --help` 与只做合成的命令不应加载浏览器和文档库，启动时间必须在1秒以内。
+可以用 pytest 运行，也可以直接 python test_startup.py 查看耗时。
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(BASE_PATH, "cli.py")
+
+# 启动时间上限（秒），取多次运行中最快的一次
+STARTUP_BUDGET = 1.0
+RUNS = 3
+
+# 合成相关命令不应导入的重量级依赖
+HEAVY_MODULES = ("playwright", "requests", "docx", "openpyxl")
+
+
+def startup_time(*args):
+    """运行一次命令行，返回 (最快耗时, 最后一次的退出码)"""
+    best, code = None, None
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        code = subprocess.run(
+            [sys.executable, CLI, *args], cwd=BASE_PATH,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ).returncode
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, code
+
+
+def loaded_heavy_modules(statement):
+    """在新进程中执行 statement，返回其中已导入的重量级依赖"""
+    probe = f"import sys; {statement}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BASE_PATH, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    return [name for name in output.split(",") if name]
+
+
+def test_help_starts_fast():
+    elapsed, code = startup_time("--help")
+    assert code == 0
+    assert elapsed < STARTUP_BUDGET, f"cli.py --help 用时 {elapsed:.2f} 秒"
+
+
+def test_recompose_help_starts_fast():
+    elapsed, code = startup_time("recompose", "--help")
+    assert code == 0
+    assert elapsed < STARTUP_BUDGET, f"cli.py recompose --help 用时 {elapsed:.2f} 秒"
+
+
+def test_cli_import_is_lightweight():
+    assert loaded_heavy_modules("import cli") == []
+
+
+def test_compose_path_skips_browser_and_docx():
+    # 合成只需要 Pillow/NumPy，不应加载浏览器、HTTP客户端和文档库
+    assert loaded_heavy_modules("import card_generator") == []
+
+
+if __name__ == "__main__":
+    for label, args in [("--help", ("--help",)), ("recompose --help", ("recompose", "--help"))]:
+        elapsed, code = startup_time(*args)
+        mark = "✅" if code == 0 and elapsed < STARTUP_BUDGET else "❌"
+        print(f"{mark} cli.py {label:<18} {elapsed * 1000:7.1f} ms")
+    heavy = loaded_heavy_modules("import card_generator")
+    print(f"{'✅' if not heavy else '❌'} 合成路径导入的重量级依赖：{', '.join(heavy) or '无'}")
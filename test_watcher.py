@@ -0,0 +1,129 @@
+"""
+监视模式增量渲染测试
+cards.json 暂时写坏后再修正、卡牌改名时，不应把已有原图存档的卡牌送去重新生成AI图片。
+可以用 pytest 运行，也可以直接 python test_watcher.py。
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+from card_watcher import CardWatcher, diff_catalogue
+
+CARDS = [
+    {"card_group": "军事卡", "card_name": "秦国精兵", "color_theme": "黑金",
+     "ai_prompt": "黑色战马和金色盔甲的精锐士兵", "description": "军事攻击力+3", "price": "15春秋币"},
+    {"card_group": "军事卡", "card_name": "楚国勇士", "color_theme": "赤红",
+     "ai_prompt": "手持长戈的楚国勇士", "description": "军事攻击力+2", "price": "12春秋币"},
+    {"card_group": "锦囊卡", "card_name": "合纵连横", "color_theme": "青蓝",
+     "ai_prompt": "诸侯会盟的大殿", "description": "与一名玩家结盟", "price": "8春秋币"},
+]
+
+
+class FakeGenerator:
+    """只提供监视器用到的路径与重新合成接口，记录重新合成的卡牌"""
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self.base_img_path = os.path.join(base_path, "Base_IMG")
+        self.art_path = os.path.join(base_path, "AI_Art")
+        os.makedirs(self.base_img_path)
+        os.makedirs(self.art_path)
+        with open(os.path.join(self.base_img_path, "background.png"), "wb") as f:
+            f.write(b"template")
+        self.recomposed = []
+
+    def art_file(self, card_name):
+        return os.path.join(self.art_path, f"{card_name}.png")
+
+    def archive_art(self, card_name, data):
+        with open(self.art_file(card_name), "wb") as f:
+            f.write(data)
+
+    def recompose_card(self, card_data):
+        self.recomposed.append(card_data["card_name"])
+        return self.art_file(card_data["card_name"])
+
+
+def make_watcher(cards):
+    """在临时目录中建立卡牌目录与全部原图存档，返回已载入初始状态的监视器"""
+    generator = FakeGenerator(tempfile.mkdtemp(prefix="card_watcher_"))
+    for card in cards:
+        generator.archive_art(card["card_name"], b"art")
+    watcher = CardWatcher(generator=generator)
+    write_cards(watcher, cards)
+    watcher.cards, _ = watcher._load_catalogue()
+    watcher.template_hash = watcher._template_hash()
+    return watcher
+
+
+def write_cards(watcher, cards, text=None):
+    with open(watcher.cards_file, "w", encoding="utf-8") as f:
+        f.write(text if text is not None else json.dumps(cards, ensure_ascii=False, indent=2))
+
+
+def test_syntax_error_then_fix_does_not_regenerate_art():
+    watcher = make_watcher(CARDS)
+    try:
+        # 两张卡牌暂时写坏（缺少逗号），保存后再修正
+        text = json.dumps(CARDS, ensure_ascii=False, indent=2)
+        broken = text.replace('"card_group": "军事卡",', '"card_group": "军事卡"')
+        write_cards(watcher, CARDS, broken)
+        watcher.rebuild()
+        assert set(watcher.cards) == {card["card_name"] for card in CARDS}
+
+        write_cards(watcher, CARDS)
+        watcher.rebuild()
+        assert watcher.art_queue == []
+        assert watcher.generator.recomposed == []
+    finally:
+        shutil.rmtree(watcher.generator.base_path, ignore_errors=True)
+
+
+def test_text_change_after_fix_recomposes_only():
+    watcher = make_watcher(CARDS)
+    try:
+        write_cards(watcher, CARDS, "[")
+        watcher.rebuild()
+        fixed = [dict(card) for card in CARDS]
+        fixed[1]["price"] = "20春秋币"
+        write_cards(watcher, fixed)
+        watcher.rebuild()
+        assert watcher.art_queue == []
+        assert watcher.generator.recomposed == ["楚国勇士"]
+    finally:
+        shutil.rmtree(watcher.generator.base_path, ignore_errors=True)
+
+
+def test_rename_reuses_archived_art():
+    watcher = make_watcher(CARDS)
+    try:
+        renamed = [dict(card) for card in CARDS]
+        renamed[0]["card_name"] = "秦国锐士"
+        write_cards(watcher, renamed)
+        watcher.rebuild()
+        assert watcher.art_queue == []
+        assert watcher.generator.recomposed == ["秦国锐士"]
+        assert os.path.exists(watcher.generator.art_file("秦国锐士"))
+    finally:
+        shutil.rmtree(watcher.generator.base_path, ignore_errors=True)
+
+
+def test_diff_catalogue_new_art_only_without_archive():
+    old = {card["card_name"]: card for card in CARDS[:1]}
+    new = {card["card_name"]: card for card in CARDS}
+    changed = dict(CARDS[0], ai_prompt="白色战马")
+    new[changed["card_name"]] = changed
+
+    recompose, new_art, removed = diff_catalogue(old, new, has_art=lambda name: name == "楚国勇士")
+    assert recompose == ["楚国勇士"]
+    assert new_art == ["秦国精兵", "合纵连横"]
+    assert removed == []
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 主题色与卡牌类型图标注册表
+进程内只加载一次：
+    • 主题色关键词 → 调色板（按优先级匹配一次后缓存，之后每张卡牌只是一次字典查找）
+    • 卡牌类型 → emoji
+    • 字体回退链只解析一次
+    • 每种 (emoji, 颜色) 预先渲染成字形位图，合成卡牌时直接粘贴
+
+新增主题色或卡牌类型无需改代码，在项目根目录放一个 themes.json（或用环境变量 CARD_THEMES 指定路径）：
+    {
+        "palettes": [{"name": "翠绿", "tokens": ["翠"], "emoji_color": "#00A86B"}],
+        "group_emojis": {"外交卡": "🤝"},
+        "default_color": "#F0E68C"
+    }
+配置中的调色板优先于内置调色板；同名调色板直接覆盖。
+
+用法：
+    python theme_registry.py 黑金 深红金 青绿    # 查看主题色解析结果
+"""
+
+import json
+import os
+import sys
+from collections import namedtuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+CONFIG_FILE = os.path.join(BASE_PATH, "themes.json")
+
+Palette = namedtuple("Palette", ["name", "tokens", "emoji_color"])
+# 预渲染的字形：RGBA位图与相对于文字绘制原点的偏移（即 textbbox 的左上角）
+Glyph = namedtuple("Glyph", ["bitmap", "offset", "width", "height"])
+
+# 内置调色板，按优先级排列（使用更温和、更协调的颜色方案）
+DEFAULT_PALETTES = [
+    Palette("黑金", ("黑金", "墨"), "#FFD700"),     # 亮金色
+    Palette("红", ("深红", "红"), "#DC143C"),       # 猩红色
+    Palette("蓝", ("蓝",), "#4169E1"),              # 皇家蓝
+    Palette("银", ("银", "灰"), "#C0C0C0"),         # 银色
+    Palette("紫", ("紫",), "#9370DB"),              # 中紫色
+    Palette("绿", ("绿",), "#32CD32"),              # 柠檬绿
+    Palette("橙", ("橙",), "#FF8C00"),              # 暗橙色
+    Palette("古铜", ("古铜", "褐"), "#CD853F"),     # 秘鲁色
+    Palette("青", ("青",), "#40E0D0"),              # 绿松石色
+    Palette("黄", ("黄",), "#FFD700"),              # 金色
+]
+DEFAULT_COLOR = "#F0E68C"  # 卡其色（温和的默认色）
+
+DEFAULT_GROUP_EMOJIS = {
+    "国家卡": "🏰",
+    "思想卡": "🧠",
+    "变法卡": "⚖️",
+    "连锁卡": "🔗",
+    "军事卡": "⚔️",
+    "经济卡": "💰",
+    "道具卡": "🎁",
+    "锦囊牌": "📜",
+    "祭祀卡": "🙏",
+}
+
+# 字体回退链：(候选字体文件, 字号)
+TITLE_FONTS = (("simhei.ttf", "arial.ttf"), 44)
+DESC_FONTS = (("simhei.ttf", "arial.ttf"), 24)
+EMOJI_FONTS = (("seguiemj.ttf", "NotoColorEmoji.ttf"), 40)
+
+
+def _load_font(candidates, size):
+    """按顺序尝试加载字体，都不可用时返回 None"""
+    for name in candidates:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return None
+
+
+class ThemeRegistry:
+    """主题色、卡牌类型图标、字体与字形位图缓存"""
+
+    def __init__(self, config_file=None):
+        self.palettes = list(DEFAULT_PALETTES)
+        self.default_color = DEFAULT_COLOR
+        self.group_emojis = dict(DEFAULT_GROUP_EMOJIS)
+        self._resolved = {}
+        self._glyphs = {}
+        self._fonts = None
+        self.config_file = config_file or os.environ.get("CARD_THEMES") or CONFIG_FILE
+        if os.path.exists(self.config_file):
+            self.load_config(self.config_file)
+
+    def load_config(self, path):
+        """合并 themes.json：配置中的调色板优先，同名的覆盖内置调色板"""
+        with open(path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        extra = [
+            Palette(item["name"], tuple(item.get("tokens") or [item["name"]]), item["emoji_color"])
+            for item in config.get("palettes", [])
+        ]
+        names = {palette.name for palette in extra}
+        self.palettes = extra + [palette for palette in self.palettes if palette.name not in names]
+        self.default_color = config.get("default_color", self.default_color)
+        self.group_emojis.update(config.get("group_emojis", {}))
+        self._resolved.clear()
+        self._glyphs.clear()
+
+    # ---- 主题色 ----
+
+    def palette(self, color_theme):
+        """主题色描述 → 调色板；第一次按优先级匹配关键词，之后直接查缓存"""
+        color_theme = color_theme or ""
+        palette = self._resolved.get(color_theme)
+        if palette is None:
+            palette = next(
+                (p for p in self.palettes if any(token in color_theme for token in p.tokens)),
+                Palette("默认", (), self.default_color),
+            )
+            self._resolved[color_theme] = palette
+        return palette
+
+    def emoji_color(self, color_theme):
+        return self.palette(color_theme).emoji_color
+
+    def group_emoji(self, card_group):
+        return self.group_emojis.get(card_group, "")
+
+    # ---- 字体与字形 ----
+
+    def fonts(self):
+        """(标题字体, 描述字体, emoji字体)，整个进程只解析一次回退链"""
+        if self._fonts is None:
+            title = _load_font(*TITLE_FONTS)
+            desc = _load_font(*DESC_FONTS)
+            if title is None or desc is None:
+                title = desc = ImageFont.load_default()
+            # 标题用的是黑体时才尝试emoji字体，否则回退到标题字体
+            path = getattr(title, "path", None)
+            emoji = _load_font(*EMOJI_FONTS) if isinstance(path, str) and path.endswith("simhei.ttf") else None
+            self._fonts = (title, desc, emoji or title)
+        return self._fonts
+
+    def glyph(self, emoji, color):
+        """(emoji, 颜色) 的预渲染字形，首次使用时渲染并缓存"""
+        key = (emoji, color)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            font = self.fonts()[2]
+            probe = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+            left, top, right, bottom = probe.textbbox((0, 0), emoji, font=font)
+            bitmap = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+            ImageDraw.Draw(bitmap).text((-left, -top), emoji, fill=color, font=font)
+            glyph = Glyph(bitmap, (left, top), right - left, bottom - top)
+            self._glyphs[key] = glyph
+        return glyph
+
+    def paste_glyph(self, image, glyph, position):
+        """把字形贴到 position（与 draw.text 的绘制原点一致）；卡牌可以是任意模式，超出左上边界的部分裁掉"""
+        bitmap = glyph.bitmap
+        x, y = position[0] + glyph.offset[0], position[1] + glyph.offset[1]
+        if x < 0 or y < 0:
+            if -x >= bitmap.width or -y >= bitmap.height:
+                return
+            bitmap = bitmap.crop((max(0, -x), max(0, -y), bitmap.width, bitmap.height))
+            x, y = max(0, x), max(0, y)
+        if image.mode == "RGBA":
+            image.alpha_composite(bitmap, (x, y))
+            return
+        # 非RGBA模板（如替换成RGB背景）：只把字形所在区域转为RGBA混合后贴回
+        box = (x, y, x + bitmap.width, y + bitmap.height)
+        region = image.crop(box).convert("RGBA")
+        region.alpha_composite(bitmap)
+        image.paste(region.convert(image.mode), box)
+
+
+_registry = None
+
+
+def get_registry():
+    """进程内共享的注册表"""
+    global _registry
+    if _registry is None:
+        _registry = ThemeRegistry()
+    return _registry
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    registry = get_registry()
+    print(f"🎨 调色板 {len(registry.palettes)} 个，卡牌类型 {len(registry.group_emojis)} 种"
+          f"（配置：{registry.config_file if os.path.exists(registry.config_file) else '无'}）")
+    for theme in argv:
+        palette = registry.palette(theme)
+        print(f"   {theme:<8} → {palette.name} {palette.emoji_color}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
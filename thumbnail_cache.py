@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+春秋杀 - 卡牌缩略图缓存
+把 Generated_Cards 中的整张卡牌缩小到文档分辨率并编码为JPEG，按原图内容哈希缓存。
+重复导出时未变化的卡牌直接复用缓存，不再解码和重新编码。
+"""
+
+import json
+import os
+
+from PIL import Image
+
+from card_store import file_hash
+
+BASE_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_PATH, ".thumb_cache")
+INDEX_FILE = "index.json"
+
+
+class ThumbnailCache:
+    """按内容哈希缓存的缩略图"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, width_px=180, quality=85):
+        self.cache_dir = cache_dir
+        self.width_px = width_px
+        self.quality = quality
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        # 原图路径 -> [修改时间, 大小, 内容哈希]，避免每次导出都重新计算哈希
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+        self._dirty = False
+
+    def _content_hash(self, path):
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        entry = self._index.get(key)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        digest = file_hash(path)
+        self._index[key] = [stat.st_mtime_ns, stat.st_size, digest]
+        self._dirty = True
+        return digest
+
+    def get(self, path):
+        """返回缩略图路径；原图不存在时返回None"""
+        if not path or not os.path.exists(path):
+            return None
+        thumb_path = os.path.join(self.cache_dir, f"{self._content_hash(path)}_{self.width_px}.jpg")
+        if os.path.exists(thumb_path):
+            self.hits += 1
+            return thumb_path
+
+        with Image.open(path) as image:
+            image.draft("RGB", (self.width_px, self.width_px * 4))
+            if image.mode in ("RGBA", "LA", "P"):
+                # 透明区域铺白底，JPEG不支持透明通道
+                rgba = image.convert("RGBA")
+                image = Image.new("RGB", rgba.size, (255, 255, 255))
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                image = image.convert("RGB")
+            height = max(1, round(image.height * self.width_px / image.width))
+            thumb = image.resize((self.width_px, height), Image.LANCZOS)
+
+        # 先写临时文件再改名，中断时不会留下半张缩略图
+        tmp_path = thumb_path + ".tmp"
+        thumb.save(tmp_path, "JPEG", quality=self.quality, optimize=True)
+        os.replace(tmp_path, thumb_path)
+        self.misses += 1
+        return thumb_path
+
+    def save_index(self):
+        if self._dirty:
+            with open(self._index_path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, ensure_ascii=False)
+            self._dirty = False